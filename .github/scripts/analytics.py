@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+analytics.py — how long postings stay open, and how often they're posted.
+
+One pass over the listings fills compact columns (array module: posted and
+closed timestamps, category and company codes), and one pass over those
+columns produces the whole report:
+
+  lifetime     histogram of days from posting to close (closed listings) and
+               the age of listings still open
+  time to close  p10/p25/p50/p75/p90 overall, per category and per company
+               (canonical company, see companies.py; companies with at least
+               MIN_COMPANY_CLOSED closed listings)
+  per week     postings per week (weeks start Monday, PT)
+
+Quantiles come from streaming sketches (QuantileSketch: log-spaced buckets
+with ~1% relative error) instead of sorted lists, so memory stays constant
+per group however much history goes in, and sketches merge.
+
+A listing's close time is when it went inactive: from the history index
+(history.py) when it has been built, otherwise `date_updated` on inactive
+listings. Listings that were already inactive when added (date_updated ==
+date_posted and no recorded close) have no known close time and are counted
+separately. The report shows what share of listings closed within
+CLOSING_SOON_DAYS of posting, for tuning that window.
+
+The report is written to analytics.json (not tracked by git) and printed.
+
+Usage:
+  python analytics.py                   # report from listings.json
+  python analytics.py --json            # print the report as JSON
+  python analytics.py --synthesize N    # time the pass on N synthetic listings
+"""
+
+import argparse
+import bisect
+import json
+import math
+import os
+import random
+import time
+from array import array
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+import companies
+import history
+import util
+from closing_soon import CLOSING_SOON_DAYS
+
+ANALYTICS_FILE = os.path.join(util.SCRIPT_DIR, "analytics.json")
+DAY = 24 * 3600
+QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+# Histogram bin edges in days; the last bin is open-ended
+LIFETIME_BINS = (0, 7, 14, 30, 60, 90, 180, 365)
+MIN_COMPANY_CLOSED = 3
+TOP_COMPANIES = 20
+
+
+class QuantileSketch:
+    """Streaming quantiles over non-negative values with bounded relative error.
+
+    Values fall into log-spaced buckets (bucket i holds (gamma^(i-1), gamma^i]),
+    so any quantile is within `accuracy` of the true value, memory grows with
+    the log of the value range rather than the count, and sketches merge by
+    adding bucket counts.
+    """
+
+    def __init__(self, accuracy=0.01):
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets = {}
+        self.zeros = 0
+        self.count = 0
+
+    def bucket(self, value):
+        """Bucket index for a value (None for zero)."""
+        return math.ceil(math.log(value) / self.log_gamma) if value > 0 else None
+
+    def add(self, value, bucket=False):
+        """Count a value. Pass `bucket` (from a sketch with the same accuracy)
+        to skip recomputing it when adding one value to several sketches."""
+        if bucket is False:
+            bucket = self.bucket(value)
+        self.count += 1
+        if bucket is None:
+            self.zeros += 1
+        else:
+            self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def merge(self, other):
+        self.count += other.count
+        self.zeros += other.zeros
+        for i, n in other.buckets.items():
+            self.buckets[i] = self.buckets.get(i, 0) + n
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for i in sorted(self.buckets):
+            seen += self.buckets[i]
+            if rank < seen:
+                # Midpoint of the bucket, in relative terms
+                return 2 * self.gamma ** i / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+    def quantiles(self, qs=QUANTILES):
+        return [None if self.count == 0 else round(self.quantile(q), 1) for q in qs]
+
+
+class Columns:
+    """Listings as parallel compact arrays, with codes for categories and companies."""
+
+    def __init__(self):
+        self.posted = array("q")
+        self.closed = array("q")     # close time; 0 = still open, -1 = unknown
+        self.category = array("H")
+        self.company = array("I")
+        self.categories, self.companies = [], []
+        self._codes = ({}, {})
+
+    def _code(self, which, names, key, name):
+        codes = self._codes[which]
+        if key not in codes:
+            codes[key] = len(names)
+            names.append(name)
+        return codes[key]
+
+    def append(self, posted, closed, category, company_key, company_name):
+        self.posted.append(posted)
+        self.closed.append(closed)
+        self.category.append(self._code(0, self.categories, category, category))
+        self.company.append(self._code(1, self.companies, company_key, company_name))
+
+    def __len__(self):
+        return len(self.posted)
+
+
+def close_times():
+    """listing id -> first time it went inactive, from the history index if built."""
+    index = history.HistoryIndex.load()
+    return {listing_id: closed[0] for listing_id in index.listings
+            for closed in [index.closed_at(listing_id)] if closed}
+
+
+def columns(listings, closed_at=None):
+    closed_at = closed_at or {}
+    cols = Columns()
+    for listing in listings:
+        if not listing.get("is_visible", True) or not listing.get("date_posted"):
+            continue
+        posted = listing["date_posted"]
+        if listing.get("active", True):
+            closed = 0
+        elif listing["id"] in closed_at:
+            closed = closed_at[listing["id"]]
+        elif listing.get("date_updated", posted) > posted:
+            closed = listing["date_updated"]
+        else:
+            closed = -1
+        cols.append(posted, closed, listing.get("category") or "Unspecified",
+                    companies.listing_key(listing), listing["company_name"])
+    return cols
+
+
+@lru_cache(maxsize=None)
+def week_of_hour(hour):
+    # PT offsets are whole hours, so every timestamp in an hour is in the same week
+    day = datetime.fromtimestamp(hour * 3600, util.PST).date()
+    return (day - timedelta(days=day.weekday())).isoformat()
+
+
+def week_start(t):
+    return week_of_hour(t // 3600)
+
+
+def analyze(cols, now=None):
+    """The full report from one pass over the columns."""
+    now = now or int(time.time())
+    lifetime_bins = [0] * len(LIFETIME_BINS)
+    open_bins = [0] * len(LIFETIME_BINS)
+    overall = QuantileSketch()
+    by_category = [QuantileSketch() for _ in cols.categories]
+    by_company = {}
+    weekly = {}
+    unknown = within_window = 0
+
+    for i in range(len(cols)):
+        posted, closed = cols.posted[i], cols.closed[i]
+        week = week_start(posted)
+        weekly[week] = weekly.get(week, 0) + 1
+        if closed == -1:
+            unknown += 1
+            continue
+        days = max(((closed if closed else now) - posted) / DAY, 0.0)
+        bin_index = bisect.bisect_right(LIFETIME_BINS, days) - 1
+        if not closed:
+            open_bins[bin_index] += 1
+            continue
+        lifetime_bins[bin_index] += 1
+        bucket = overall.bucket(days)
+        overall.add(days, bucket)
+        by_category[cols.category[i]].add(days, bucket)
+        company = by_company.get(cols.company[i])
+        if company is None:
+            company = by_company[cols.company[i]] = QuantileSketch()
+        company.add(days, bucket)
+        if days <= CLOSING_SOON_DAYS:
+            within_window += 1
+
+    labels = [f"{lo}-{hi}" for lo, hi in zip(LIFETIME_BINS, LIFETIME_BINS[1:])] + [f"{LIFETIME_BINS[-1]}+"]
+    companies = sorted(
+        ((cols.companies[code], sketch) for code, sketch in by_company.items() if sketch.count >= MIN_COMPANY_CLOSED),
+        key=lambda item: (-item[1].count, item[0]),
+    )[:TOP_COMPANIES]
+    weeks = sorted(weekly)
+    series = []
+    if weeks:
+        # Fill empty weeks so the series is continuous
+        week = datetime.fromisoformat(weeks[0]).date()
+        last = datetime.fromisoformat(weeks[-1]).date()
+        while week <= last:
+            series.append([week.isoformat(), weekly.get(week.isoformat(), 0)])
+            week += timedelta(days=7)
+
+    return {
+        "generated": datetime.fromtimestamp(now, util.PST).strftime("%Y-%m-%d %H:%M PST"),
+        "listings": len(cols),
+        "closed": overall.count,
+        "open": sum(open_bins),
+        "close_unknown": unknown,
+        "closing_soon_days": CLOSING_SOON_DAYS,
+        "closed_within_closing_soon_days": within_window,
+        "quantiles": list(QUANTILES),
+        "lifetime_days": {
+            "bins": labels,
+            "closed": lifetime_bins,
+            "open_age": open_bins,
+        },
+        "time_to_close_days": {
+            "all": overall.quantiles(),
+            "by_category": {
+                name: {"count": sketch.count, "quantiles": sketch.quantiles()}
+                for name, sketch in zip(cols.categories, by_category) if sketch.count
+            },
+            "by_company": {
+                name: {"count": sketch.count, "quantiles": sketch.quantiles()} for name, sketch in companies
+            },
+        },
+        "postings_per_week": series,
+    }
+
+
+def format_report(report):
+    q_header = " / ".join(f"p{int(q * 100)}" for q in report["quantiles"])
+    lines = [
+        f"{report['listings']} listing(s): {report['closed']} closed, {report['open']} open, "
+        f"{report['close_unknown']} closed with no known close date",
+        "",
+        "Lifetime (days)   closed   open",
+    ]
+    lifetime = report["lifetime_days"]
+    for label, closed, still_open in zip(lifetime["bins"], lifetime["closed"], lifetime["open_age"]):
+        lines.append(f"  {label:<14} {closed:>7} {still_open:>6}")
+
+    def row(name, stats):
+        values = " / ".join("-" if v is None else f"{v:g}" for v in stats["quantiles"])
+        return f"  {name[:28]:<28} {stats['count']:>5}  {values}"
+
+    ttc = report["time_to_close_days"]
+    lines += ["", f"Time to close (days)          n  {q_header}"]
+    lines.append(row("all", {"count": report["closed"], "quantiles": ttc["all"]}))
+    lines += [row(name, stats) for name, stats in sorted(ttc["by_category"].items())]
+    if ttc["by_company"]:
+        lines += ["", f"By company (≥{MIN_COMPANY_CLOSED} closed)"]
+        lines += [row(name, stats) for name, stats in ttc["by_company"].items()]
+    if report["closed"]:
+        share = report["closed_within_closing_soon_days"] / report["closed"]
+        lines += ["", f"{share:.0%} of closed listings closed within CLOSING_SOON_DAYS "
+                      f"({report['closing_soon_days']}) of posting."]
+    series = report["postings_per_week"]
+    if series:
+        peak = max(count for _, count in series)
+        lines += ["", f"Postings per week ({len(series)} weeks, peak {peak})"]
+        for week, count in series[-12:]:
+            lines.append(f"  {week}  {count:>4}  {'█' * round(20 * count / peak) if peak else ''}")
+    return "\n".join(lines)
+
+
+def run(listings):
+    """Write analytics.json from already-loaded listings. Returns the report."""
+    report = analyze(columns(listings, close_times()))
+    with open(ANALYTICS_FILE, "w") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(format_report(report))
+    return report
+
+
+def synthesize(n, rng):
+    now = int(time.time())
+    listings = []
+    for i in range(n):
+        posted = now - rng.randint(0, 3 * 365) * DAY
+        lifetime = int(rng.lognormvariate(3.3, 0.8) * DAY)
+        active = posted + lifetime > now
+        listings.append({
+            "id": f"synthetic-{i}",
+            "company_name": f"Company {i % 2000}",
+            "category": rng.choice(util.VALID_CATEGORIES),
+            "date_posted": posted,
+            "date_updated": posted if active else posted + lifetime,
+            "active": active,
+        })
+    return listings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Listing lifetime and time-to-close distributions.")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--synthesize", type=int, metavar="N", help="time the pass on N synthetic listings")
+    args = parser.parse_args()
+
+    if args.synthesize:
+        listings = synthesize(args.synthesize, random.Random(42))
+        start = time.perf_counter()
+        cols = columns(listings)
+        loaded = time.perf_counter()
+        report = analyze(cols)
+        done = time.perf_counter()
+        print(f"{len(cols)} listings: columns {(loaded - start) * 1000:.0f} ms, "
+              f"report {(done - loaded) * 1000:.0f} ms")
+        print(f"time to close p50 {report['time_to_close_days']['all'][2]} days "
+              f"(exact {sorted((l['date_updated'] - l['date_posted']) / DAY for l in listings if not l['active'])[report['closed'] // 2]:.1f})")
+        return
+
+    listings = util.get_listings_from_json()
+    if args.json:
+        report = analyze(columns(listings, close_times()))
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+        return
+    report = run(listings)
+    util.set_output("closed_count", report["closed"])
+    util.set_output("median_days_to_close", report["time_to_close_days"]["all"][2])
+
+
+if __name__ == "__main__":
+    main()
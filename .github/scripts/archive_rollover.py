@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+archive_rollover.py — move long-closed rows from README.md into ARCHIVE.md.
+
+For every <!-- *_TABLE_START --> ... <!-- *_TABLE_END --> region in README.md,
+rows whose status is 🔒 [CLOSED] or ❌ [DISCONTINUED] and that closed more than
+RETENTION_DAYS ago are moved to the top of the ARCHIVE.md table under the same
+"## " section heading. Both files are rewritten once, at the end.
+
+When a row closed is taken from, in order:
+  1. listings.json — date_updated of the inactive listing with the same URL
+  2. an "Archived YYYY-MM-DD" note in the row
+  3. the latest date in the row (ignoring the Date Posted column)
+Rows with no usable date stay put and are reported.
+
+Usage:
+  python archive_rollover.py [--days N] [--dry-run]
+"""
+
+import argparse
+import os
+import re
+from datetime import datetime, timedelta
+
+import util
+from closing_soon import DATE_RE, date_posted_index, parse_date, strip_column
+
+ARCHIVE_FILE = os.path.join(util.SCRIPT_DIR, "..", "..", "ARCHIVE.md")
+
+RETENTION_DAYS = 30
+
+TABLE_RE = re.compile(r"(<!-- (\w+)_TABLE_START -->)(.*?)(<!-- \2_TABLE_END -->)", re.DOTALL)
+HEADING_RE = re.compile(r"^## (.+)$", re.MULTILINE)
+SEP_RE = re.compile(r"^\|\s*-+")
+URL_RE = re.compile(r'href="([^"]+)"')
+ARCHIVED_RE = re.compile(r"Archived (\d{4}-\d{2}-\d{2})")
+CLOSED_MARKERS = ("[CLOSED]", "[DISCONTINUED]")
+
+
+def is_closed(row):
+    status = row.strip().strip("|").split("|")[0]
+    return any(marker in status for marker in CLOSED_MARKERS)
+
+
+def closed_at(row, skip_index, listings_by_url):
+    """Best guess at when a closed row closed, or None."""
+    url_m = URL_RE.search(row)
+    listing = listings_by_url.get(url_m.group(1)) if url_m else None
+    if listing and not listing.get("active", True):
+        return datetime.fromtimestamp(listing["date_updated"], tz=util.PST)
+
+    archived = ARCHIVED_RE.search(row)
+    if archived:
+        return datetime.strptime(archived.group(1), "%Y-%m-%d").replace(tzinfo=util.PST)
+
+    dates = [parse_date(*m.groups()) for m in DATE_RE.finditer(strip_column(row, skip_index))]
+    dates = [d for d in dates if d]
+    return max(dates) if dates else None
+
+
+def split_readme(readme, cutoff, listings_by_url):
+    """Remove rollover rows from README.
+
+    Returns (new_readme, {heading: (header_lines, [rows])}, undated_count).
+    """
+    moved = {}
+    undated = 0
+
+    def replace(m):
+        nonlocal undated
+        body = m.group(3)
+        headings = HEADING_RE.findall(readme, 0, m.start())
+        heading = headings[-1].strip() if headings else m.group(2).title()
+        skip = date_posted_index(body)
+
+        lines = body.split("\n")
+        kept, rows, header = [], [], []
+        for line in lines:
+            if line.startswith("| ") and not SEP_RE.match(line) and "Status |" not in line and is_closed(line):
+                when = closed_at(line, skip, listings_by_url)
+                if when is None:
+                    undated += 1
+                elif when < cutoff:
+                    rows.append(line)
+                    continue
+            elif line.startswith("|") and len(header) < 2:
+                header.append(line)
+            kept.append(line)
+
+        if rows:
+            moved[heading] = (header, rows)
+        return m.group(1) + "\n".join(kept) + m.group(4)
+
+    return TABLE_RE.sub(replace, readme), moved, undated
+
+
+def merge_archive(archive, moved):
+    """Insert moved rows at the top of each matching ARCHIVE.md section table."""
+    lines = archive.split("\n")
+    for heading, (header, rows) in moved.items():
+        try:
+            start = lines.index(f"## {heading}")
+        except ValueError:
+            # New section: append it in the same layout as the others.
+            lines.extend(["", f"## {heading}", "", *header, *rows, "", "---", ""])
+            continue
+
+        end = next((i for i in range(start + 1, len(lines)) if lines[i].startswith("## ")), len(lines))
+        sep = next((i for i in range(start + 1, end) if SEP_RE.match(lines[i])), None)
+        if sep is None:
+            lines[start + 1:start + 1] = ["", *header, *rows]
+        else:
+            lines[sep + 1:sep + 1] = rows
+    return "\n".join(lines)
+
+
+def run(listings, days=RETENTION_DAYS, dry_run=False):
+    """Move rows closed more than `days` ago. Returns (rows moved, closed rows with no date)."""
+    with open(util.README_FILE, "r", encoding="utf-8") as f:
+        readme = f.read()
+    with open(ARCHIVE_FILE, "r", encoding="utf-8") as f:
+        archive = f.read()
+
+    listings_by_url = {l["url"]: l for l in listings}
+    cutoff = datetime.now(tz=util.PST) - timedelta(days=days)
+
+    new_readme, moved, undated = split_readme(readme, cutoff, listings_by_url)
+    total = sum(len(rows) for _, rows in moved.values())
+
+    for heading, (_, rows) in moved.items():
+        print(f"  {heading}: {len(rows)} row(s)")
+    print(f"Rolled over {total} row(s) closed more than {days} days ago; "
+          f"{undated} closed row(s) kept (no close date).")
+
+    if total and not dry_run:
+        new_archive = merge_archive(archive, moved)
+        with open(util.README_FILE, "w", encoding="utf-8") as f:
+            f.write(new_readme)
+        with open(ARCHIVE_FILE, "w", encoding="utf-8") as f:
+            f.write(new_archive)
+        print(f"README.md: {len(readme.encode())} → {len(new_readme.encode())} bytes.")
+    return total, undated
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move long-closed README rows into ARCHIVE.md.")
+    parser.add_argument("--days", type=int, default=RETENTION_DAYS,
+                        help=f"retention window in days (default {RETENTION_DAYS})")
+    parser.add_argument("--dry-run", action="store_true", help="report without writing")
+    args = parser.parse_args()
+
+    total, undated = run(util.get_listings_from_json(), args.days, args.dry_run)
+    util.set_output("rolled_count", total)
+    util.set_output("undated_count", undated)
+
+
+if __name__ == "__main__":
+    main()
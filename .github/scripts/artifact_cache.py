@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+artifact_cache.py — content-addressed cache for rendered outputs.
+
+Rendering is a pure function of three things: the listings (or rows) that
+feed it, the code that renders them, and — for clock-dependent outputs —
+the day. key() hashes exactly those:
+
+  key(label, subset, version(...), bucket)
+
+  subset   the listings/rows an artifact is built from (only those: editing a
+           Scholarship doesn't invalidate the Internships table)
+  version  hash of the rendering modules' source, so a code change is a miss
+  bucket   date_bucket() for outputs that depend on today (closing-soon
+           badges, the digest's 7-day window, lifecycle status); None otherwise
+
+Rendered text is stored under .artifact_cache/ as one file per key, with an
+index of sizes and last-use times. The cache is bounded by MAX_BYTES; when a
+put() goes over, least recently used entries are evicted first.
+
+  table = artifact_cache.cached(artifact_cache.key("table:PROGRAMS", rows, v), lambda: render(rows))
+
+Safe to use from build.py's worker threads. The workflows persist the
+directory with actions/cache, so a second run on the same day with no data
+change renders nothing.
+
+Usage:
+  python artifact_cache.py            # entries, size, hit rate of this process
+  python artifact_cache.py --clear
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from functools import lru_cache
+
+import util
+
+CACHE_DIR = os.path.join(util.SCRIPT_DIR, ".artifact_cache")
+INDEX_FILE = os.path.join(CACHE_DIR, "index.json")
+MAX_BYTES = 32 * 1024 * 1024
+
+_lock = threading.Lock()
+_index = None
+stats = {"hits": 0, "misses": 0, "evicted": 0}
+
+
+@lru_cache(maxsize=None)
+def version(*modules):
+    """Hash of the named modules' source (util.py is always included)."""
+    digest = hashlib.sha256()
+    for module in ("util", *modules):
+        with open(os.path.join(util.SCRIPT_DIR, f"{module}.py"), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def date_bucket(today=None, days=1):
+    """PT date string for `today`, in buckets of `days` days (7 for weekly outputs)."""
+    today = today or datetime.now(util.PST)
+    day = today.toordinal()
+    return datetime.fromordinal(day - day % days).strftime("%Y-%m-%d")
+
+
+def key(label, subset, version, bucket=None):
+    """Content address for an artifact. `subset` is anything JSON-serializable."""
+    digest = hashlib.sha256()
+    for part in (label, version, bucket or ""):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    digest.update(json.dumps(subset, sort_keys=True, ensure_ascii=False).encode())
+    return digest.hexdigest()
+
+
+def _path(k):
+    return os.path.join(CACHE_DIR, k[:2], k)
+
+
+def _load_index():
+    global _index
+    if _index is None:
+        _index = {}
+        if os.path.exists(INDEX_FILE):
+            with open(INDEX_FILE, "r") as f:
+                _index = json.load(f)
+    return _index
+
+
+def _save_index():
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp = INDEX_FILE + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(_index, f, separators=(",", ":"))
+    os.replace(tmp, INDEX_FILE)
+
+
+def get(k):
+    """Cached text for a key, or None."""
+    with _lock:
+        index = _load_index()
+        entry = index.get(k)
+        if entry is None or not os.path.exists(_path(k)):
+            index.pop(k, None)
+            stats["misses"] += 1
+            return None
+        with open(_path(k), "r", encoding="utf-8") as f:
+            content = f.read()
+        entry["used"] = time.time()
+        _save_index()
+        stats["hits"] += 1
+        return content
+
+
+def put(k, content, label=""):
+    """Store text under a key, then evict LRU entries over MAX_BYTES."""
+    with _lock:
+        index = _load_index()
+        path = _path(k)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = content.encode("utf-8")
+        with open(path, "wb") as f:
+            f.write(data)
+        index[k] = {"size": len(data), "used": time.time(), "label": label}
+
+        total = sum(entry["size"] for entry in index.values())
+        for old in sorted(index, key=lambda name: index[name]["used"]):
+            if total <= MAX_BYTES or old == k:
+                break
+            total -= index.pop(old)["size"]
+            if os.path.exists(_path(old)):
+                os.remove(_path(old))
+            stats["evicted"] += 1
+        _save_index()
+
+
+def cached(k, produce, label=""):
+    """Text for a key: from the cache, or produce() and store it."""
+    content = get(k)
+    if content is None:
+        content = produce()
+        put(k, content, label)
+    return content
+
+
+def clear():
+    global _index
+    with _lock:
+        for entry in list(_load_index()):
+            if os.path.exists(_path(entry)):
+                os.remove(_path(entry))
+        _index = {}
+        _save_index()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or clear the rendered-artifact cache.")
+    parser.add_argument("--clear", action="store_true", help="remove every entry")
+    args = parser.parse_args()
+    if args.clear:
+        clear()
+        print("Artifact cache cleared.")
+        return
+    index = _load_index()
+    size = sum(entry["size"] for entry in index.values())
+    print(f"{len(index)} entr{'y' if len(index) == 1 else 'ies'}, {size / 1024:.1f} KiB "
+          f"of {MAX_BYTES / 1024 / 1024:.0f} MiB in {CACHE_DIR}")
+    for k, entry in sorted(index.items(), key=lambda item: -item[1]["used"])[:20]:
+        used = datetime.fromtimestamp(entry["used"], util.PST).strftime("%Y-%m-%d %H:%M")
+        print(f"  {k[:12]}  {entry['size']:>8}  {used}  {entry['label']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,8 @@ Auto-extract opportunity details from a URL using AI.
 
 This script:
 1. Fetches the webpage content
-2. Uses OpenAI API to extract structured data
+2. Extracts structured data — rule-based from JSON-LD / ATS conventions when
+   possible, otherwise with the OpenAI API (see extractors.py)
 3. Adds the opportunity to listings.json
 """
 
@@ -14,6 +15,12 @@ import sys
 import re
 import requests
 from bs4 import BeautifulSoup
+import companies
+import extractors
+import geo
+import issue_forms
+import lifecycle
+import relevance
 import util
 
 # Try to import OpenAI
@@ -24,95 +31,32 @@ except ImportError:
     HAS_OPENAI = False
 
 
-def fetch_page_content(url):
-    """Fetch and parse webpage content."""
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-        "Accept-Language": "en-US,en;q=0.9",
-    }
+class ExtractionError(Exception):
+    """Extraction can't produce a usable listing; the message is shown to the user."""
+
+
+REQUEST_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
 
+
+def fetch_html(url, timeout=30):
+    """GET a page's HTML. Raises requests exceptions, including HTTPError."""
     try:
-        try:
-            response = requests.get(url, headers=headers, timeout=30, allow_redirects=True)
-        except requests.exceptions.SSLError:
-            print(f"SSL verification failed for {url}, retrying without verification...")
-            response = requests.get(url, headers=headers, timeout=30, allow_redirects=True, verify=False)
-        response.raise_for_status()
-
-        soup = BeautifulSoup(response.text, "html.parser")
-
-        # Extract metadata before removing elements
-        meta_description = ""
-        meta_tag = soup.find("meta", attrs={"name": "description"})
-        if meta_tag:
-            meta_description = meta_tag.get("content", "")
-        og_title = ""
-        og_tag = soup.find("meta", attrs={"property": "og:title"})
-        if og_tag:
-            og_title = og_tag.get("content", "")
-        og_desc = ""
-        og_desc_tag = soup.find("meta", attrs={"property": "og:description"})
-        if og_desc_tag:
-            og_desc = og_desc_tag.get("content", "")
-
-        # Extract JSON-LD structured data (many job sites embed this)
-        json_ld_text = ""
-        for script_tag in soup.find_all("script", type="application/ld+json"):
-            try:
-                ld_data = json.loads(script_tag.string or "")
-                json_ld_text = json.dumps(ld_data, indent=2)[:4000]
-            except (json.JSONDecodeError, TypeError):
-                pass
-
-        title_tag = soup.find("title")
-        page_title = title_tag.get_text() if title_tag else og_title
-
-        # Remove non-content elements
-        for el in soup(["script", "style", "nav", "footer", "header", "noscript", "iframe"]):
-            el.decompose()
-
-        text = soup.get_text(separator="\n", strip=True)
-
-        lines = [line.strip() for line in text.splitlines() if line.strip()]
-        text = "\n".join(lines)
-
-        # Prepend metadata for better AI extraction context
-        metadata_parts = []
-        if meta_description:
-            metadata_parts.append(f"Meta Description: {meta_description}")
-        if og_title and og_title != page_title:
-            metadata_parts.append(f"OG Title: {og_title}")
-        if og_desc and og_desc != meta_description:
-            metadata_parts.append(f"OG Description: {og_desc}")
-        if json_ld_text:
-            metadata_parts.append(f"Structured Data:\n{json_ld_text}")
-
-        if metadata_parts:
-            metadata_block = "\n".join(metadata_parts) + "\n\n---\n\n"
-            text = metadata_block + text
-
-        if len(text) > 12000:
-            text = text[:12000] + "\n...[truncated]"
-
-        # If very little text was extracted, the page likely requires JS rendering
-        if len(text.strip()) < 200:
-            text = (
-                f"[Page requires JavaScript to render. Limited content available.]\n"
-                f"URL: {url}\n"
-                f"Page Title: {page_title}\n"
-                f"Meta Description: {meta_description}\n"
-                f"OG Title: {og_title}\n"
-                f"OG Description: {og_desc}\n"
-                f"{text}"
-            )
+        response = requests.get(url, headers=REQUEST_HEADERS, timeout=timeout, allow_redirects=True)
+    except requests.exceptions.SSLError:
+        print(f"SSL verification failed for {url}, retrying without verification...")
+        response = requests.get(url, headers=REQUEST_HEADERS, timeout=timeout, allow_redirects=True, verify=False)
+    response.raise_for_status()
+    return response.text
 
-        return {
-            "text": text,
-            "title": page_title,
-            "url": url
-        }
 
+def fetch_page_content(url):
+    """Fetch and parse webpage content."""
+    try:
+        return parse_page(fetch_html(url), url)
     except Exception as e:
         return {
             "text": f"Error fetching page: {str(e)}",
@@ -122,20 +66,120 @@ def fetch_page_content(url):
         }
 
 
+def parse_page(html, url):
+    """Page text, title and metadata for extraction."""
+    soup = BeautifulSoup(html, "html.parser")
+
+    # Extract metadata before removing elements
+    meta_description = ""
+    meta_tag = soup.find("meta", attrs={"name": "description"})
+    if meta_tag:
+        meta_description = meta_tag.get("content", "")
+    og_title = ""
+    og_tag = soup.find("meta", attrs={"property": "og:title"})
+    if og_tag:
+        og_title = og_tag.get("content", "")
+    og_desc = ""
+    og_desc_tag = soup.find("meta", attrs={"property": "og:description"})
+    if og_desc_tag:
+        og_desc = og_desc_tag.get("content", "")
+
+    # Extract JSON-LD structured data (many job sites embed this). All
+    # blobs are kept for the rule-based extractor; the prompt gets the
+    # JobPosting if there is one, else the last blob.
+    json_ld = []
+    for script_tag in soup.find_all("script", type="application/ld+json"):
+        try:
+            json_ld.append(json.loads(script_tag.string or ""))
+        except (json.JSONDecodeError, TypeError):
+            pass
+    json_ld_text = ""
+    if json_ld:
+        posting = extractors.find_job_posting(json_ld) or json_ld[-1]
+        json_ld_text = json.dumps(posting, indent=2)[:4000]
+
+    title_tag = soup.find("title")
+    page_title = title_tag.get_text() if title_tag else og_title
+
+    # Remove non-content elements
+    for el in soup(["script", "style", "nav", "footer", "header", "noscript", "iframe"]):
+        el.decompose()
+
+    text = soup.get_text(separator="\n", strip=True)
+
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    text = "\n".join(lines)
+
+    # Prepend metadata for better AI extraction context
+    metadata_parts = []
+    if meta_description:
+        metadata_parts.append(f"Meta Description: {meta_description}")
+    if og_title and og_title != page_title:
+        metadata_parts.append(f"OG Title: {og_title}")
+    if og_desc and og_desc != meta_description:
+        metadata_parts.append(f"OG Description: {og_desc}")
+    if json_ld_text:
+        metadata_parts.append(f"Structured Data:\n{json_ld_text}")
+
+    if metadata_parts:
+        metadata_block = "\n".join(metadata_parts) + "\n\n---\n\n"
+        text = metadata_block + text
+
+    # If very little text was extracted, the page likely requires JS rendering
+    if len(text.strip()) < 200:
+        text = (
+            f"[Page requires JavaScript to render. Limited content available.]\n"
+            f"URL: {url}\n"
+            f"Page Title: {page_title}\n"
+            f"Meta Description: {meta_description}\n"
+            f"OG Title: {og_title}\n"
+            f"OG Description: {og_desc}\n"
+            f"{text}"
+        )
+
+    return {
+        "text": text,
+        "title": page_title,
+        "url": url,
+        "json_ld": json_ld,
+    }
+
+
 def extract_with_openai(page_content, additional_notes=""):
     """Use OpenAI to extract structured data from page content."""
+    try:
+        return request_extraction(page_content, additional_notes)
+    except ExtractionError as e:
+        util.fail(str(e))
+    except Exception as e:
+        util.fail(f"OpenAI API error: {str(e)}")
+
+
+def request_extraction(page_content, additional_notes="", timeout=None, budget=relevance.TOKEN_BUDGET):
+    """One model call. Raises ExtractionError, or the client's own API errors.
+
+    The page text is trimmed to its most relevant blocks within `budget`
+    tokens (relevance.py); budget=None sends the first 12,000 chars instead.
+    """
     if not HAS_OPENAI:
-        util.fail("OpenAI library not installed. Run: pip install openai")
+        raise ExtractionError("OpenAI library not installed. Run: pip install openai")
 
     api_key = os.environ.get("OPENAI_API_KEY")
     if not api_key:
-        util.fail(
+        raise ExtractionError(
             "OPENAI_API_KEY environment variable not set. It is populated from "
             "the repository secret named OPEN_AI (see auto_extract.yml)."
         )
 
     client = OpenAI(api_key=api_key)
 
+    if budget is None:
+        page_text = page_content["text"][:relevance.LEGACY_CHAR_LIMIT]
+    else:
+        page_text, stats = relevance.trim(page_content["text"], page_content["title"], budget)
+        print(f"Prompt page text: ~{stats['before_tokens']} -> ~{stats['after_tokens']} tokens "
+              f"(blocks kept: {stats['blocks_kept'] or 'all'})")
+
     prompt = f"""Analyze this job/internship posting and extract the following information.
 This is for a repository tracking UNDERCLASSMEN opportunities (freshman/sophomore students).
 
@@ -144,7 +188,7 @@ URL: {page_content['url']}
 Additional Notes from submitter: {additional_notes}
 
 Page Content:
-{page_content['text']}
+{page_text}
 
 ---
 
@@ -160,6 +204,8 @@ Extract and return a JSON object with these fields:
 - field: For research programs, what field (e.g., "Computer Science", "STEM"). Empty string for non-research.
 - season: "Summer", "Fall", "Winter", "Spring", or "Multiple"
 - sponsorship: "Offers Sponsorship", "Does Not Offer Sponsorship", "U.S. Citizenship Required", or "Not Specified"
+- deadline: The application deadline as written, formatted like "Oct 15, 2026" when a date is given. Use "Rolling" if applications are rolling, or "Check site" if no deadline is stated.
+- opens: If applications are not open yet, the date they open, formatted like "Sep 1, 2026". Empty string otherwise.
 - is_underclassmen: true if this opportunity is open to or targeted at freshmen/sophomores, false only if it explicitly requires juniors/seniors/graduates
 
 For is_underclassmen: set to true if the posting mentions freshmen, sophomores, first-year, second-year, underclassmen, "all class years", or does NOT specify a class year requirement. Only set to false if the posting explicitly requires junior, senior, or graduate standing.
@@ -168,76 +214,38 @@ If the page content is limited (JavaScript-rendered page), do your best to extra
 
 Return ONLY valid JSON, no other text."""
 
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant that extracts structured data from job postings. Return only valid JSON."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.1,
-            max_tokens=1000
-        )
+    response = client.chat.completions.create(
+        model="gpt-4o-mini",
+        messages=[
+            {"role": "system", "content": "You are a helpful assistant that extracts structured data from job postings. Return only valid JSON."},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.1,
+        max_tokens=1000,
+        timeout=timeout,
+    )
 
-        result_text = response.choices[0].message.content.strip()
+    result_text = response.choices[0].message.content.strip()
 
-        # Clean up markdown code blocks if present
-        if result_text.startswith("```"):
-            result_text = re.sub(r"^```json?\n?", "", result_text)
-            result_text = re.sub(r"\n?```$", "", result_text)
+    # Clean up markdown code blocks if present
+    if result_text.startswith("```"):
+        result_text = re.sub(r"^```json?\n?", "", result_text)
+        result_text = re.sub(r"\n?```$", "", result_text)
 
+    try:
         return json.loads(result_text)
-
     except json.JSONDecodeError as e:
-        util.fail(f"Failed to parse AI response as JSON: {e}\nResponse: {result_text}")
-    except Exception as e:
-        util.fail(f"OpenAI API error: {str(e)}")
-
-
-def parse_issue_body(body):
-    """Parse the issue body to get URL and notes."""
-    lines = body.strip().split("\n")
-    data = {}
-
-    current_field = None
-    current_value = []
-
-    for line in lines:
-        if line.startswith("### "):
-            if current_field and current_value:
-                data[current_field] = "\n".join(current_value).strip()
-            # Convert "Link to Opportunity" -> "link_to_opportunity"
-            current_field = line[4:].strip().lower().replace(" ", "_").replace("?", "").replace("(", "").replace(")", "")
-            current_value = []
-        elif current_field:
-            if line.strip() and line.strip() != "_No response_":
-                current_value.append(line)
-
-    if current_field and current_value:
-        data[current_field] = "\n".join(current_value).strip()
-
-    return data
+        raise ExtractionError(f"Failed to parse AI response as JSON: {e}\nResponse: {result_text}")
 
 
 def extract_url_from_body(body):
     """Try multiple methods to extract URL from issue body."""
     # Method 1: Parse structured fields
-    data = parse_issue_body(body)
-
-    # Try various field names
-    url_fields = [
-        "link_to_opportunity",
-        "link",
-        "url",
-        "link_to_opportunity_posting",
-        "application_link"
-    ]
-
-    for field in url_fields:
-        if field in data and data[field]:
-            url = data[field].strip()
-            if url.startswith("http"):
-                return url, data
+    data = issue_forms.parse(body)
+
+    url = data.get("url", "")
+    if url.startswith("http"):
+        return url, data
 
     # Method 2: Find any URL in the body
     url_pattern = r'https?://[^\s<>"\')\]]+'
@@ -248,65 +256,25 @@ def extract_url_from_body(body):
     return None, data
 
 
-def main():
-    if len(sys.argv) < 2:
-        util.fail("Missing event data file path")
-
-    event_path = sys.argv[1]
-
-    print(f"Reading event from: {event_path}")
-
-    with open(event_path, "r") as f:
-        event = json.load(f)
-
-    issue = event.get("issue", {})
-    body = issue.get("body", "")
-    username = issue.get("user", {}).get("login", "unknown")
-
-    print(f"Issue body:\n{body}\n")
-
-    # Extract URL from body
-    url, data = extract_url_from_body(body)
-
-    if not url:
-        util.fail("No URL found in issue body. Please make sure to include a valid URL.")
-
-    url = util.clean_url(url)
-    print(f"Extracted URL: {url}")
-
-    notes = data.get("any_additional_context_optional", "") or data.get("notes", "")
-
-    print(f"Fetching content from: {url}")
+def build_listing(extracted, url, username):
+    """Validate extracted fields and build the listing.
 
-    # Fetch page content
-    page_content = fetch_page_content(url)
-
-    if "error" in page_content:
-        util.fail(f"Failed to fetch page: {page_content['error']}")
-
-    print(f"Page title: {page_content['title']}")
-    print(f"Content length: {len(page_content['text'])} chars")
-    print("Extracting details with AI...")
-
-    # Extract with AI
-    extracted = extract_with_openai(page_content, notes)
-
-    print(f"Extracted: {json.dumps(extracted, indent=2)}")
-
-    # Validate extracted data
+    Returns (listing, warning message or ""). Raises ExtractionError when the
+    extraction isn't usable.
+    """
     company_name = extracted.get("company_name", "").strip()
     title = extracted.get("title", "").strip()
     locations = extracted.get("locations", [])
     category = extracted.get("category", "")
 
     if not company_name or company_name == "Unknown":
-        util.fail("AI extraction failed: could not determine the company name. Please use the Quick Add template instead.")
+        raise ExtractionError("AI extraction failed: could not determine the company name. Please use the Quick Add template instead.")
     if not title or title == "Unknown":
-        util.fail("AI extraction failed: could not determine the role/program title. Please use the Quick Add template instead.")
+        raise ExtractionError("AI extraction failed: could not determine the role/program title. Please use the Quick Add template instead.")
     if not isinstance(locations, list) or len(locations) == 0:
         locations = ["Multiple Locations"]
     if category not in util.VALID_CATEGORIES:
-        util.fail(f"AI extraction returned invalid category '{category}'. Expected one of: {util.VALID_CATEGORIES}. Please use the Quick Add template instead.")
+        raise ExtractionError(f"AI extraction returned invalid category '{category}'. Expected one of: {util.VALID_CATEGORIES}. Please use the Quick Add template instead.")
 
     # Sanitize locations — remove any that look like URLs or HTML
     clean_locations = []
@@ -316,41 +284,24 @@ def main():
             clean_locations.append(loc)
     if not clean_locations:
         clean_locations = ["Multiple Locations"]
-    locations = clean_locations
+    locations, location_keys = geo.canonicalize(clean_locations)
+    company_name, company_key = companies.canonicalize(company_name, url)
 
     # Warn if not confirmed as underclassmen-specific, but still proceed
     # since a maintainer already approved the issue
     warning_msg = ""
     if not extracted.get("is_underclassmen", False):
         warning_msg = "AI did not confirm this is specifically for underclassmen. A maintainer approved it, so it was added anyway. Please verify and remove if incorrect."
-        print(f"WARNING: {warning_msg}")
-
-    # Check for duplicates (by URL or by company+title)
-    listings = util.get_listings_from_json()
-    for listing in listings:
-        if listing["url"] == url:
-            util.set_output("is_duplicate", "true")
-            util.set_output("duplicate_id", listing["id"])
-            util.set_output("duplicate_reason", f"This URL already exists in the repository")
-            util.set_output("commit_message", "")
-            print(f"DUPLICATE DETECTED: URL already exists (ID: {listing['id']})")
-            sys.exit(0)
-        if (listing["company_name"].lower() == company_name.lower() and
-                listing["title"].lower() == title.lower()):
-            util.set_output("is_duplicate", "true")
-            util.set_output("duplicate_id", listing["id"])
-            util.set_output("duplicate_reason", f"'{company_name} - {title}' already exists in the repository")
-            util.set_output("commit_message", "")
-            print(f"DUPLICATE DETECTED: {company_name} - {title} already exists (ID: {listing['id']})")
-            sys.exit(0)
 
     # Create the listing
     new_listing = {
         "id": util.generate_uuid(),
         "company_name": company_name,
+        "company_key": company_key,
         "title": title,
         "url": url,
         "locations": locations,
+        "location_keys": location_keys,
         "season": extracted.get("season", "Summer"),
         "category": category,
         "opportunity_type": extracted.get("opportunity_type", "Internship"),
@@ -367,9 +318,95 @@ def main():
     if category == "Research" and extracted.get("field"):
         new_listing["field"] = extracted["field"]
 
+    # Add deadline text and its parsed timestamps, then the initial status
+    deadline = (extracted.get("deadline") or "").strip()
+    if deadline:
+        new_listing["deadline"] = deadline
+    new_listing.update(lifecycle.parse_deadline_fields(deadline, extracted.get("opens", "")))
+    lifecycle.set_status(new_listing, new_listing["date_posted"])
+    return new_listing, warning_msg
+
+
+def find_duplicate(listings, url, company_name, title):
+    """(existing listing, reason) for a duplicate by URL or company + title, else (None, None)."""
+    listing = util.find_listing_by_url(listings, url)
+    if listing:
+        return listing, "This URL already exists in the repository"
+    for listing in util.find_listings_by_name(listings, company_name, title, url):
+        return listing, f"'{company_name} - {title}' already exists in the repository"
+    return None, None
+
+
+def main():
+    if len(sys.argv) < 2:
+        util.fail("Missing event data file path")
+
+    event_path = sys.argv[1]
+
+    print(f"Reading event from: {event_path}")
+
+    with open(event_path, "r") as f:
+        event = json.load(f)
+
+    issue = event.get("issue", {})
+    body = issue.get("body", "")
+    username = issue.get("user", {}).get("login", "unknown")
+
+    print(f"Issue body:\n{body}\n")
+
+    # Extract URL from body
+    url, data = extract_url_from_body(body)
+
+    if not url:
+        util.fail("No URL found in issue body. Please make sure to include a valid URL.")
+
+    url = util.clean_url(url)
+    print(f"Extracted URL: {url}")
+
+    notes = data.get("notes", "")
+
+    print(f"Fetching content from: {url}")
+
+    # Fetch page content
+    page_content = fetch_page_content(url)
+
+    if "error" in page_content:
+        util.fail(f"Failed to fetch page: {page_content['error']}")
+
+    print(f"Page title: {page_content['title']}")
+    print(f"Content length: {len(page_content['text'])} chars")
+    print("Extracting details...")
+
+    # Rules first (JSON-LD / ATS conventions); the model only when they miss
+    extracted, backend = extractors.extract(page_content, notes, [
+        ("rules", extractors.extract_rules),
+        ("openai", extract_with_openai),
+    ])
+    extractors.save_metrics()
+    util.set_output("extractor_backend", backend)
+
+    print(f"Extracted with {backend}: {json.dumps(extracted, indent=2)}")
+
+    try:
+        new_listing, warning_msg = build_listing(extracted, url, username)
+    except ExtractionError as e:
+        util.fail(str(e))
+    if warning_msg:
+        print(f"WARNING: {warning_msg}")
+
+    # Check for duplicates (by URL or by company+title)
+    listings = util.get_listings_from_json()
+    duplicate, reason = find_duplicate(listings, url, new_listing["company_name"], new_listing["title"])
+    if duplicate:
+        util.set_output("is_duplicate", "true")
+        util.set_output("duplicate_id", duplicate["id"])
+        util.set_output("duplicate_reason", reason)
+        util.set_output("commit_message", "")
+        print(f"DUPLICATE DETECTED: {reason} (ID: {duplicate['id']})")
+        sys.exit(0)
+
     # Save
-    listings.append(new_listing)
-    util.save_listings_to_json(listings)
+    util.save_listings_to_json([new_listing])
 
     # Set outputs
     company = new_listing["company_name"]
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+bench_storage.py — compare the listings storage backends on synthetic data.
+
+Generates N listings in a temp directory and times the operations the scripts
+actually perform, through the util API, for each backend (json, sharded,
+sqlite):
+
+  - full load, single-section load
+  - duplicate check by URL and by company + title
+  - adding one listing, closing one listing
+
+Usage:
+  python bench_storage.py [--listings N] [--lookups N]
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+
+import sharded_store
+import sqlite_store
+import util
+
+BACKENDS = ("json", "sharded", "sqlite")
+SEASONS = ["Summer", "Fall", "Winter", "Spring", "Multiple"]
+
+
+def synthetic_listings(n, seed=0):
+    rng = random.Random(seed)
+    base = 1_700_000_000
+    listings = []
+    for i in range(n):
+        listings.append({
+            "id": f"bench-{i:07d}",
+            "company_name": f"Company {rng.randrange(n // 4 + 1)}",
+            "title": f"Role {i}",
+            "url": f"https://example.com/jobs/{i}",
+            "locations": ["Remote"],
+            "season": rng.choice(SEASONS),
+            "category": rng.choice(util.VALID_CATEGORIES),
+            "opportunity_type": "Internship",
+            "target_year": ["Freshman (1st year)", "Sophomore (2nd year)"],
+            "sponsorship": "Not Specified",
+            "active": rng.random() < 0.3,
+            "is_visible": True,
+            "date_posted": base + i * 3600,
+            "date_updated": base + i * 3600,
+            "source": "bench",
+        })
+    return listings
+
+
+def use_backend(backend, workdir):
+    """Point util and the store modules at a fresh copy of the data in workdir."""
+    util.LISTINGS_BACKEND = backend
+    util.LISTINGS_FILE = os.path.join(workdir, "listings.json")
+    sharded_store.SHARDS_DIR = os.path.join(workdir, "listings")
+    sharded_store.MANIFEST_FILE = os.path.join(sharded_store.SHARDS_DIR, "manifest.json")
+    sharded_store._loaded.clear()
+    sqlite_store.DB_FILE = os.path.join(workdir, "listings.db")
+    sqlite_store._connection = None
+
+
+def timed(fn, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def bench(backend, listings, lookups):
+    workdir = tempfile.mkdtemp(prefix=f"bench-{backend}-")
+    try:
+        use_backend(backend, workdir)
+        with open(util.LISTINGS_FILE, "w") as f:
+            json.dump(listings, f)
+        setup_ms, _ = timed({
+            "json": lambda: None,
+            "sharded": lambda: sharded_store.save(listings),
+            "sqlite": sqlite_store.connect,
+        }[backend])
+
+        results = {"setup": setup_ms}
+        results["load all"], loaded = timed(util.get_listings_from_json)
+        results["load section"], _ = timed(lambda: util.get_listings_from_json(categories=["Research"]))
+
+        probe = [listings[random.randrange(len(listings))] for _ in range(lookups)]
+        ms, _ = timed(lambda: [util.find_listing_by_url(loaded, p["url"]) for p in probe])
+        results[f"{lookups} url lookups"] = ms
+        ms, _ = timed(lambda: [util.find_listings_by_name(loaded, p["company_name"], p["title"]) for p in probe])
+        results[f"{lookups} name lookups"] = ms
+
+        new = dict(listings[0], id="bench-new", url="https://example.com/new", date_posted=2_000_000_000)
+        results["add one"], _ = timed(lambda: util.save_listings_to_json([new]))
+        closed = dict(listings[1], active=False)
+        results["close one"], _ = timed(lambda: util.save_listings_to_json([closed]))
+        return results
+    finally:
+        if sqlite_store._connection is not None:
+            sqlite_store._connection.close()
+            sqlite_store._connection = None
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark listings storage backends.")
+    parser.add_argument("--listings", type=int, default=10_000)
+    parser.add_argument("--lookups", type=int, default=200)
+    args = parser.parse_args()
+
+    listings = synthetic_listings(args.listings)
+    table = {backend: bench(backend, listings, args.lookups) for backend in BACKENDS}
+
+    ops = list(table[BACKENDS[0]])
+    print(f"{args.listings} listings (times in ms)\n")
+    print(f"| {'operation':<18} | " + " | ".join(f"{b:>9}" for b in BACKENDS) + " |")
+    print(f"| {'-' * 18} | " + " | ".join("-" * 9 for _ in BACKENDS) + " |")
+    for op in ops:
+        print(f"| {op:<18} | " + " | ".join(f"{table[b][op]:>9.1f}" for b in BACKENDS) + " |")
+
+
+if __name__ == "__main__":
+    main()
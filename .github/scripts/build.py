@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+build.py — every generated output from one listings load.
+
+The README tables, closing-soon badges, ARCHIVE rollover, digest, JSON
+export and feeds each used to load and parse listings.json on their own.
+This loads it once and runs them as stages of a small dependency graph:
+
+  readme        README tables, readme_rows.json, facets.json  (update_readmes)
+  closing_soon  CLOSING SOON badges in README.md       after readme
+  rollover      long-closed rows → ARCHIVE.md           after closing_soon
+  digest        digest.md and digest/                   after rollover
+  export        web/public/listings.json
+  feeds         feeds/feed.json, feeds/atom.xml
+  analytics     analytics.json (lifetimes, time to close, postings per week)
+
+Stages whose dependencies are done run in parallel. A dependency that isn't
+selected counts as done, so `--stages digest` runs just the digest. They all
+share one read-only copy of the listings (freeze()): a stage that tried to
+modify a listing would otherwise race with the others. Sharing one object
+also lets stages share the indexes built over it (listing_index.index_for).
+
+Each stage is cached by input hash: its code (the stage's modules and
+util.py), the listings, the files it reads and writes, and — for stages
+that depend on the date — today's date in PT. The hash is taken again after
+the stage runs and stored in build_cache.json, so the next build skips the
+stage until one of those changes. (Every stage is idempotent: run again on
+its own output, it changes nothing.) Only the code, listings and day are the
+same before and after a run, so a stage changed its files exactly when the two
+hashes differ; that is what the has_changes output reports.
+
+The readme stage is not selected by default while update_readmes.yml is
+disarmed; pass it in --stages to include it.
+
+Usage:
+  python build.py                              # default stages
+  python build.py --stages readme,closing_soon # only these
+  python build.py --force                      # ignore the cache
+  python build.py --list                       # show the graph and cache state
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+
+import analytics
+import archive_rollover
+import closing_soon
+import facets
+import feeds
+import history
+import lifecycle
+import update_readmes
+import util
+import weekly_digest
+
+CACHE_FILE = os.path.join(util.SCRIPT_DIR, "build_cache.json")
+ROOT = os.path.normpath(os.path.join(util.SCRIPT_DIR, "..", ".."))
+EXPORT_FILE = os.path.join(ROOT, "web", "public", "listings.json")
+
+# Fields the export leaves out: internal bookkeeping, not listing data.
+EXPORT_EXCLUDE = {"is_visible", "location_keys", "company_key"}
+
+Stage = namedtuple("Stage", "name deps modules files daily run")
+
+
+class ReadOnlyListing(dict):
+    """A listing that stages can read but not modify (see freeze())."""
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("listings are read-only during a build; copy the listing to change it")
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _read_only
+
+
+def freeze(value):
+    """Read-only copy of loaded listings: dicts become ReadOnlyListing, lists tuples."""
+    if isinstance(value, dict):
+        return ReadOnlyListing((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def export(listings):
+    """Write the visible listings, sorted, with their current status, as JSON."""
+    visible = util.sort_listings([l for l in listings if l.get("is_visible", True)])
+
+    now = int(time.time())
+    rows = []
+    for listing in visible:
+        row = {k: v for k, v in listing.items() if k not in EXPORT_EXCLUDE}
+        row["status"] = lifecycle.status_at(listing, now)
+        rows.append(row)
+    content = json.dumps(rows, indent=2, ensure_ascii=False) + "\n"
+    os.makedirs(os.path.dirname(EXPORT_FILE), exist_ok=True)
+    if not util.write_if_changed(EXPORT_FILE, content):
+        return 0
+    print(f"Exported {len(visible)} listing(s) to {os.path.relpath(EXPORT_FILE, ROOT)}.")
+    return len(visible)
+
+
+STAGES = [
+    Stage("readme", [], ["update_readmes", "tables", "facets", "companies", "geo", "artifact_cache"],
+          [util.README_FILE, update_readmes.ROWS_FILE, facets.facets_file()],
+          False, update_readmes.render),
+    Stage("closing_soon", ["readme"], ["closing_soon", "artifact_cache"],
+          [closing_soon.README],
+          True, lambda listings: closing_soon.run()),
+    Stage("rollover", ["closing_soon"], ["archive_rollover", "closing_soon"],
+          [util.README_FILE, archive_rollover.ARCHIVE_FILE],
+          True, archive_rollover.run),
+    Stage("digest", ["rollover"], ["weekly_digest", "geo", "listing_index", "artifact_cache"],
+          [weekly_digest.README, weekly_digest.DIGEST, weekly_digest.DIGEST_DIR],
+          True, weekly_digest.run),
+    Stage("export", [], ["build", "lifecycle"],
+          [EXPORT_FILE],
+          True, export),
+    Stage("feeds", [], ["feeds", "geo"],
+          [feeds.FEEDS_DIR],
+          False, feeds.run),
+    Stage("analytics", [], ["analytics", "history", "closing_soon", "companies"],
+          [analytics.ANALYTICS_FILE, history.INDEX_FILE],
+          True, analytics.run),
+]
+STAGES_BY_NAME = {stage.name: stage for stage in STAGES}
+DEFAULT_STAGES = [stage.name for stage in STAGES if stage.name != "readme"]
+
+
+# ---------------------------------------------------------------------------
+# Input hashing
+# ---------------------------------------------------------------------------
+
+def hash_path(digest, path):
+    """Feed a file, or every file under a directory, into a running hash."""
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            hash_path(digest, os.path.join(path, name))
+        return
+    digest.update(os.path.relpath(path, ROOT).encode())
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    else:
+        digest.update(b"\0missing")
+
+
+def stage_key(stage, listings_hash, today):
+    digest = hashlib.sha256()
+    for module in ["util", *stage.modules]:
+        hash_path(digest, os.path.join(util.SCRIPT_DIR, f"{module}.py"))
+    digest.update(listings_hash.encode())
+    for path in stage.files:
+        hash_path(digest, path)
+    if stage.daily:
+        digest.update(today.encode())
+    return digest.hexdigest()
+
+
+def load_cache():
+    if not os.path.exists(CACHE_FILE):
+        return {}
+    with open(CACHE_FILE, "r") as f:
+        return json.load(f)
+
+
+def save_cache(cache):
+    with open(CACHE_FILE, "w") as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+
+
+# ---------------------------------------------------------------------------
+# Scheduling
+# ---------------------------------------------------------------------------
+
+def build(names, force=False, workers=4):
+    """Run the named stages in dependency order.
+
+    Returns {stage: "changed" | "unchanged" | "skipped"}: whether a stage that
+    ran wrote any change to its files, or was skipped from the cache.
+    """
+    unknown = [name for name in names if name not in STAGES_BY_NAME]
+    if unknown:
+        raise ValueError(f"unknown stage(s): {', '.join(unknown)}")
+
+    start = time.perf_counter()
+    listings = util.get_listings_from_json()
+    util.check_schema(listings)
+    listings_hash = hashlib.sha256(json.dumps(listings, sort_keys=True).encode()).hexdigest()
+    listings = freeze(listings)
+    today = datetime.now(util.PST).strftime("%Y-%m-%d")
+    print(f"Loaded {len(listings)} listing(s) in {(time.perf_counter() - start) * 1000:.0f} ms.")
+
+    cache = load_cache()
+    selected = [stage for stage in STAGES if stage.name in names]
+    pending = {stage.name: {dep for dep in stage.deps if dep in names} for stage in selected}
+    results, running = {}, {}
+
+    def execute(stage):
+        key = stage_key(stage, listings_hash, today)
+        if not force and cache.get(stage.name) == key:
+            return "skipped", None, 0
+        began = time.perf_counter()
+        stage.run(listings)
+        after = stage_key(stage, listings_hash, today)
+        return "changed" if after != key else "unchanged", after, (time.perf_counter() - began) * 1000
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while pending or running:
+            for name in [n for n, deps in pending.items() if not deps]:
+                del pending[name]
+                running[pool.submit(execute, STAGES_BY_NAME[name])] = name
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                outcome, key, ms = future.result()
+                results[name] = outcome
+                if key:
+                    cache[name] = key
+                    save_cache(cache)
+                print(f"  {name}: {outcome}" + (f" ({ms:.0f} ms)" if outcome != "skipped" else ""))
+                for deps in pending.values():
+                    deps.discard(name)
+
+    print(f"Build finished in {(time.perf_counter() - start) * 1000:.0f} ms.")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the render stages from one listings load.")
+    parser.add_argument("--stages", help=f"comma-separated stages (default {','.join(DEFAULT_STAGES)})")
+    parser.add_argument("--force", action="store_true", help="run every selected stage, ignoring the cache")
+    parser.add_argument("--list", action="store_true", help="show the stages and which are cached")
+    args = parser.parse_args()
+
+    names = args.stages.split(",") if args.stages else DEFAULT_STAGES
+    if args.list:
+        cache = load_cache()
+        for stage in STAGES:
+            mark = "*" if stage.name in DEFAULT_STAGES else " "
+            deps = f" after {', '.join(stage.deps)}" if stage.deps else ""
+            state = "cached" if stage.name in cache else "not built"
+            print(f"{mark} {stage.name:<13}{deps:<20} {state}")
+        return
+
+    try:
+        results = build(names, force=args.force)
+    except Exception as e:
+        util.fail(str(e))
+
+    ran = [name for name, outcome in results.items() if outcome != "skipped"]
+    changed = [name for name, outcome in results.items() if outcome == "changed"]
+    skipped = [name for name, outcome in results.items() if outcome == "skipped"]
+    util.set_output("ran", ",".join(ran))
+    util.set_output("changed", ",".join(changed))
+    util.set_output("skipped", ",".join(skipped))
+    util.set_output("has_changes", "true" if changed else "false")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+bulk_import.py — add many listings at once from a CSV or JSONL file.
+
+Rows are streamed one at a time. Each row is normalized the same way an
+approved issue is (util.clean_url, util.split_locations, the same defaults as
+contribution_approved.handle_new_opportunity), validated against
+util.REQUIRED_FIELDS, and de-duplicated against an in-memory index of the
+existing listings plus the rows already accepted from this file — by URL and
+by company (canonicalized with companies.canonicalize, so "Google LLC" and
+"google" are one company) + title. Everything accepted is saved in a single write at the end.
+
+Recognised columns / keys (only company_name, title and url are required):
+  company_name, title, url, locations, category, opportunity_type, field,
+  season, target_year, sponsorship, active, deadline, opens, source
+
+`locations` and `target_year` may be lists (JSONL) or strings; location
+strings are split on ; | or newline and keyed with geo.canonicalize,
+target years are split on commas.
+
+Usage:
+  python bulk_import.py partners.csv [--source NAME] [--dry-run]
+  python bulk_import.py partners.jsonl
+"""
+
+import argparse
+import csv
+import json
+import os
+
+import companies
+import geo
+import lifecycle
+import util
+
+DEFAULT_OPPORTUNITY_TYPES = {
+    "Internship": "Internship",
+    "Program": "Fellowship",
+    "Research": "Research",
+    "Scholarship": "Scholarship",
+}
+DEFAULT_TARGET_YEAR = ["Freshman (1st year)", "Sophomore (2nd year)"]
+FALSE_VALUES = {"false", "no", "0", "n"}
+
+
+def read_rows(path):
+    """Yield (location, row) from a CSV or JSONL file without loading it all.
+
+    A JSONL line that isn't valid JSON yields (location, None); normalize()
+    reports it (and any other non-object row) as skipped.
+    """
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError:
+                    row = None
+                yield f"line {line_number}", row
+        else:
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield f"line {reader.line_num}", row
+
+
+def as_list(value, split):
+    if isinstance(value, list):
+        return [str(v).strip() for v in value if str(v).strip()]
+    return split(value or "")
+
+
+def normalize(row, source, now):
+    """Build a listing from a raw row. Returns (listing, None) or (None, reason)."""
+    if row is None:
+        return None, "invalid JSON"
+    if not isinstance(row, dict):
+        return None, f"expected an object, got {type(row).__name__}"
+    company_name = str(row.get("company_name") or "").strip()
+    title = str(row.get("title") or "").strip()
+    raw_url = str(row.get("url") or "").strip()
+    if not company_name:
+        return None, "missing company_name"
+    if not title:
+        return None, "missing title"
+    if not raw_url:
+        return None, "missing url"
+
+    category = str(row.get("category") or "Internship").strip()
+    for valid in util.VALID_CATEGORIES:
+        if valid in category:
+            category = valid
+            break
+    if category not in util.VALID_CATEGORIES:
+        return None, f"invalid category {category!r}"
+
+    company_name, company_key = companies.canonicalize(company_name, raw_url)
+    locations, location_keys = geo.canonicalize(
+        as_list(row.get("locations") or row.get("location"), util.split_locations)
+    )
+
+    active = row.get("active", True)
+    if isinstance(active, str):
+        active = active.strip().lower() not in FALSE_VALUES
+
+    listing = {
+        "id": util.generate_uuid(),
+        "company_name": company_name,
+        "company_key": company_key,
+        "title": title,
+        "url": util.clean_url(raw_url),
+        "locations": locations,
+        "location_keys": location_keys,
+        "season": str(row.get("season") or "Summer").strip(),
+        "category": category,
+        "opportunity_type": str(row.get("opportunity_type") or DEFAULT_OPPORTUNITY_TYPES[category]).strip(),
+        "target_year": as_list(
+            row.get("target_year"),
+            lambda s: [y.strip() for y in s.split(",") if y.strip()],
+        ) or list(DEFAULT_TARGET_YEAR),
+        "sponsorship": str(row.get("sponsorship") or "Not Specified").strip(),
+        "active": bool(active),
+        "is_visible": True,
+        "date_posted": now,
+        "date_updated": now,
+        "source": str(row.get("source") or source).strip(),
+    }
+
+    if category == "Research" and row.get("field"):
+        listing["field"] = str(row["field"]).strip()
+
+    deadline = str(row.get("deadline") or "").strip()
+    if deadline:
+        listing["deadline"] = deadline
+    listing.update(lifecycle.parse_deadline_fields(deadline, str(row.get("opens") or "")))
+    lifecycle.set_status(listing, now)
+
+    try:
+        util.check_schema([listing])
+    except ValueError as e:
+        return None, str(e)
+    return listing, None
+
+
+def name_key(listing):
+    return (companies.listing_key(listing), listing["title"].lower())
+
+
+def import_rows(rows, existing, source, now):
+    """Normalize and de-duplicate (location, row) pairs against existing listings.
+
+    Returns (added listings, [(location, reason)] skipped,
+    [(location, name, matching id)] duplicates). A malformed row is skipped
+    with its reason; it never aborts the import.
+    """
+    by_url = {l["url"]: l["id"] for l in existing}
+    by_name = {name_key(l): l["id"] for l in existing}
+    added, skipped, duplicates = [], [], []
+    for where, row in rows:
+        try:
+            listing, reason = normalize(row, source, now)
+        except (AttributeError, TypeError, ValueError) as e:
+            listing, reason = None, f"malformed row ({e})"
+        if listing is None:
+            skipped.append((where, reason))
+            continue
+        match = by_url.get(listing["url"]) or by_name.get(name_key(listing))
+        if match:
+            duplicates.append((where, f"{listing['company_name']} — {listing['title']}", match))
+            continue
+        by_url[listing["url"]] = listing["id"]
+        by_name[name_key(listing)] = listing["id"]
+        added.append(listing)
+    return added, skipped, duplicates
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-import listings from CSV or JSONL.")
+    parser.add_argument("path", help="CSV or JSONL (.jsonl / .ndjson) file")
+    parser.add_argument("--source", default="bulk_import",
+                        help="value for `source` when a row doesn't set one")
+    parser.add_argument("--dry-run", action="store_true", help="validate and report without saving")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.path):
+        util.fail(f"No such file: {args.path}")
+
+    existing = util.get_listings_from_json()
+    added, skipped, duplicates = import_rows(read_rows(args.path), existing, args.source,
+                                             util.get_current_timestamp())
+
+    if added and not args.dry_run:
+        util.save_listings_to_json(added)
+
+    print(f"{'Would add' if args.dry_run else 'Added'} {len(added)} listing(s), "
+          f"skipped {len(skipped)} invalid row(s), {len(duplicates)} duplicate(s).")
+    for where, reason in skipped:
+        print(f"  SKIP  {where}: {reason}")
+    for where, name, match in duplicates:
+        print(f"  DUP   {where}: {name} (matches {match})")
+
+    util.set_output("added_count", len(added))
+    util.set_output("skipped_count", len(skipped))
+    util.set_output("duplicate_count", len(duplicates))
+    if added and not args.dry_run:
+        util.set_output("commit_message", f"Bulk import {len(added)} listing(s) from {os.path.basename(args.path)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,14 +10,18 @@ For each row with status ✅ [OPEN] or 🔥 [CLOSING SOON]:
   - If unparseable / past / Rolling / Check site: leave alone
 
 [OPENS SOON] and [CLOSED] rows are never modified.
-Idempotent — safe to run daily.
+Idempotent — safe to run daily. The result is cached per README content and
+day (artifact_cache.py), so a repeat run the same day doesn't re-scan.
 """
 
+import json
 import os
 import re
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
+import artifact_cache
+
 PST = ZoneInfo("America/Los_Angeles")
 README = os.path.join(os.path.dirname(__file__), "..", "..", "README.md")
 
@@ -123,25 +127,38 @@ def process_table_body(body: str, today: datetime):
     return "\n".join(lines), changed
 
 
-def main():
+def run(today=None):
+    """Flip badges in README.md. Returns the number of rows updated."""
     with open(README, "r") as f:
         content = f.read()
 
-    today = datetime.now(tz=PST)
-    total = 0
+    today = today or datetime.now(tz=PST)
+
+    def flip():
+        total = 0
 
-    def replace(m):
-        nonlocal total
-        new_body, n = process_table_body(m.group(2), today)
-        total += n
-        return m.group(1) + new_body + m.group(3)
+        def replace(m):
+            nonlocal total
+            new_body, n = process_table_body(m.group(2), today)
+            total += n
+            return m.group(1) + new_body + m.group(3)
 
-    new_content = TABLE_RE.sub(replace, content)
+        return json.dumps({"content": TABLE_RE.sub(replace, content), "total": total})
+
+    # Same README on the same day always flips the same rows
+    cache_key = artifact_cache.key("closing_soon", content, artifact_cache.version("closing_soon"),
+                                   artifact_cache.date_bucket(today))
+    result = json.loads(artifact_cache.cached(cache_key, flip, "closing_soon"))
+    new_content, total = result["content"], result["total"]
 
     if new_content != content:
         with open(README, "w") as f:
             f.write(new_content)
+    return total
+
 
+def main():
+    total = run()
     print(f"Updated {total} row(s).")
     gh_out = os.environ.get("GITHUB_OUTPUT")
     if gh_out:
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+companies.py — canonical company names and a company -> listing-id index.
+
+"Google", "Google LLC" and "google" are one company; so are "JP Morgan
+Chase" and "JPMorgan Chase & Co.". canonicalize() maps a company name (and
+the posting URL) to a display name and a company key:
+
+  1. The name is reduced to a slug: lowercase ASCII letters and digits, with
+     a leading "The" and trailing legal suffixes (Inc, LLC, Ltd, Corp, Co,
+     Company, ...) dropped.  "JPMorgan Chase & Co." -> "jpmorganchase"
+  2. Slugs in the alias table (KNOWN) map to that company's canonical name:
+     "amex" -> American Express, "facebook" -> Meta.
+  3. Otherwise the posting URL's domain is used when it backs the name up.
+     The domain label is the registrable domain ("withgoogle" for
+     summerofcode.withgoogle.com) or, on applicant-tracking hosts, the
+     employer's tenant ("aexp" for aexp.eightfold.ai, "anthropic" for
+     job-boards.greenhouse.io/anthropic/...). If the label belongs to a known
+     company whose name or alias starts the slug ("Amex Scholars" on
+     aexp.eightfold.ai), the listing is that company's; if an unknown label
+     starts the slug ("Acme Robotics" on acme.com), the key is the label. A
+     sponsor's name on someone else's site ("Microsoft" on
+     scholarshipamerica.org) never matches, so the name wins.
+
+Listings get both at ingest time (contribution_approved, auto_extract,
+bulk_import): known companies are saved under their canonical name, and
+`company_key` holds the key. CompanyIndex inverts company_key, so README
+grouping (tables.company_grouped), per-company queries and the
+company + title duplicate check (util.find_listings_by_name) are one dict
+lookup. Listings saved before company_key existed are keyed on the fly.
+
+Usage:
+  python companies.py query NAME [--active]   # listings for a company
+  python companies.py keys                    # every company key with its listing count
+  python companies.py backfill                # add company_key to existing listings
+"""
+
+import argparse
+import re
+import sys
+import unicodedata
+from urllib.parse import urlparse
+
+# canonical name -> (aliases, domain labels)
+KNOWN = {
+    "Accenture": ([], ["accenture"]),
+    "Amazon": ([], ["amazon"]),
+    "American Express": (["amex"], ["aexp", "americanexpress"]),
+    "Apple": (["apple inc"], ["apple"]),
+    "Bain & Company": (["bain"], ["bain"]),
+    "Capital One": (["capital one financial"], ["capitalone"]),
+    "Carnegie Mellon University": (["carnegie mellon", "cmu"], ["cmu"]),
+    "Citadel": (["citadel securities", "citadel llc"], ["citadel", "citadelsecurities"]),
+    "D. E. Shaw": (["de shaw", "d e shaw", "the d e shaw group"], ["deshaw"]),
+    "Deloitte": (["deloitte touche tohmatsu", "deloitte consulting"], ["deloitte"]),
+    "EY": (["ernst & young"], []),
+    "Fidelity Investments": (["fidelity"], ["fmr", "fidelity"]),
+    "Goldman Sachs": (["goldman", "goldman sachs group"], ["goldmansachs"]),
+    "Google": (["alphabet"], ["google", "withgoogle"]),
+    "Hudson River Trading": (["hrt"], ["hudsonrivertrading"]),
+    "IBM": (["international business machines"], ["ibm"]),
+    "IMC Trading": (["imc"], ["imc"]),
+    "Jane Street": (["jane street capital"], ["janestreet"]),
+    "JPMorgan Chase": (["jpmorgan", "jp morgan", "j p morgan", "jpmorgan chase bank", "jpmc"],
+                       ["jpmorganchase", "jpmorgan", "jpmc"]),
+    "Meta": (["facebook", "meta platforms"], ["meta", "metacareers", "facebook"]),
+    "Microsoft": (["msft"], ["microsoft"]),
+    "Millennium": (["millennium management"], ["mlp"]),
+    "Morgan Stanley": ([], ["morganstanley"]),
+    "NVIDIA": ([], ["nvidia"]),
+    "Salesforce": (["salesforce com"], ["salesforce"]),
+    "Thurgood Marshall College Fund": (["tmcf"], ["tmcf"]),
+    "Two Sigma": (["two sigma investments"], ["twosigma"]),
+    "UNCF": (["united negro college fund"], ["uncf"]),
+    "Wells Fargo": ([], ["wellsfargo", "wellsfargojobs"]),
+}
+
+LEGAL_SUFFIXES = {
+    "inc", "incorporated", "llc", "ltd", "limited", "corp", "corporation", "co", "company",
+    "plc", "gmbh", "ag", "sa", "lp", "llp", "group", "holdings",
+}
+# Applicant-tracking systems: the employer is the first path segment...
+ATS_PATH_HOSTS = ("greenhouse.io", "lever.co", "ashbyhq.com", "smartrecruiters.com", "workable.com")
+# ...or the first label of the hostname
+ATS_SUBDOMAIN_HOSTS = ("eightfold.ai", "recsolu.com", "icims.com", "myworkdayjobs.com",
+                       "qualtrics.com", "swoogo.com", "tfaforms.net", "breezy.hr")
+# Hosts that say nothing about who posted (forms, shorteners, social)
+GENERIC_HOSTS = ("docs.google.com", "forms.gle", "sites.google.com", "bit.ly", "lnkd.in",
+                 "linkedin.com", "forms.office.com", "airtable.com", "notion.site", "github.io")
+# Second-level domains under country codes: example.co.uk -> "example"
+SECOND_LEVEL = {"co", "com", "ac", "edu", "gov", "org", "net"}
+MIN_LABEL = 3
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def _words(name):
+    ascii_name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    words = WORD_RE.findall(ascii_name.lower())
+    if len(words) > 1 and words[0] == "the":
+        words = words[1:]
+    while len(words) > 1 and words[-1] in LEGAL_SUFFIXES:
+        words = words[:-1]
+    return words
+
+
+def slug(name):
+    """Comparable form of a company name: "JPMorgan Chase & Co." -> "jpmorganchase"."""
+    return "".join(_words(name or ""))
+
+
+def _alias_table():
+    by_slug, by_label = {}, {}
+    for canonical, (aliases, labels) in KNOWN.items():
+        for alias in [canonical, *aliases]:
+            by_slug[slug(alias)] = canonical
+        for label in labels:
+            by_label[label] = canonical
+    return by_slug, by_label
+
+
+BY_SLUG, BY_LABEL = _alias_table()
+KNOWN_SLUGS = {canonical: {s for s, c in BY_SLUG.items() if c == canonical} for canonical in KNOWN}
+
+
+def domain_label(url):
+    """The employer-identifying label of a posting URL, or None."""
+    parsed = urlparse(url or "")
+    host = (parsed.hostname or "").lower()
+    if not host or any(host == g or host.endswith("." + g) for g in GENERIC_HOSTS):
+        return None
+    parts = host.split(".")
+    if any(host.endswith(ats) for ats in ATS_PATH_HOSTS):
+        segment = parsed.path.strip("/").split("/")[0]
+        label = segment
+    elif any(host.endswith(ats) for ats in ATS_SUBDOMAIN_HOSTS):
+        label = parts[0]
+    elif len(parts) >= 3 and parts[-2] in SECOND_LEVEL and len(parts[-1]) == 2:
+        label = parts[-3]
+    else:
+        label = parts[-2] if len(parts) >= 2 else parts[0]
+    label = re.sub(r"[^a-z0-9]", "", label.lower())
+    return label if len(label) >= MIN_LABEL else None
+
+
+def canonicalize(name, url=""):
+    """(display name, company key) for a company name and posting URL."""
+    display = " ".join((name or "").split())
+    name_slug = slug(display)
+    if name_slug in BY_SLUG:
+        canonical = BY_SLUG[name_slug]
+        return canonical, slug(canonical)
+
+    label = domain_label(url)
+    if label and name_slug:
+        canonical = BY_LABEL.get(label)
+        if canonical is not None:
+            if any(name_slug.startswith(s) for s in KNOWN_SLUGS[canonical]):
+                return canonical, slug(canonical)
+        elif name_slug.startswith(label):
+            return display, label
+    return display, name_slug
+
+
+def listing_key(listing):
+    """company_key, computing it on the fly for listings saved without one."""
+    if "company_key" in listing:
+        return listing["company_key"]
+    return canonicalize(listing.get("company_name", ""), listing.get("url", ""))[1]
+
+
+class CompanyIndex:
+    """Inverted index: company key -> ids of listings at that company."""
+
+    def __init__(self, listings):
+        self.by_id = {}
+        self.postings = {}
+        self.size = 0
+        self.extend(listings)
+
+    def extend(self, listings):
+        for listing in listings:
+            self.by_id[listing["id"]] = listing
+            self.postings.setdefault(listing_key(listing), []).append(listing["id"])
+            self.size += 1
+
+    def ids(self, key):
+        return self.postings.get(key, [])
+
+    def listings(self, key, active_only=False):
+        found = [self.by_id[i] for i in self.ids(key)]
+        if active_only:
+            found = [l for l in found if l.get("active", True) and l.get("is_visible", True)]
+        return found
+
+    def lookup(self, name, url="", active_only=False):
+        """Listings at the company a name (and URL) canonicalizes to."""
+        return self.listings(canonicalize(name, url)[1], active_only)
+
+    def counts(self):
+        return {key: len(ids) for key, ids in sorted(self.postings.items())}
+
+
+_cached = (None, None)
+
+
+def index_for(listings):
+    """CompanyIndex over a list, reused across calls on the same list.
+
+    Callers only ever append to a loaded list (contribution batches add one
+    listing per issue), so listings past the indexed length are added to the
+    cached index instead of rebuilding it.
+    """
+    global _cached
+    owner, index = _cached
+    if owner is not listings or index.size > len(listings):
+        index = CompanyIndex(listings)
+        _cached = (listings, index)
+    elif index.size < len(listings):
+        index.extend(listings[index.size:])
+    return index
+
+
+def backfill():
+    """Canonicalize company names and add company_key on every existing listing."""
+    import util
+    listings = util.get_listings_from_json()
+    changed = []
+    for listing in listings:
+        name, key = canonicalize(listing.get("company_name", ""), listing.get("url", ""))
+        if listing.get("company_name") != name or listing.get("company_key") != key:
+            listing["company_name"], listing["company_key"] = name, key
+            changed.append(listing)
+    if changed:
+        util.save_listings_to_json(changed)
+    print(f"Backfilled {len(changed)} of {len(listings)} listing(s).")
+
+
+def main():
+    import util
+    parser = argparse.ArgumentParser(description="Query listings by canonical company.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    query = sub.add_parser("query", help="listings at a company")
+    query.add_argument("name")
+    query.add_argument("--active", action="store_true", help="only active, visible listings")
+    sub.add_parser("keys", help="every company key with its listing count")
+    sub.add_parser("backfill", help="add company_key to existing listings")
+    args = parser.parse_args()
+
+    if args.command == "backfill":
+        backfill()
+        return
+    index = CompanyIndex(util.get_listings_from_json())
+    if args.command == "keys":
+        for key, count in index.counts().items():
+            print(f"{count:>5}  {key}")
+        return
+    found = index.lookup(args.name, active_only=args.active)
+    for listing in found:
+        print(f"{listing['company_name']} — {listing['title']}  {listing['url']}")
+    print(f"{len(found)} listing(s) at {canonicalize(args.name)[0]}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
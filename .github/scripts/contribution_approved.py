@@ -6,85 +6,56 @@ This script handles three types of contributions:
 1. new_opportunity - Add a new opportunity to the listings
 2. edit_opportunity - Edit an existing opportunity
 3. close_opportunity - Mark an opportunity as closed/inactive
+
+Usage:
+  python contribution_approved.py EVENT_FILE
+  python contribution_approved.py --batch PATH [PATH ...]
+
+In batch mode each PATH is an event payload (.json), a file of issue objects
+one per line (.jsonl), or a queue directory of either. All issues are applied
+in memory against one loaded listings set, then saved once; per-issue outcomes
+are reported through the batch_results output.
 """
 
 import json
+import os
 import sys
 import re
+import companies
+import geo
+import issue_forms
+import lifecycle
 import util
 
 
-def parse_issue_body(body, labels):
-    """Parse the issue body based on issue type."""
-    lines = body.strip().split("\n")
-    data = {}
-
-    current_field = None
-    current_value = []
-
-    for line in lines:
-        # Check for field headers (### Field Name)
-        if line.startswith("### "):
-            if current_field and current_value:
-                data[current_field] = "\n".join(current_value).strip()
-            current_field = line[4:].strip().lower().replace(" ", "_")
-            current_value = []
-        elif current_field:
-            # Skip "_No response_" placeholders
-            if line.strip() != "_No response_":
-                current_value.append(line)
+class ContributionError(Exception):
+    """A contribution that can't be applied; the message is shown to the user."""
 
-    # Don't forget the last field
-    if current_field and current_value:
-        data[current_field] = "\n".join(current_value).strip()
 
-    return data
-
-
-def handle_new_opportunity(data, username, is_quick_add=False):
-    """Handle adding a new opportunity."""
-    listings = util.get_listings_from_json()
-
-    # Get URL - handle both full and quick templates
-    url = data.get("link_to_opportunity_posting", "") or data.get("link", "")
-    url = util.clean_url(url)
+def handle_new_opportunity(data, username, listings, is_quick_add=False):
+    """Handle adding a new opportunity. Appends it to `listings`."""
+    url = util.clean_url(data.get("url", ""))
     if not url:
-        util.fail("Missing required field: URL")
+        raise ContributionError("Missing required field: URL")
 
     # Check for duplicates
-    for listing in listings:
-        if listing["url"] == url:
-            util.fail(f"Duplicate: This opportunity already exists (ID: {listing['id']})")
-
-    # Get company name - handle both templates
-    company_name = (data.get("company/organization_name", "") or
-                    data.get("company/organization", "")).strip()
+    duplicate = util.find_listing_by_url(listings, url)
+    if duplicate:
+        raise ContributionError(f"Duplicate: This opportunity already exists (ID: {duplicate['id']})")
 
-    # Get title - handle both templates
-    title = (data.get("program/role_title", "") or
-             data.get("role/program_name", "")).strip()
+    company_name, company_key = companies.canonicalize(data.get("company_name", ""), url)
+    title = data.get("title", "")
 
     # Parse locations (default to "Multiple Locations" if not provided)
-    locations_str = data.get("location", "") or data.get("location_(optional)", "")
-    if locations_str:
-        # Support semicolon, pipe, or newline as separators
-        import re
-        locations = [loc.strip() for loc in re.split(r'[;|\n]', locations_str) if loc.strip()]
-    else:
-        locations = ["Multiple Locations"]
+    locations, location_keys = geo.canonicalize(util.split_locations(data.get("location", "")))
 
     # Get category (for quick add) or infer from opportunity type
     category = data.get("category", "Internship")
-    # Clean up category if it has the full description
-    if "Internship" in category:
-        category = "Internship"
-    elif "Program" in category:
-        category = "Program"
-    elif "Research" in category:
-        category = "Research"
+    # Clean up category if it has the full description ("Research - Research Programs ...")
+    category = category.split(" - ")[0].strip()
 
     # Get opportunity type or use defaults based on category
-    opportunity_type = data.get("type_of_opportunity", "")
+    opportunity_type = data.get("opportunity_type", "")
     if not opportunity_type or is_quick_add:
         if category == "Internship":
             opportunity_type = "Internship"
@@ -94,32 +65,32 @@ def handle_new_opportunity(data, username, is_quick_add=False):
             opportunity_type = "Research"
 
     # Get field for research programs
-    field = data.get("field/area_(for_research_programs_only)", "") or data.get("research_field_(optional,_for_research_only)", "")
+    field = data.get("field", "")
 
-    # Parse target year (default for quick add)
-    target_year_str = data.get("target_year", "")
-    if target_year_str:
-        target_year = [y.strip() for y in target_year_str.split(",") if y.strip()]
-    else:
-        target_year = ["Freshman (1st year)", "Sophomore (2nd year)"]
+    # Target year (default for quick add)
+    target_year = data.get("target_year") or ["Freshman (1st year)", "Sophomore (2nd year)"]
 
     # Get season (default to Summer)
-    season = data.get("what_season_is_this_opportunity_for?", "Summer")
+    season = data.get("season", "Summer")
 
     # Get sponsorship (default to Not Specified)
-    sponsorship = data.get("sponsorship/citizenship_requirements", "Not Specified")
+    sponsorship = data.get("sponsorship", "Not Specified")
+
+    # Get active status (default to True)
+    active = data.get("active", True)
 
-    # Get active status (default to Yes/True)
-    active_str = data.get("is_this_opportunity_currently_accepting_applications?", "Yes")
-    active = active_str == "Yes" or active_str == ""
+    # Get deadline text (optional) — parsed once here into timestamps
+    deadline_str = data.get("deadline", "")
 
     # Create new listing
     new_listing = {
         "id": util.generate_uuid(),
         "company_name": company_name,
+        "company_key": company_key,
         "title": title,
         "url": url,
         "locations": locations,
+        "location_keys": location_keys,
         "season": season,
         "category": category,
         "opportunity_type": opportunity_type,
@@ -136,27 +107,33 @@ def handle_new_opportunity(data, username, is_quick_add=False):
     if category == "Research" and field:
         new_listing["field"] = field
 
+    # Add deadline text and its parsed timestamps, then the initial status
+    if deadline_str:
+        new_listing["deadline"] = deadline_str
+        new_listing.update(lifecycle.parse_deadline_fields(deadline_str))
+    lifecycle.set_status(new_listing, new_listing["date_posted"])
+
     # Validate required fields
     if not new_listing["company_name"]:
-        util.fail("Missing required field: Company Name")
+        raise ContributionError("Missing required field: Company Name")
     if not new_listing["title"]:
-        util.fail("Missing required field: Title")
+        raise ContributionError("Missing required field: Title")
 
     listings.append(new_listing)
-    util.save_listings_to_json(listings)
-
-    # Set outputs
-    util.set_output("commit_message", f"Add {company_name} - {title}")
-    util.set_output("contributor_name", username)
-    email = data.get("email_associated_with_your_github_account_(optional)", "")
-    util.set_output("contributor_email", email if email else "actions@github.com")
 
+    email = data.get("email", "")
     print(f"Successfully added: {company_name} - {title}")
+    return {
+        "listing": new_listing,
+        "commit_message": f"Add {company_name} - {title}",
+        "contributor_name": username,
+        "contributor_email": email if email else "actions@github.com",
+    }
 
 
-def handle_edit_opportunity(data, username):
+def handle_edit_opportunity(data, username, listings):
     """Editing is not supported via automation. Direct users to close + re-add."""
-    util.fail(
+    raise ContributionError(
         "Editing via issues is not currently supported. "
         "To update a listing, please:\n"
         "1. Open a 'Close Opportunity' issue to remove the old listing\n"
@@ -164,76 +141,155 @@ def handle_edit_opportunity(data, username):
     )
 
 
-def handle_close_opportunity(data, username):
-    """Handle closing an opportunity."""
-    listings = util.get_listings_from_json()
-
-    company_name = data.get("company/organization_name", "").strip()
-    title = data.get("program/role_title", "").strip()
-    url = data.get("job_url_(optional)", "").strip()
+def handle_close_opportunity(data, username, listings):
+    """Handle closing an opportunity in `listings`."""
+    company_name = data.get("company_name", "")
+    title = data.get("title", "")
+    url = data.get("url", "")
 
     if not company_name or not title:
-        util.fail("Missing required fields: Company Name and Title")
+        raise ContributionError("Missing required fields: Company Name and Title")
 
     # Find matching listings
-    matches = []
-    for listing in listings:
-        if (listing["company_name"].lower() == company_name.lower() and
-            listing["title"].lower() == title.lower()):
-            matches.append(listing)
+    if url:
+        url = util.clean_url(url)
+    matches = util.find_listings_by_name(listings, company_name, title, url)
 
     # If URL provided, filter by URL
     if url:
-        url = util.clean_url(url)
         matches = [m for m in matches if m["url"] == url]
 
     if not matches:
-        util.fail(f"Could not find opportunity: {company_name} - {title}")
+        raise ContributionError(f"Could not find opportunity: {company_name} - {title}")
 
     if len(matches) > 1:
-        util.fail(f"Found multiple matches for {company_name} - {title}. Please provide the URL to identify the specific listing.")
+        raise ContributionError(f"Found multiple matches for {company_name} - {title}. Please provide the URL to identify the specific listing.")
 
     # Mark as inactive
     matches[0]["active"] = False
     matches[0]["date_updated"] = util.get_current_timestamp()
 
-    util.save_listings_to_json(listings)
-
-    util.set_output("commit_message", f"Close {company_name} - {title}")
-    util.set_output("contributor_name", username)
-    util.set_output("contributor_email", "actions@github.com")
-
     print(f"Successfully closed: {company_name} - {title}")
+    return {
+        "listing": matches[0],
+        "commit_message": f"Close {company_name} - {title}",
+        "contributor_name": username,
+        "contributor_email": "actions@github.com",
+    }
 
 
-def main():
-    if len(sys.argv) < 2:
-        util.fail("Missing event data file path")
-
-    event_path = sys.argv[1]
-    with open(event_path, "r") as f:
-        event = json.load(f)
-
-    issue = event.get("issue", {})
-    body = issue.get("body", "")
+def process_issue(issue, listings):
+    """Apply one issue to `listings`. Returns the handler's result dict."""
+    body = issue.get("body", "") or ""
     labels = [l.get("name", "") for l in issue.get("labels", [])]
     username = issue.get("user", {}).get("login", "unknown")
 
     # Parse the issue body
-    data = parse_issue_body(body, labels)
+    data = issue_forms.parse(body)
 
     # Check if this is a quick add
     is_quick_add = "quick_add" in labels
 
     # Handle based on label
     if "new_opportunity" in labels:
-        handle_new_opportunity(data, username, is_quick_add=is_quick_add)
+        return handle_new_opportunity(data, username, listings, is_quick_add=is_quick_add)
     elif "edit_opportunity" in labels:
-        handle_edit_opportunity(data, username)
+        return handle_edit_opportunity(data, username, listings)
     elif "close_opportunity" in labels:
-        handle_close_opportunity(data, username)
+        return handle_close_opportunity(data, username, listings)
     else:
-        util.fail(f"Unknown issue type. Labels: {labels}")
+        raise ContributionError(f"Unknown issue type. Labels: {labels}")
+
+
+def load_issues(paths):
+    """Issues from event files, JSONL issue files, or queue directories."""
+    issues = []
+    for path in paths:
+        if os.path.isdir(path):
+            entries = sorted(os.listdir(path))
+            issues.extend(load_issues(
+                [os.path.join(path, e) for e in entries if e.endswith((".json", ".jsonl"))]
+            ))
+        elif path.endswith(".jsonl"):
+            with open(path, "r") as f:
+                issues.extend(json.loads(line) for line in f if line.strip())
+        else:
+            with open(path, "r") as f:
+                event = json.load(f)
+            issues.append(event.get("issue", event))
+    return issues
+
+
+def process_batch(paths):
+    """Apply many approved issues against one listings load; save once."""
+    issues = load_issues(paths)
+    listings = util.get_listings_from_json()
+
+    results = []
+    changed = {}
+    # The sqlite backend's duplicate check only sees saved listings, so URLs
+    # added earlier in this batch are tracked here.
+    batch_urls = {}
+    for issue in issues:
+        number = issue.get("number")
+        try:
+            result = process_issue(issue, listings)
+            listing = result["listing"]
+            earlier = batch_urls.get(listing["url"])
+            if earlier and earlier["id"] != listing["id"]:
+                listings.remove(listing)
+                raise ContributionError(f"Duplicate: already added in this batch by #{earlier['issue']}")
+        except ContributionError as e:
+            print(f"#{number}: FAILED — {e}")
+            results.append({"issue": number, "ok": False, "message": str(e)})
+            continue
+        batch_urls.setdefault(listing["url"], {"id": listing["id"], "issue": number})
+        changed[listing["id"]] = listing
+        results.append({"issue": number, "ok": True, "message": result["commit_message"]})
+
+    if changed:
+        util.save_listings_to_json(list(changed.values()))
+
+    succeeded = [r for r in results if r["ok"]]
+    print(f"Processed {len(results)} issue(s): {len(succeeded)} applied, "
+          f"{len(results) - len(succeeded)} failed.")
+
+    summary = f"Process {len(succeeded)} approved issue(s)"
+    details = "\n".join(f"- #{r['issue']}: {r['message']}" for r in succeeded)
+    util.set_output("commit_message", f"{summary}\n\n{details}" if succeeded else "")
+    util.set_output("contributor_name", "github-actions[bot]")
+    util.set_output("contributor_email", "github-actions[bot]@users.noreply.github.com")
+    util.set_output("batch_results", json.dumps(results))
+    util.set_output("applied_count", len(succeeded))
+    util.set_output("failed_count", len(results) - len(succeeded))
+
+
+def main():
+    if len(sys.argv) < 2:
+        util.fail("Missing event data file path")
+
+    if sys.argv[1] == "--batch":
+        if len(sys.argv) < 3:
+            util.fail("Missing event files or queue directory for --batch")
+        process_batch(sys.argv[2:])
+        return
+
+    event_path = sys.argv[1]
+    with open(event_path, "r") as f:
+        event = json.load(f)
+
+    listings = util.get_listings_from_json()
+    try:
+        result = process_issue(event.get("issue", {}), listings)
+    except ContributionError as e:
+        util.fail(str(e))
+
+    util.save_listings_to_json([result["listing"]])
+
+    # Set outputs
+    util.set_output("commit_message", result["commit_message"])
+    util.set_output("contributor_name", result["contributor_name"])
+    util.set_output("contributor_email", result["contributor_email"])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+extract_pipeline.py — process many link-only submissions concurrently.
+
+The batch counterpart of auto_extract.py: same fetch, parse, extractor chain
+and listing rules, but run with asyncio so one slow host or one API hiccup
+can't stall or kill the run.
+
+  - per-stage deadlines: each fetch and each model call is bounded
+    (FETCH_DEADLINE, EXTRACT_DEADLINE), each item as a whole by ITEM_DEADLINE
+    and the run by --deadline; whatever is still running then is cancelled.
+    The timeout is also passed into the blocking call itself, and a thread
+    whose caller gave up keeps its slot (ThreadSlots) until it returns, so
+    timed-out retries can't pile up threads
+  - bounded exponential backoff with jitter for transient failures
+    (timeouts, connection errors, 429 / 5xx, unparseable model output)
+  - a per-host circuit breaker: after BREAKER_THRESHOLD consecutive failures
+    a host (or the model API) is skipped for BREAKER_COOLDOWN seconds, then
+    one probe request decides whether it closes again
+  - a model response that isn't a JSON object counts as unparseable output
+  - a retry queue (extract_retry_queue.json, not tracked by git; cached
+    between runs): items that fail transiently, hit an open breaker or are
+    cancelled are queued with a growing not-before time instead of failing
+    the run, and given up after QUEUE_MAX_ATTEMPTS runs
+
+Results are applied in input order against one listings load (URL and
+company + title duplicate checks, as in auto_extract.py, plus the URLs added
+earlier in the batch, which the sqlite backend's check can't see yet) and
+saved once.
+Per-issue outcomes — added, duplicate, failed, queued, deferred — are
+reported through the batch_results output.
+
+Usage:
+  python extract_pipeline.py PATH [PATH ...] [--deadline SECONDS] [--concurrency N] [--force]
+
+PATH is an event payload, a JSONL file of issues or a queue directory, as in
+contribution_approved.py --batch.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from urllib.parse import urlparse
+
+import requests
+
+import auto_extract
+import extractors
+import util
+from contribution_approved import load_issues
+
+RETRY_QUEUE_FILE = os.path.join(util.SCRIPT_DIR, "extract_retry_queue.json")
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RUN_DEADLINE = 20 * 60
+FETCH_DEADLINE = 30
+EXTRACT_DEADLINE = 60
+ITEM_DEADLINE = 180
+
+MAX_ATTEMPTS = 3        # tries per stage within a run
+BACKOFF_BASE = 1.0      # seconds; doubles each retry
+BACKOFF_MAX = 15.0
+
+BREAKER_THRESHOLD = 3
+BREAKER_COOLDOWN = 120
+
+QUEUE_BACKOFF = 3600    # seconds before a queued item is retried; doubles per run
+QUEUE_BACKOFF_MAX = 24 * 3600
+QUEUE_MAX_ATTEMPTS = 5
+
+OPENAI_HOST = "api.openai.com"
+
+
+class TransientError(Exception):
+    """Worth retrying later: the item goes to the retry queue."""
+
+
+class CircuitOpen(TransientError):
+    pass
+
+
+def is_transient(exc):
+    """Whether a fetch / model failure might succeed on retry."""
+    if isinstance(exc, (asyncio.TimeoutError, TransientError)):
+        return True
+    if isinstance(exc, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return True
+    status = getattr(getattr(exc, "response", None), "status_code", None)
+    if status is None:
+        status = getattr(exc, "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    # openai's connection / timeout errors carry no status code
+    if type(exc).__name__ in ("APIConnectionError", "APITimeoutError"):
+        return True
+    # Unparseable model output is usually a one-off
+    return isinstance(exc, auto_extract.ExtractionError) and "parse AI response" in str(exc)
+
+
+def backoff_delay(attempt):
+    """Full-jitter exponential backoff for the given (0-based) retry."""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """Per-host consecutive-failure breaker with a cooldown and a half-open probe."""
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = {}
+        self.opened_at = {}
+        self.probing = set()
+
+    def allow(self, host):
+        if host in self.probing:
+            # Half-open: everyone else waits for the probe's outcome
+            return False
+        opened = self.opened_at.get(host)
+        if opened is None:
+            return True
+        if time.monotonic() - opened >= self.cooldown:
+            # Half-open: let one request through; another failure re-opens.
+            del self.opened_at[host]
+            self.failures[host] = self.threshold - 1
+            self.probing.add(host)
+            return True
+        return False
+
+    def success(self, host):
+        self.failures.pop(host, None)
+        self.probing.discard(host)
+
+    def failure(self, host):
+        self.probing.discard(host)
+        self.failures[host] = self.failures.get(host, 0) + 1
+        if self.failures[host] >= self.threshold:
+            self.opened_at[host] = time.monotonic()
+
+    def open_hosts(self):
+        return sorted(self.opened_at)
+
+
+class ThreadSlots:
+    """Caps blocking calls in flight, including ones whose caller timed out.
+
+    asyncio can't cancel a thread, so a slot is released by the thread when
+    the call returns, not by the caller when it stops waiting.
+    """
+
+    def __init__(self, size):
+        self.semaphore = asyncio.Semaphore(size)
+
+    async def run(self, fn, *args, deadline):
+        await self.semaphore.acquire()
+        loop = asyncio.get_running_loop()
+
+        def call():
+            try:
+                return fn(*args)
+            finally:
+                loop.call_soon_threadsafe(self.semaphore.release)
+
+        # shield: a timeout stops the wait, never the submitted call, so the
+        # thread always runs and releases its slot
+        return await asyncio.wait_for(asyncio.shield(loop.run_in_executor(None, call)), deadline)
+
+
+async def call_with_retries(fn, *args, host, breaker, slots, deadline):
+    """Run a blocking call in a thread under a deadline, retrying transient failures."""
+    for attempt in range(MAX_ATTEMPTS):
+        if not breaker.allow(host):
+            raise CircuitOpen(f"circuit open for {host}")
+        try:
+            result = await slots.run(fn, *args, deadline=deadline)
+        except asyncio.CancelledError:
+            breaker.probing.discard(host)
+            raise
+        except Exception as e:
+            if not is_transient(e):
+                # The host answered, just not usefully for this item
+                breaker.success(host)
+                raise
+            breaker.failure(host)
+            if attempt == MAX_ATTEMPTS - 1:
+                raise TransientError(f"{type(e).__name__}: {e}") from e
+            await asyncio.sleep(backoff_delay(attempt))
+        else:
+            breaker.success(host)
+            return result
+
+
+def request_object(page_content, notes, timeout):
+    """auto_extract.request_extraction, rejecting responses that aren't a JSON object."""
+    extracted = auto_extract.request_extraction(page_content, notes, timeout)
+    if not isinstance(extracted, dict):
+        raise auto_extract.ExtractionError(
+            f"Failed to parse AI response: expected a JSON object, got {type(extracted).__name__}")
+    for field in ("company_name", "title", "category", "deadline"):
+        if extracted.get(field) is not None and not isinstance(extracted[field], str):
+            raise auto_extract.ExtractionError(f"Failed to parse AI response: {field} is not a string")
+    return extracted
+
+
+async def fetch_and_extract(item, breaker, slots):
+    """Fetch, parse and extract one item. Returns (extracted, backend)."""
+    url, notes = item["url"], item["notes"]
+    host = urlparse(url).netloc.lower()
+    html = await call_with_retries(auto_extract.fetch_html, url, FETCH_DEADLINE,
+                                   host=host, breaker=breaker, slots=slots, deadline=FETCH_DEADLINE + 5)
+    page_content = await asyncio.to_thread(auto_extract.parse_page, html, url)
+
+    # Rules first, as in auto_extract.py; the model only when they miss
+    start = time.perf_counter()
+    extracted = extractors.extract_rules(page_content, notes)
+    extractors.record("rules", bool(extracted), time.perf_counter() - start)
+    if extracted:
+        return extracted, "rules"
+
+    start = time.perf_counter()
+    try:
+        extracted = await call_with_retries(request_object, page_content, notes, EXTRACT_DEADLINE,
+                                            host=OPENAI_HOST, breaker=breaker, slots=slots,
+                                            deadline=EXTRACT_DEADLINE + 5)
+    finally:
+        extractors.record("openai", bool(extracted), time.perf_counter() - start)
+    return extracted, "openai"
+
+
+async def run_items(items, concurrency, run_deadline):
+    """Process items concurrently. Returns {index: ("ok", extracted, backend) | (kind, error)}."""
+    breaker = CircuitBreaker()
+    semaphore = asyncio.Semaphore(concurrency)
+    # One fetch or model call per worker, plus as many again left over from timeouts
+    slots = ThreadSlots(2 * concurrency)
+
+    async def worker(item):
+        async with semaphore:
+            return await asyncio.wait_for(fetch_and_extract(item, breaker, slots), ITEM_DEADLINE)
+
+    tasks = {asyncio.create_task(worker(item)): i for i, item in enumerate(items)}
+    outcomes = {}
+    if tasks:
+        done, pending = await asyncio.wait(tasks, timeout=run_deadline)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        for task in pending:
+            outcomes[tasks[task]] = ("transient", "cancelled at the run deadline")
+        for task in done:
+            exc = task.exception()
+            if exc is None:
+                outcomes[tasks[task]] = ("ok", *task.result())
+            elif is_transient(exc):
+                outcomes[tasks[task]] = ("transient", str(exc) or type(exc).__name__)
+            else:
+                outcomes[tasks[task]] = ("failed", str(exc) or type(exc).__name__)
+    if breaker.open_hosts():
+        print(f"Circuit open at end of run: {', '.join(breaker.open_hosts())}")
+    return outcomes
+
+
+def load_queue():
+    if not os.path.exists(RETRY_QUEUE_FILE):
+        return {}
+    with open(RETRY_QUEUE_FILE, "r") as f:
+        return json.load(f)
+
+
+def save_queue(queue):
+    with open(RETRY_QUEUE_FILE, "w") as f:
+        json.dump(queue, f, indent=2, sort_keys=True)
+
+
+def requeue(queue, url, error, now):
+    """Record a transient failure. Returns False once the item has used up its runs."""
+    entry = queue.get(url, {"attempts": 0})
+    entry["attempts"] += 1
+    entry["error"] = error
+    if entry["attempts"] >= QUEUE_MAX_ATTEMPTS:
+        queue.pop(url, None)
+        return False
+    entry["not_before"] = now + min(QUEUE_BACKOFF_MAX, QUEUE_BACKOFF * 2 ** (entry["attempts"] - 1))
+    queue[url] = entry
+    return True
+
+
+def collect_items(issues):
+    """(items to process, results for issues with no usable URL)."""
+    items, results = [], []
+    for issue in issues:
+        number = issue.get("number")
+        url, data = auto_extract.extract_url_from_body(issue.get("body", "") or "")
+        if not url:
+            results.append({"issue": number, "status": "failed",
+                            "message": "No URL found in issue body. Please make sure to include a valid URL."})
+            continue
+        items.append({
+            "issue": number,
+            "url": util.clean_url(url),
+            "notes": data.get("notes", ""),
+            "username": issue.get("user", {}).get("login", "unknown"),
+        })
+    return items, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract many link-only submissions concurrently.")
+    parser.add_argument("paths", nargs="+", help="event files, JSONL issue files or queue directories")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--deadline", type=float, default=DEFAULT_RUN_DEADLINE,
+                        help=f"seconds before outstanding items are cancelled (default {DEFAULT_RUN_DEADLINE})")
+    parser.add_argument("--force", action="store_true", help="ignore retry-queue not-before times")
+    args = parser.parse_args()
+
+    items, results = collect_items(load_issues(args.paths))
+    queue = load_queue()
+    now = time.time()
+
+    ready = []
+    for item in items:
+        entry = queue.get(item["url"])
+        if entry and entry["not_before"] > now and not args.force:
+            results.append({"issue": item["issue"], "status": "deferred",
+                            "message": f"Retrying after {time.strftime('%Y-%m-%d %H:%M UTC', time.gmtime(entry['not_before']))}"})
+        else:
+            ready.append(item)
+
+    print(f"Processing {len(ready)} item(s), {len(items) - len(ready)} deferred by the retry queue...")
+    start = time.perf_counter()
+    outcomes = asyncio.run(run_items(ready, args.concurrency, args.deadline))
+    print(f"Fetched and extracted in {time.perf_counter() - start:.1f}s")
+
+    listings = util.get_listings_from_json()
+    added = []
+    # The sqlite backend's duplicate check only sees saved listings, so URLs
+    # added earlier in this batch are tracked here.
+    batch_urls = {}
+    for i, item in enumerate(ready):
+        kind, *rest = outcomes[i]
+        result = {"issue": item["issue"], "url": item["url"]}
+        if kind == "ok":
+            extracted, backend = rest
+            queue.pop(item["url"], None)
+            try:
+                listing, warning = auto_extract.build_listing(extracted, item["url"], item["username"])
+            except auto_extract.ExtractionError as e:
+                result.update(status="failed", message=str(e))
+            else:
+                duplicate, reason = auto_extract.find_duplicate(
+                    listings, item["url"], listing["company_name"], listing["title"])
+                earlier = batch_urls.get(listing["url"])
+                if duplicate:
+                    result.update(status="duplicate", message=reason, duplicate_id=duplicate["id"])
+                elif earlier:
+                    result.update(status="duplicate", duplicate_id=earlier["id"],
+                                  message=f"Duplicate: already added in this batch by #{earlier['issue']}")
+                else:
+                    batch_urls[listing["url"]] = {"id": listing["id"], "issue": item["issue"]}
+                    listings.append(listing)
+                    added.append(listing)
+                    result.update(status="added", backend=backend, warning=warning,
+                                  message=f"Add {listing['company_name']} - {listing['title']}")
+        elif kind == "transient" and requeue(queue, item["url"], rest[0], now):
+            result.update(status="queued", message=rest[0])
+        else:
+            queue.pop(item["url"], None)
+            result.update(status="failed", message=rest[0])
+        results.append(result)
+
+    if added:
+        util.save_listings_to_json(added)
+    save_queue(queue)
+    extractors.save_metrics()
+
+    counts = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+        print(f"  #{result['issue']}: {result['status'].upper()} — {result['message']}")
+    print("Done: " + ", ".join(f"{n} {status}" for status, n in sorted(counts.items())))
+
+    details = "\n".join(f"- #{r['issue']}: {r['message']}" for r in results if r["status"] == "added")
+    util.set_output("commit_message", f"Add {len(added)} auto-extracted listing(s)\n\n{details}" if added else "")
+    util.set_output("batch_results", json.dumps(results))
+    for status in ("added", "duplicate", "failed", "queued", "deferred"):
+        util.set_output(f"{status}_count", counts.get(status, 0))
+
+
+if __name__ == "__main__":
+    main()
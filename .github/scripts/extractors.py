@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+extractors.py — extractor backends for auto_extract.py.
+
+An extractor backend is a (name, function) pair. The function takes the
+page_content dict from auto_extract.fetch_page_content plus the submitter's
+notes and returns the extracted-fields dict, or None when it can't give a
+confident answer. extract() tries backends in order and uses the first hit.
+
+auto_extract.py runs:
+
+  1. rules  — extract_rules(): deterministic, no network. Reads schema.org
+              JobPosting JSON-LD and the Greenhouse / Ashby / Lever URL and
+              page-title conventions.
+  2. openai — auto_extract.extract_with_openai(), only when rules miss.
+
+Every attempt is recorded per backend (attempts, hits, total latency) in
+METRICS, and merged into extractor_metrics.json (not tracked by git; cached
+between workflow runs) by save_metrics().
+
+Usage:
+  python extractors.py     # print hit rate and latency per backend
+"""
+
+import json
+import os
+import re
+import time
+from datetime import datetime
+from urllib.parse import urlparse
+
+import util
+
+METRICS_FILE = os.path.join(util.SCRIPT_DIR, "extractor_metrics.json")
+
+# Company slug is the first path segment on each ATS host.
+ATS_HOSTS = {
+    "boards.greenhouse.io": "greenhouse",
+    "job-boards.greenhouse.io": "greenhouse",
+    "jobs.ashbyhq.com": "ashby",
+    "jobs.lever.co": "lever",
+}
+ATS_TITLE_RES = {
+    "greenhouse": re.compile(r"^Job Application for (?P<title>.+?) at (?P<company>.+)$"),
+    "lever": re.compile(r"^(?P<company>.+?) - (?P<title>.+)$"),
+    "ashby": re.compile(r"^(?P<title>.+?) @ (?P<company>.+)$"),
+}
+
+# Title keywords -> category, checked in order (the first match wins). An
+# explicit "intern"/"internship" outranks the generic words ("research", "lab",
+# "program") that also appear in internship titles; next to one of the
+# specific words instead, the title is ambiguous and left to the model.
+CATEGORY_KEYWORDS = [
+    ("Research", re.compile(r"\b(research|REU|SURF|lab)\b", re.IGNORECASE)),
+    ("Program", re.compile(r"\b(fellow(ship)?s?|extern(ship)?s?|program|academy|bootcamp)\b", re.IGNORECASE)),
+    ("Internship", re.compile(r"\bintern(ship)?s?\b", re.IGNORECASE)),
+]
+INTERN_RE = CATEGORY_KEYWORDS[-1][1]
+SPECIFIC_CATEGORY_RE = re.compile(
+    r"\b(REU|SURF|fellow(ship)?s?|extern(ship)?s?|academy|bootcamp)\b", re.IGNORECASE
+)
+OPPORTUNITY_TYPES = {"Research": "Research", "Program": "Fellowship", "Internship": "Internship"}
+SEASON_RE = re.compile(r"\b(Summer|Fall|Winter|Spring)\b", re.IGNORECASE)
+UNDERCLASSMEN_RE = re.compile(
+    r"\b(freshm[ae]n|sophomores?|first[- ]year|second[- ]year|underclass(men|man)?)\b", re.IGNORECASE
+)
+
+# Same rule the model prompt uses: underclassmen unless the posting only asks
+# for upper-year or graduate standing.
+UPPERCLASS_RE = re.compile(r"\b(juniors?|seniors?|graduate students?|rising (junior|senior)s?)\b", re.IGNORECASE)
+
+METRICS = {}
+
+
+# ---------------------------------------------------------------------------
+# Rule-based extractor
+# ---------------------------------------------------------------------------
+
+def find_job_posting(json_ld):
+    """The first schema.org JobPosting in a list of parsed JSON-LD blobs."""
+    stack = list(json_ld)
+    while stack:
+        item = stack.pop(0)
+        if isinstance(item, list):
+            stack.extend(item)
+        elif isinstance(item, dict):
+            kind = item.get("@type")
+            if kind == "JobPosting" or (isinstance(kind, list) and "JobPosting" in kind):
+                return item
+            if "@graph" in item:
+                stack.extend(item["@graph"])
+    return None
+
+
+def as_list(value):
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def posting_locations(posting):
+    locations = []
+    for place in as_list(posting.get("jobLocation")):
+        address = place.get("address", {}) if isinstance(place, dict) else {}
+        if isinstance(address, str):
+            locations.append(address.strip())
+            continue
+        parts = [address.get("addressLocality"), address.get("addressRegion")]
+        location = ", ".join(str(p).strip() for p in parts if p)
+        if not location and address.get("addressCountry"):
+            country = address["addressCountry"]
+            location = country.get("name", "") if isinstance(country, dict) else str(country)
+        if location and location not in locations:
+            locations.append(location)
+    if "TELECOMMUTE" in str(posting.get("jobLocationType", "")).upper():
+        locations.append("Remote")
+    return locations
+
+
+def format_deadline(value):
+    """ISO date/datetime (validThrough) -> "Oct 15, 2026", or "" if unparseable."""
+    try:
+        d = datetime.fromisoformat(str(value).replace("Z", "+00:00")[:25])
+    except ValueError:
+        try:
+            d = datetime.strptime(str(value)[:10], "%Y-%m-%d")
+        except ValueError:
+            return ""
+    return f"{d:%b} {d.day}, {d.year}"
+
+
+def ats_hints(url, page_title):
+    """(company, title) guesses from an ATS URL and its page-title convention."""
+    parsed = urlparse(url)
+    ats = ATS_HOSTS.get(parsed.netloc.lower())
+    if not ats:
+        return "", ""
+    company = title = ""
+    m = ATS_TITLE_RES[ats].match((page_title or "").strip())
+    if m:
+        company, title = m.group("company").strip(), m.group("title").strip()
+    segments = [s for s in parsed.path.split("/") if s]
+    if not company and segments:
+        company = segments[0].replace("-", " ").replace("_", " ").title()
+    return company, title
+
+
+def title_category(title):
+    """Category from title keywords, or None if there are none or they conflict."""
+    if INTERN_RE.search(title):
+        return None if SPECIFIC_CATEGORY_RE.search(title) else "Internship"
+    return next((c for c, pattern in CATEGORY_KEYWORDS if pattern.search(title)), None)
+
+
+def extract_rules(page_content, additional_notes=""):
+    """Deterministic extraction from JSON-LD and ATS conventions, or None."""
+    posting = find_job_posting(page_content.get("json_ld", [])) or {}
+    org = posting.get("hiringOrganization")
+    company = (org.get("name", "") if isinstance(org, dict) else str(org or "")).strip()
+    title = str(posting.get("title", "")).strip()
+
+    ats_company, ats_title = ats_hints(page_content.get("url", ""), page_content.get("title", ""))
+    company = company or ats_company
+    title = title or ats_title
+
+    category = title_category(title)
+    if not company or not title or not category:
+        return None
+
+    description = re.sub(r"<[^>]+>", " ", str(posting.get("description", "")))
+    text = " ".join([title, description, page_content.get("text", ""), additional_notes])
+    season = SEASON_RE.search(title) or SEASON_RE.search(description)
+
+    return {
+        "company_name": company,
+        "title": title,
+        "locations": posting_locations(posting) or ["Multiple Locations"],
+        "category": category,
+        "opportunity_type": OPPORTUNITY_TYPES[category],
+        "field": "",
+        "season": season.group(1).title() if season else "Summer",
+        "sponsorship": "Not Specified",
+        "deadline": format_deadline(posting["validThrough"]) if posting.get("validThrough") else "",
+        "opens": "",
+        "is_underclassmen": bool(UNDERCLASSMEN_RE.search(text)) or not UPPERCLASS_RE.search(text),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Backend chain and metrics
+# ---------------------------------------------------------------------------
+
+def record(name, hit, seconds):
+    stats = METRICS.setdefault(name, {"attempts": 0, "hits": 0, "total_ms": 0.0})
+    stats["attempts"] += 1
+    stats["hits"] += int(hit)
+    stats["total_ms"] += seconds * 1000
+
+
+def extract(page_content, additional_notes, backends):
+    """Run backends in order. Returns (extracted, backend name) or (None, None)."""
+    for name, backend in backends:
+        start = time.perf_counter()
+        result = None
+        try:
+            result = backend(page_content, additional_notes)
+        finally:
+            record(name, bool(result), time.perf_counter() - start)
+        if result:
+            return result, name
+    return None, None
+
+
+def load_metrics():
+    if not os.path.exists(METRICS_FILE):
+        return {}
+    with open(METRICS_FILE, "r") as f:
+        return json.load(f)
+
+
+def save_metrics():
+    """Merge this process's METRICS into METRICS_FILE."""
+    merged = load_metrics()
+    for name, stats in METRICS.items():
+        total = merged.setdefault(name, {"attempts": 0, "hits": 0, "total_ms": 0.0})
+        for key in total:
+            total[key] += stats[key]
+    with open(METRICS_FILE, "w") as f:
+        json.dump(merged, f, indent=2)
+
+
+def format_metrics(metrics):
+    lines = [f"| {'backend':<8} | {'attempts':>8} | {'hits':>6} | {'hit rate':>8} | {'mean ms':>8} |",
+             f"| {'-' * 8} | {'-' * 8} | {'-' * 6} | {'-' * 8} | {'-' * 8} |"]
+    for name, stats in metrics.items():
+        attempts = stats["attempts"] or 1
+        lines.append(f"| {name:<8} | {stats['attempts']:>8} | {stats['hits']:>6} | "
+                     f"{stats['hits'] / attempts:>8.0%} | {stats['total_ms'] / attempts:>8.1f} |")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    metrics = load_metrics()
+    print(format_metrics(metrics) if metrics else f"No metrics recorded yet ({METRICS_FILE}).")
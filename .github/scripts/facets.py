@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+facets.py — precomputed listing counts by category, season, sponsorship,
+active and target year.
+
+facets.json (next to listings.json; generated, not committed) holds:
+
+  dimensions  ["category", "season", "sponsorship", "active", "target_year"]
+  totals      {"listings": n, "active": n}
+  marginals   per dimension, the number of listings with each value
+  cells       [category, season, sponsorship, active, target_year, count]
+              for every combination that occurs
+
+Only visible listings count. A listing aimed at several target years is in
+one cell per year, so cells sum to more than totals["listings"]; marginals
+and totals count each listing once per value.
+
+Nothing reads the file yet (the README badges and the site still count on
+their own), so the workflows don't commit it; `python facets.py` prints it.
+compute() builds it in one pass over a full load (update_readmes.py does this
+anyway). util.save_listings_to_json keeps it current on every add, edit or
+close through record(): the stored version of each saved listing is
+subtracted and the new version added, so nothing is re-aggregated. Run
+`python facets.py build` after editing listings.json by hand.
+
+Usage:
+  python facets.py build     # recompute from every listing
+  python facets.py           # print the marginals
+"""
+
+import json
+import os
+
+import util
+
+DIMENSIONS = ("category", "season", "sponsorship", "active", "target_year")
+UNSPECIFIED = "Unspecified"
+
+
+def facets_file():
+    # Follows util.LISTINGS_FILE so temporary stores (replay, benchmarks) get their own
+    return os.path.join(os.path.dirname(util.LISTINGS_FILE), "facets.json")
+
+
+def empty():
+    return {
+        "totals": {"listings": 0, "active": 0},
+        "marginals": {dim: {} for dim in DIMENSIONS},
+        "cells": {},
+    }
+
+
+def contributions(listing):
+    """(cell keys, (dimension, value) pairs) a listing counts towards."""
+    if not listing.get("is_visible", True):
+        return [], []
+    base = (
+        listing.get("category") or UNSPECIFIED,
+        listing.get("season") or UNSPECIFIED,
+        listing.get("sponsorship") or UNSPECIFIED,
+        bool(listing.get("active", True)),
+    )
+    years = listing.get("target_year") or [UNSPECIFIED]
+    if isinstance(years, str):
+        years = [years]
+    years = list(dict.fromkeys(years))
+    cells = [base + (year,) for year in years]
+    pairs = list(zip(DIMENSIONS, base)) + [("target_year", year) for year in years]
+    return cells, pairs
+
+
+def _bump(counts, key, delta):
+    counts[key] = counts.get(key, 0) + delta
+    if counts[key] == 0:
+        del counts[key]
+
+
+def apply(state, listing, delta):
+    """Add (delta=1) or remove (delta=-1) one listing's counts."""
+    cells, pairs = contributions(listing)
+    if not cells:
+        return
+    state["totals"]["listings"] += delta
+    if listing.get("active", True):
+        state["totals"]["active"] += delta
+    for cell in cells:
+        _bump(state["cells"], cell, delta)
+    for dim, value in pairs:
+        _bump(state["marginals"][dim], str(value).lower() if dim == "active" else value, delta)
+
+
+def compute(listings):
+    """Facet counts for a full set of listings, in one pass."""
+    state = empty()
+    for listing in listings:
+        apply(state, listing, 1)
+    return state
+
+
+def load():
+    """Stored facet counts, or None if facets.json doesn't exist yet."""
+    path = facets_file()
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        data = json.load(f)
+    state = empty()
+    state["totals"] = data["totals"]
+    state["marginals"] = data["marginals"]
+    state["cells"] = {tuple(cell[:-1]): cell[-1] for cell in data["cells"]}
+    return state
+
+
+def save(state):
+    """Write facets.json: one cell per line, so diffs stay readable."""
+    marginals = {dim: dict(sorted(state["marginals"][dim].items())) for dim in DIMENSIONS}
+    cells = sorted(state["cells"].items(), key=lambda item: tuple(str(v) for v in item[0]))
+    lines = [
+        "{",
+        f'  "dimensions": {json.dumps(list(DIMENSIONS))},',
+        f'  "totals": {json.dumps(state["totals"])},',
+        f'  "marginals": {json.dumps(marginals, ensure_ascii=False)},',
+        '  "cells": [',
+        ",\n".join(f"    {json.dumps([*cell, count], ensure_ascii=False)}" for cell, count in cells),
+        "  ]",
+        "}",
+    ]
+    with open(facets_file(), "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def record(previous, saved):
+    """Update facets.json for listings just saved.
+
+    `previous` holds the stored versions of those listings from before the
+    save (new listings are simply absent). Falls back to a full recompute if
+    there's no facets.json yet.
+    """
+    state = load()
+    if state is None:
+        save(compute(util.get_listings_from_json()))
+        return
+    before = {listing["id"]: listing for listing in previous}
+    for listing in saved:
+        if listing["id"] in before:
+            apply(state, before[listing["id"]], -1)
+        apply(state, listing, 1)
+    save(state)
+
+
+def format_marginals(state):
+    totals = state["totals"]
+    lines = [f"{totals['listings']} visible listing(s), {totals['active']} active"]
+    for dim in DIMENSIONS:
+        values = ", ".join(f"{value} {count}" for value, count in sorted(state["marginals"][dim].items()))
+        lines.append(f"  {dim}: {values}")
+    return "\n".join(lines)
+
+
+def main():
+    import sys
+    if sys.argv[1:] == ["build"]:
+        state = compute(util.get_listings_from_json())
+        save(state)
+        print(f"Wrote {facets_file()} ({len(state['cells'])} cells).")
+    else:
+        state = load()
+        if state is None:
+            print("No facets.json yet; run `python facets.py build`.")
+            return
+    print(format_marginals(state))
+
+
+if __name__ == "__main__":
+    main()
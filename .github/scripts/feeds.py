@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+feeds.py — Atom and JSON Feed of new and closed opportunities.
+
+Builds feeds/feed.json (JSON Feed 1.1) and feeds/atom.xml from listings.json.
+
+Updates are incremental: feed.json records, for every entry it has
+published, the timestamp it was published at (date_posted for "new",
+date_updated for "closed"). Each run builds entries only for listings whose
+entry is missing or older than the listing — so a back-dated PR, a bulk
+import or a listing closed again after being reactivated still gets its
+entry, which a single newest-timestamp watermark would skip — prepends them
+and trims the feed to FEED_SIZE. Finding them is one pass over the listings;
+the feed work and size stay constant. The Atom file is rendered from the same
+capped entry list.
+
+Entry ids are derived from the listing id (one for "new", one for "closed"),
+so readers de-duplicate reliably. Files are only rewritten when an entry
+changed (util.write_if_changed), which keeps their bytes — and HTTP ETags —
+stable between runs.
+
+Entries are tagged with the listing's canonical location keys (remote, US,
+US/NY, ...; see geo.py) so readers can filter the feed by location.
+"""
+
+import json
+import os
+from datetime import datetime, timezone
+from xml.sax.saxutils import escape
+
+import geo
+import util
+
+FEEDS_DIR = os.path.join(util.SCRIPT_DIR, "..", "..", "feeds")
+JSON_FEED = os.path.join(FEEDS_DIR, "feed.json")
+ATOM_FEED = os.path.join(FEEDS_DIR, "atom.xml")
+
+REPO_URL = "https://github.com/Jose-Gael-Cruz-Lopez/underclassmen-opportunities"
+RAW_URL = "https://raw.githubusercontent.com/Jose-Gael-Cruz-Lopez/underclassmen-opportunities/main"
+FEED_TITLE = "Underclassmen Opportunities"
+TAG_PREFIX = "tag:github.com,2026:underclassmen-opportunities"
+
+FEED_SIZE = 100
+
+ATTR_ENTITIES = {'"': "&quot;"}
+
+
+def isoformat(timestamp):
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def build_entry(listing, kind):
+    """JSON Feed item for a listing being added ("new") or closed ("closed")."""
+    timestamp = listing["date_posted"] if kind == "new" else listing["date_updated"]
+    prefix = "New" if kind == "new" else "Closed"
+    details = [listing.get("category", ""), ", ".join(listing.get("locations", []))]
+    if listing.get("deadline"):
+        details.append(f"Deadline: {listing['deadline']}")
+    return {
+        "id": f"{TAG_PREFIX}:{listing['id']}:{kind}",
+        "url": listing["url"],
+        "title": f"{prefix}: {listing['company_name']} — {listing['title']}",
+        "content_text": " · ".join(d for d in details if d),
+        "date_published": isoformat(timestamp),
+        "tags": [kind, listing.get("category", ""), *geo.listing_keys(listing)],
+        "_timestamp": timestamp,
+    }
+
+
+def load_feed():
+    """Existing JSON Feed items and feed state (empty feed if none yet)."""
+    if not os.path.exists(JSON_FEED):
+        return [], {}
+    with open(JSON_FEED, "r") as f:
+        feed = json.load(f)
+    return feed.get("items", []), feed.get("_underclassmen", {})
+
+
+def entry_kinds(listing):
+    """(kind, timestamp) for each entry a listing should have in the feed."""
+    if not listing.get("is_visible", True):
+        return []
+    kinds = [("new", listing["date_posted"])]
+    if not listing.get("active", True):
+        kinds.append(("closed", listing["date_updated"]))
+    return kinds
+
+
+def published_state(listings, state):
+    """{"<listing id>:<kind>": timestamp} already published.
+
+    Feeds written before this was recorded only kept a watermark; everything
+    at or before it counts as published. Entries for listings that no longer
+    exist are dropped.
+    """
+    if "published" in state:
+        ids = {listing["id"] for listing in listings}
+        return {key: ts for key, ts in state["published"].items() if key.rsplit(":", 1)[0] in ids}
+    watermark = state.get("watermark", 0)
+    return {
+        f"{listing['id']}:{kind}": timestamp
+        for listing in listings
+        for kind, timestamp in entry_kinds(listing)
+        if timestamp <= watermark
+    }
+
+
+def new_entries(listings, published):
+    """{published key: entry} for entries not yet published at the listing's
+    current timestamp."""
+    entries = {}
+    for listing in listings:
+        for kind, timestamp in entry_kinds(listing):
+            key = f"{listing['id']}:{kind}"
+            if published.get(key, -1) < timestamp:
+                entries[key] = build_entry(listing, kind)
+    return entries
+
+
+def merge(items, entries):
+    """Prepend new entries (newest first), drop superseded ids, cap the window."""
+    fresh = sorted(entries, key=lambda e: (-e["_timestamp"], e["id"]))
+    fresh_ids = {e["id"] for e in fresh}
+    merged = fresh + [item for item in items if item["id"] not in fresh_ids]
+    return merged[:FEED_SIZE]
+
+
+def render_json_feed(items, published):
+    return json.dumps({
+        "version": "https://jsonfeed.org/version/1.1",
+        "title": FEED_TITLE,
+        "home_page_url": REPO_URL,
+        "feed_url": f"{RAW_URL}/feeds/feed.json",
+        "description": "New and closed opportunities for college freshmen & sophomores.",
+        "items": items,
+        "_underclassmen": {"published": dict(sorted(published.items()))},
+    }, indent=2, ensure_ascii=False) + "\n"
+
+
+def render_atom(items):
+    updated = items[0]["date_published"] if items else isoformat(0)
+    out = [
+        '<?xml version="1.0" encoding="utf-8"?>',
+        '<feed xmlns="http://www.w3.org/2005/Atom">',
+        f"  <title>{escape(FEED_TITLE)}</title>",
+        f"  <id>{TAG_PREFIX}</id>",
+        f'  <link rel="alternate" href="{escape(REPO_URL, ATTR_ENTITIES)}"/>',
+        f'  <link rel="self" href="{escape(RAW_URL, ATTR_ENTITIES)}/feeds/atom.xml"/>',
+        f"  <updated>{updated}</updated>",
+    ]
+    for item in items:
+        out.extend([
+            "  <entry>",
+            f"    <id>{escape(item['id'])}</id>",
+            f"    <title>{escape(item['title'])}</title>",
+            f'    <link href="{escape(item["url"], ATTR_ENTITIES)}"/>',
+            f"    <updated>{item['date_published']}</updated>",
+            f"    <summary>{escape(item['content_text'])}</summary>",
+            *(f'    <category term="{escape(tag)}"/>' for tag in item["tags"] if tag),
+            "  </entry>",
+        ])
+    out.append("</feed>")
+    return "\n".join(out) + "\n"
+
+
+def run(listings):
+    """Update both feed files. Returns (files changed, new entry count)."""
+    items, state = load_feed()
+    published = published_state(listings, state)
+
+    entries = new_entries(listings, published)
+    if entries:
+        items = merge(items, list(entries.values()))
+        published.update((key, entry["_timestamp"]) for key, entry in entries.items())
+
+    os.makedirs(FEEDS_DIR, exist_ok=True)
+    changed = util.write_if_changed(JSON_FEED, render_json_feed(items, published))
+    changed = util.write_if_changed(ATOM_FEED, render_atom(items)) or changed
+
+    print(f"{len(entries)} new feed entr{'y' if len(entries) == 1 else 'ies'}, "
+          f"{len(items)} in window (max {FEED_SIZE}).")
+    return changed, len(entries)
+
+
+def main():
+    changed, new_entries = run(util.get_listings_from_json())
+    util.set_output("has_changes", "true" if changed else "false")
+    util.set_output("new_entries", new_entries)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+geo.py — canonical locations and a location -> listing-id index.
+
+normalize() turns one free-text location ("New York City, NY", "London",
+"Remote, US") into a record {city, state, country, remote, multiple}, and
+display() renders a record in one consistent form ("New York, NY",
+"London, UK", "Remote (US)").
+
+Each record also has hierarchical index keys, broadest first:
+
+    "New York, NY"  -> US, US/NY, US/NY/New York
+    "Toronto, ON"   -> CA, CA/ON, CA/ON/Toronto
+    "London, UK"    -> GB, GB/London
+    "Remote, US"    -> remote, US
+    "Multiple Locations" -> multiple
+
+Listings get keys at ingest time (contribution_approved, auto_extract,
+bulk_import): `locations` keeps the text as the contributor wrote it
+("Online / In-person", "New York, NY (Hybrid)"), and `location_keys` holds
+the union of the canonical keys. LocationIndex inverts location_keys, so
+"every remote listing" or "everything in NY" is one dict lookup. Listings
+saved before location_keys existed are normalized on the fly.
+
+Unrecognised text gets no keys.
+
+Usage:
+  python geo.py query KEY [--active]   # e.g. remote, US/NY, GB
+  python geo.py keys                   # every key with its listing count
+  python geo.py backfill               # add location_keys to existing listings
+"""
+
+import argparse
+import re
+import sys
+
+US_STATES = {
+    "AL": "Alabama", "AK": "Alaska", "AZ": "Arizona", "AR": "Arkansas", "CA": "California",
+    "CO": "Colorado", "CT": "Connecticut", "DE": "Delaware", "DC": "District of Columbia",
+    "FL": "Florida", "GA": "Georgia", "HI": "Hawaii", "ID": "Idaho", "IL": "Illinois",
+    "IN": "Indiana", "IA": "Iowa", "KS": "Kansas", "KY": "Kentucky", "LA": "Louisiana",
+    "ME": "Maine", "MD": "Maryland", "MA": "Massachusetts", "MI": "Michigan", "MN": "Minnesota",
+    "MS": "Mississippi", "MO": "Missouri", "MT": "Montana", "NE": "Nebraska", "NV": "Nevada",
+    "NH": "New Hampshire", "NJ": "New Jersey", "NM": "New Mexico", "NY": "New York",
+    "NC": "North Carolina", "ND": "North Dakota", "OH": "Ohio", "OK": "Oklahoma", "OR": "Oregon",
+    "PA": "Pennsylvania", "PR": "Puerto Rico", "RI": "Rhode Island", "SC": "South Carolina",
+    "SD": "South Dakota", "TN": "Tennessee", "TX": "Texas", "UT": "Utah", "VT": "Vermont",
+    "VA": "Virginia", "WA": "Washington", "WV": "West Virginia", "WI": "Wisconsin", "WY": "Wyoming",
+}
+CA_PROVINCES = {
+    "AB": "Alberta", "BC": "British Columbia", "MB": "Manitoba", "NB": "New Brunswick",
+    "NL": "Newfoundland and Labrador", "NS": "Nova Scotia", "NT": "Northwest Territories",
+    "NU": "Nunavut", "ON": "Ontario", "PE": "Prince Edward Island", "QC": "Quebec",
+    "SK": "Saskatchewan", "YT": "Yukon",
+}
+# state / province code -> country; the two code sets don't overlap
+REGIONS = {**{code: "US" for code in US_STATES}, **{code: "CA" for code in CA_PROVINCES}}
+REGION_NAMES = {**US_STATES, **CA_PROVINCES}
+STATE_BY_NAME = {name.lower(): code for code, name in REGION_NAMES.items()}
+
+# ISO 3166 alpha-2 code -> (display name, aliases)
+COUNTRIES = {
+    "US": ("US", ["united states", "united states of america", "usa", "us", "u.s.", "u.s.a."]),
+    "CA": ("Canada", ["canada"]),
+    "GB": ("UK", ["united kingdom", "uk", "u.k.", "great britain", "england", "scotland", "wales"]),
+    "IE": ("Ireland", ["ireland"]),
+    "IN": ("India", ["india"]),
+    "SG": ("Singapore", ["singapore"]),
+    "DE": ("Germany", ["germany"]),
+    "FR": ("France", ["france"]),
+    "NL": ("Netherlands", ["netherlands"]),
+    "CH": ("Switzerland", ["switzerland"]),
+    "MX": ("Mexico", ["mexico"]),
+    "BR": ("Brazil", ["brazil"]),
+    "JP": ("Japan", ["japan"]),
+    "CN": ("China", ["china"]),
+    "HK": ("Hong Kong", ["hong kong"]),
+    "AU": ("Australia", ["australia"]),
+    "IL": ("Israel", ["israel"]),
+}
+COUNTRY_BY_ALIAS = {alias: code for code, (_, aliases) in COUNTRIES.items() for alias in aliases}
+
+CITY_ALIASES = {
+    "nyc": "New York", "new york city": "New York", "manhattan": "New York",
+    "sf": "San Francisco", "bay area": "San Francisco Bay Area",
+    "la": "Los Angeles", "dc": "Washington", "washington dc": "Washington", "washington d.c.": "Washington",
+    "bangalore": "Bengaluru",
+}
+# Where a bare city name (no state / country given) is.
+CITY_HOMES = {
+    "New York": ("US", "NY"), "San Francisco": ("US", "CA"), "Los Angeles": ("US", "CA"),
+    "Seattle": ("US", "WA"), "Boston": ("US", "MA"), "Chicago": ("US", "IL"), "Austin": ("US", "TX"),
+    "Atlanta": ("US", "GA"), "Washington": ("US", "DC"), "Pittsburgh": ("US", "PA"),
+    "San Francisco Bay Area": ("US", "CA"),
+    "London": ("GB", None), "Toronto": ("CA", None), "Vancouver": ("CA", None),
+    "Dublin": ("IE", None), "Bengaluru": ("IN", None), "Singapore": ("SG", None),
+}
+
+REMOTE_RE = re.compile(r"\b(remote|virtual|online|work from home|wfh)\b", re.IGNORECASE)
+MULTIPLE_RE = re.compile(r"\b(multiple|various|several|nationwide)\b", re.IGNORECASE)
+
+
+def _empty():
+    return {"city": None, "state": None, "country": None, "remote": False, "multiple": False}
+
+
+def _place(part):
+    """(kind, value) for one comma-separated part: state (or province) / country / None."""
+    key = part.strip().strip(".").lower()
+    if part.strip().upper() in REGIONS and len(part.strip()) == 2:
+        return "state", part.strip().upper()
+    if key in STATE_BY_NAME:
+        return "state", STATE_BY_NAME[key]
+    if key in COUNTRY_BY_ALIAS or part.strip().lower() in COUNTRY_BY_ALIAS:
+        return "country", COUNTRY_BY_ALIAS.get(key) or COUNTRY_BY_ALIAS[part.strip().lower()]
+    return None, None
+
+
+def normalize(text):
+    """Canonical record for one free-text location, or None if unrecognised."""
+    record = _empty()
+    text = (text or "").strip()
+    if REMOTE_RE.search(text):
+        record["remote"] = True
+    if MULTIPLE_RE.search(text):
+        record["multiple"] = True
+
+    parts = [p.strip() for p in re.sub(r"\(.*?\)", "", text).split(",") if p.strip()]
+    # Walk from the broadest part (the end) inwards: "New York, New York, United States"
+    city_parts = []
+    for part in reversed(parts):
+        kind, value = _place(part)
+        if kind == "country" and not record["country"] and not city_parts:
+            record["country"] = value
+        elif kind == "state" and not record["state"] and not city_parts and not (
+            # "Washington" alone / "New York" alone are cities, not states
+            len(parts) == 1
+        ):
+            record["state"] = value
+            record["country"] = record["country"] or REGIONS[value]
+        else:
+            city_parts.insert(0, part)
+
+    if city_parts and not record["remote"] and not record["multiple"]:
+        city = ", ".join(city_parts)
+        city = CITY_ALIASES.get(city.lower(), city)
+        if len(city_parts) == 1 and not record["state"] and not record["country"]:
+            kind, value = _place(city)
+            if kind == "country":
+                record["country"] = value
+                city = None
+            elif city in CITY_HOMES:
+                record["country"], record["state"] = CITY_HOMES[city]
+            elif kind == "state":
+                # A bare state name that isn't also a known city
+                record["state"], record["country"] = value, REGIONS[value]
+                city = None
+            else:
+                return None
+        record["city"] = city
+    elif city_parts and (record["remote"] or record["multiple"]):
+        # "Remote, US" / "Multiple US Cities": pick up a country mentioned inline
+        for word in re.split(r"[\s,+/]+", " ".join(city_parts)):
+            kind, value = _place(word)
+            if kind == "country" and not record["country"]:
+                record["country"] = value
+
+    if not any(record.values()):
+        return None
+    if record["country"] == "SG" and record["city"] in (None, "Singapore"):
+        record["city"] = None
+    return record
+
+
+def display(record):
+    """One consistent human form for a record."""
+    if record["remote"] and not record["city"]:
+        return f"Remote ({COUNTRIES[record['country']][0]})" if record["country"] else "Remote"
+    if record["multiple"] and not record["city"]:
+        return f"Multiple Locations ({COUNTRIES[record['country']][0]})" if record["country"] else "Multiple Locations"
+    if record["city"]:
+        if record["state"]:
+            return f"{record['city']}, {record['state']}"
+        if record["country"]:
+            return f"{record['city']}, {COUNTRIES[record['country']][0]}"
+        return record["city"]
+    if record["state"]:
+        return REGION_NAMES[record["state"]]
+    return COUNTRIES[record["country"]][0] if record["country"] else ""
+
+
+def keys(record):
+    """Hierarchical index keys, broadest first."""
+    out = []
+    if record["remote"]:
+        out.append("remote")
+    if record["multiple"]:
+        out.append("multiple")
+    country = record["country"]
+    if country:
+        out.append(country)
+        if record["state"]:
+            out.append(f"{country}/{record['state']}")
+            if record["city"]:
+                out.append(f"{country}/{record['state']}/{record['city']}")
+        elif record["city"]:
+            out.append(f"{country}/{record['city']}")
+    return out
+
+
+def canonicalize(locations):
+    """(locations, location keys) for a listing's locations list.
+
+    The locations are kept as written (trimmed, repeats dropped); only the
+    keys are canonical.
+    """
+    shown, all_keys = [], []
+    for text in locations:
+        value = " ".join(text.split())
+        if value and value not in shown:
+            shown.append(value)
+        record = normalize(value)
+        for key in keys(record) if record else []:
+            if key not in all_keys:
+                all_keys.append(key)
+    return shown or ["Multiple Locations"], all_keys
+
+
+def listing_keys(listing):
+    """location_keys, normalizing on the fly for listings saved without them."""
+    if "location_keys" in listing:
+        return listing["location_keys"]
+    return canonicalize(listing.get("locations", []))[1]
+
+
+def summarize(locations, limit=4):
+    """Short regional summary for many locations: "Remote, CA, NY, UK +2"."""
+    regions = []
+    for text in locations:
+        record = normalize(text)
+        if record is None:
+            continue
+        if record["remote"]:
+            region = "Remote"
+        elif record["country"] == "US" and record["state"]:
+            region = record["state"]
+        elif record["country"]:
+            region = COUNTRIES[record["country"]][0]
+        else:
+            continue
+        if region not in regions:
+            regions.append(region)
+    if "Remote" in regions:
+        regions.insert(0, regions.pop(regions.index("Remote")))
+    more = f" +{len(regions) - limit}" if len(regions) > limit else ""
+    return ", ".join(regions[:limit]) + more
+
+
+def key_label(key):
+    """Human label for an index key: "US/NY" -> "New York", "GB" -> "UK"."""
+    if key in ("remote", "multiple"):
+        return "Remote" if key == "remote" else "Multiple Locations"
+    country, _, rest = key.partition("/")
+    if not rest:
+        return COUNTRIES[country][0] if country in COUNTRIES else key
+    state, _, city = rest.partition("/")
+    if state in REGIONS and REGIONS[state] == country:
+        return f"{city}, {state}" if city else REGION_NAMES[state]
+    return rest
+
+
+class LocationIndex:
+    """Inverted index: location key -> ids of listings with that key."""
+
+    def __init__(self, listings):
+        self.by_id = {l["id"]: l for l in listings}
+        self.postings = {}
+        for listing in listings:
+            for key in listing_keys(listing):
+                self.postings.setdefault(key, []).append(listing["id"])
+
+    def ids(self, key):
+        return self.postings.get(key, [])
+
+    def listings(self, key, active_only=False):
+        found = [self.by_id[i] for i in self.ids(key)]
+        if active_only:
+            found = [l for l in found if l.get("active", True) and l.get("is_visible", True)]
+        return found
+
+    def counts(self):
+        return {key: len(ids) for key, ids in sorted(self.postings.items())}
+
+
+def backfill():
+    """Add location_keys on every existing listing (locations are left as written)."""
+    import util
+    listings = util.get_listings_from_json()
+    changed = []
+    for listing in listings:
+        location_keys = canonicalize(listing.get("locations", []))[1]
+        if listing.get("location_keys") != location_keys:
+            listing["location_keys"] = location_keys
+            changed.append(listing)
+    if changed:
+        util.save_listings_to_json(changed)
+    print(f"Backfilled {len(changed)} of {len(listings)} listing(s).")
+
+
+def main():
+    import util
+    parser = argparse.ArgumentParser(description="Query listings by canonical location.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    query = sub.add_parser("query", help="listings under a location key")
+    query.add_argument("key")
+    query.add_argument("--active", action="store_true", help="only active, visible listings")
+    sub.add_parser("keys", help="every location key with its listing count")
+    sub.add_parser("backfill", help="add location_keys to existing listings")
+    args = parser.parse_args()
+
+    if args.command == "backfill":
+        backfill()
+        return
+    index = LocationIndex(util.get_listings_from_json())
+    if args.command == "keys":
+        for key, count in index.counts().items():
+            print(f"{count:>5}  {key}")
+        return
+    found = index.listings(args.key, active_only=args.active)
+    for listing in found:
+        print(f"{listing['company_name']} — {listing['title']}  [{', '.join(listing.get('locations', []))}]")
+    print(f"{len(found)} listing(s) under {args.key}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
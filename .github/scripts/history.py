@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+history.py — point-in-time queries over the git history of listings.json.
+
+"When did this listing close?" and "how many internships were open on
+March 1?" used to mean checking out old commits and re-parsing each one.
+This walks the first-parent git log of listings.json once, diffs each
+version against the one before, and keeps only what changed, per listing:
+
+  listing id -> {field: [time, value, time, value, ...]}
+
+Each field is a flat timeline of (commit time, new value) pairs, starting
+with the value the listing was added with. The "_present" timeline records
+when a listing appeared in (true) or disappeared from (false) the file. A
+field that's dropped from a listing is recorded as null.
+
+The index (history_index.json.gz, not tracked by git) remembers the last
+indexed commit, so `build` only reads the blobs of newer commits — all of
+them through one `git cat-file --batch` process. The previous version is
+rebuilt from the timelines, so old blobs are never read again. If the last
+indexed commit is no longer in the history (rewritten branch), it rebuilds.
+
+Queries bisect the timelines and never touch git:
+
+  state_at(id, t)             the listing as it was at time t, or None
+  open_at(t, category)        listings present, visible and active at t
+  changes(field, start, end)  (time, id, old, new) for a field in [start, end)
+  timeline(id)                every change to one listing
+
+Only the JSON backend's file has a git history; with the sharded or SQLite
+backends there is nothing to index.
+
+Usage:
+  python history.py build [--full]
+  python history.py listing <id | url | company>   # full timeline
+  python history.py at 2026-03-01 [--category Internship]
+  python history.py between 2026-03-01 2026-04-01
+"""
+
+import argparse
+import bisect
+import gzip
+import json
+import os
+import subprocess
+import time
+from datetime import datetime, timedelta
+
+import util
+
+INDEX_FILE = os.path.join(util.SCRIPT_DIR, "history_index.json.gz")
+FORMAT_VERSION = 1
+PRESENT = "_present"
+
+
+def git(*args, stdin=None):
+    result = subprocess.run(["git", *args], cwd=util.SCRIPT_DIR, input=stdin,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"git {args[0]} failed: {result.stderr.strip()}")
+    return result.stdout
+
+
+class BlobReader:
+    """Reads file versions through one long-lived `git cat-file --batch`."""
+
+    def __init__(self):
+        self.proc = subprocess.Popen(["git", "cat-file", "--batch"], cwd=util.SCRIPT_DIR,
+                                     stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+
+    def read(self, commit, path):
+        self.proc.stdin.write(f"{commit}:{path}\n".encode())
+        self.proc.stdin.flush()
+        header = self.proc.stdout.readline().decode().split()
+        if len(header) < 3 or header[1] != "blob":
+            return None
+        data = self.proc.stdout.read(int(header[2]))
+        self.proc.stdout.read(1)  # trailing newline
+        return data
+
+    def close(self):
+        self.proc.stdin.close()
+        self.proc.wait()
+
+
+def parse_day(text, end=True):
+    """Start or end of a YYYY-MM-DD day in PT, as a Unix timestamp. "Open on
+    March 1" means as of the end of that day (its last commit)."""
+    day = datetime.strptime(text, "%Y-%m-%d").replace(tzinfo=util.PST)
+    if not end:
+        return int(day.timestamp())
+    return int((day + timedelta(days=1)).timestamp()) - 1
+
+
+def format_time(t):
+    return datetime.fromtimestamp(t, util.PST).strftime("%Y-%m-%d %H:%M")
+
+
+class HistoryIndex:
+    def __init__(self, data=None):
+        data = data or {}
+        self.head = data.get("head")
+        self.commits = data.get("commits", [])
+        self.listings = data.get("listings", {})
+        self._times = {}
+
+    # -- building ------------------------------------------------------------
+
+    def latest(self, listing_id):
+        """Last known fields of a listing (present or not), without _present."""
+        timelines = self.listings.get(listing_id, {})
+        return {field: tl[-1] for field, tl in timelines.items()
+                if field != PRESENT and tl[-1] is not None}
+
+    def snapshot(self):
+        """Every listing present after the last indexed commit, by id."""
+        return {listing_id: self.latest(listing_id)
+                for listing_id, timelines in self.listings.items() if timelines[PRESENT][-1]}
+
+    def _record(self, listing_id, field, t, value):
+        timeline = self.listings.setdefault(listing_id, {}).setdefault(field, [])
+        if timeline and timeline[-2] == t:
+            timeline[-1] = value   # two commits in the same second: keep the later
+        else:
+            timeline.extend((t, value))
+
+    def apply(self, t, previous, current):
+        """Record the differences between two versions of listings.json."""
+        for listing_id, listing in current.items():
+            before = previous.get(listing_id)
+            if before is None:
+                before = self.latest(listing_id)
+                self._record(listing_id, PRESENT, t, True)
+            for field in listing.keys() | before.keys():
+                value = listing.get(field)
+                if field not in before or before[field] != value:
+                    if field in before or value is not None:
+                        self._record(listing_id, field, t, value)
+        for listing_id in previous.keys() - current.keys():
+            self._record(listing_id, PRESENT, t, False)
+
+    def update(self, full=False):
+        """Index commits after the last indexed one. Returns the number indexed."""
+        top = git("rev-parse", "--show-toplevel").strip()
+        path = os.path.relpath(os.path.realpath(util.LISTINGS_FILE), os.path.realpath(top))
+        if self.head and not full:
+            known = subprocess.run(["git", "merge-base", "--is-ancestor", self.head, "HEAD"],
+                                   cwd=util.SCRIPT_DIR, capture_output=True).returncode == 0
+            if not known:
+                print(f"Last indexed commit {self.head[:10]} is no longer in the history; rebuilding.")
+                full = True
+        if full:
+            self.__init__()
+
+        span = f"{self.head}..HEAD" if self.head else "HEAD"
+        log = git("log", "--first-parent", "--reverse", "--format=%H %ct", span, "--", f":(top){path}")
+        pending = [line.split() for line in log.splitlines() if line]
+        if not pending:
+            return 0
+
+        previous = self.snapshot()
+        last_t = self.commits[-1][1] if self.commits else 0
+        reader = BlobReader()
+        try:
+            for sha, ct in pending:
+                blob = reader.read(sha, path)
+                try:
+                    listings = json.loads(blob) if blob is not None else []
+                except ValueError:
+                    print(f"  {sha[:10]}: listings.json doesn't parse, skipped")
+                    continue
+                # First-parent order, but commit times can go backwards
+                t = max(int(ct), last_t)
+                current = {l["id"]: l for l in listings if isinstance(l, dict) and "id" in l}
+                self.apply(t, previous, current)
+                self.commits.append([sha, t])
+                previous, last_t = current, t
+        finally:
+            reader.close()
+        self.head = pending[-1][0]
+        self._times = {}
+        return len(pending)
+
+    # -- persistence ---------------------------------------------------------
+
+    @classmethod
+    def load(cls, path=INDEX_FILE):
+        if not os.path.exists(path):
+            return cls()
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != FORMAT_VERSION:
+            return cls()
+        return cls(data)
+
+    def save(self, path=INDEX_FILE):
+        data = {"version": FORMAT_VERSION, "head": self.head, "commits": self.commits,
+                "listings": self.listings}
+        payload = json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+        with gzip.open(path, "wb", compresslevel=6) as f:
+            f.write(payload.encode("utf-8"))
+
+    # -- querying ------------------------------------------------------------
+
+    def value_at(self, listing_id, field, t):
+        """A field's value at time t (None before it was first set)."""
+        timeline = self.listings.get(listing_id, {}).get(field)
+        if not timeline:
+            return None
+        times = self._times.get((listing_id, field))
+        if times is None:
+            times = self._times[(listing_id, field)] = timeline[0::2]
+        i = bisect.bisect_right(times, t)
+        return timeline[2 * i - 1] if i else None
+
+    def state_at(self, listing_id, t):
+        """The listing as it was at time t, or None if it wasn't in the file."""
+        if not self.value_at(listing_id, PRESENT, t):
+            return None
+        state = {}
+        for field in self.listings[listing_id]:
+            if field != PRESENT:
+                value = self.value_at(listing_id, field, t)
+                if value is not None:
+                    state[field] = value
+        return state
+
+    def listings_at(self, t, predicate=None):
+        states = (self.state_at(listing_id, t) for listing_id in self.listings)
+        return [s for s in states if s is not None and (predicate is None or predicate(s))]
+
+    def open_at(self, t, category=None):
+        """Listings present, visible and active at time t."""
+        return self.listings_at(t, lambda s: s.get("is_visible", True) and s.get("active", True)
+                                and (category is None or s.get("category") == category))
+
+    def changes(self, field, start, end):
+        """(time, listing id, old value, new value) for a field, start <= time < end."""
+        found = []
+        for listing_id, timelines in self.listings.items():
+            timeline = timelines.get(field)
+            if not timeline:
+                continue
+            times = timeline[0::2]
+            for i in range(bisect.bisect_left(times, start), bisect.bisect_left(times, end)):
+                old = timeline[2 * i - 1] if i else None
+                found.append((times[i], listing_id, old, timeline[2 * i + 1]))
+        return sorted(found)
+
+    def timeline(self, listing_id):
+        """Every change to a listing as (time, field, old value, new value)."""
+        events = []
+        for field, timeline in self.listings.get(listing_id, {}).items():
+            for i in range(0, len(timeline), 2):
+                old = timeline[i - 1] if i else None
+                events.append((timeline[i], field, old, timeline[i + 1]))
+        return sorted(events, key=lambda e: (e[0], e[1] != PRESENT, e[1]))
+
+    def closed_at(self, listing_id):
+        """Times a listing went from active to inactive."""
+        return [t for t, field, old, new in self.timeline(listing_id)
+                if field == "active" and old is True and new is False]
+
+    def find(self, query):
+        """Listing ids matching an id, a url, or a company name (case-insensitive)."""
+        if query in self.listings:
+            return [query]
+        query = query.lower()
+        return [listing_id for listing_id in self.listings
+                if query == self.latest(listing_id).get("url", "").lower()
+                or query in self.latest(listing_id).get("company_name", "").lower()]
+
+
+def label(index, listing_id):
+    latest = index.latest(listing_id)
+    return f"{latest.get('company_name', '?')} — {latest.get('title', '?')}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Point-in-time queries over listings.json history.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_parser = sub.add_parser("build", help="index new commits (or all with --full)")
+    build_parser.add_argument("--full", action="store_true")
+    listing_parser = sub.add_parser("listing", help="timeline of one listing")
+    listing_parser.add_argument("query", help="listing id, url or company name")
+    at_parser = sub.add_parser("at", help="listings open at the end of a day")
+    at_parser.add_argument("day", help="YYYY-MM-DD (PT)")
+    at_parser.add_argument("--category", choices=util.VALID_CATEGORIES)
+    between_parser = sub.add_parser("between", help="additions and closures in a date range")
+    between_parser.add_argument("start", help="YYYY-MM-DD (PT), inclusive")
+    between_parser.add_argument("end", help="YYYY-MM-DD (PT), inclusive")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        index = HistoryIndex.load()
+        start = time.perf_counter()
+        try:
+            indexed = index.update(full=args.full)
+        except RuntimeError as e:
+            util.fail(str(e))
+        if indexed or not os.path.exists(INDEX_FILE):
+            index.save()
+        print(f"Indexed {indexed} new commit(s); {len(index.commits)} commit(s), "
+              f"{len(index.listings)} listing(s) in {(time.perf_counter() - start) * 1000:.0f} ms "
+              f"({os.path.getsize(INDEX_FILE) / 1024:.0f} KiB).")
+        return
+
+    index = HistoryIndex.load()
+    if not index.commits:
+        print("No history index yet; run `python history.py build`.")
+        return
+
+    if args.command == "listing":
+        for listing_id in index.find(args.query):
+            print(f"{label(index, listing_id)} ({listing_id})")
+            for t, field, old, new in index.timeline(listing_id):
+                if field == PRESENT:
+                    print(f"  {format_time(t)}  {'added' if new else 'removed'}")
+                elif old is not None or field in ("active", "is_visible"):
+                    print(f"  {format_time(t)}  {field}: {json.dumps(old)} → {json.dumps(new)}")
+            closed = index.closed_at(listing_id)
+            if closed:
+                print(f"  closed: {', '.join(format_time(t) for t in closed)}")
+    elif args.command == "at":
+        states = index.open_at(parse_day(args.day), args.category)
+        print(f"{len(states)} listing(s) open at the end of {args.day}"
+              + (f" ({args.category})" if args.category else ""))
+        counts = {}
+        for state in states:
+            counts[state.get("category", "?")] = counts.get(state.get("category", "?"), 0) + 1
+        for category, count in sorted(counts.items()):
+            print(f"  {category}: {count}")
+    elif args.command == "between":
+        start = parse_day(args.start, end=False)
+        end = parse_day(args.end) + 1
+        present = index.changes(PRESENT, start, end)
+        active = index.changes("active", start, end)
+        groups = [
+            ("added", [e for e in present if e[3] is True]),
+            ("removed", [e for e in present if e[3] is False]),
+            ("closed", [e for e in active if e[2] is True and e[3] is False]),
+            ("reopened", [e for e in active if e[2] is False and e[3] is True]),
+        ]
+        print(f"{args.start} to {args.end}: " + ", ".join(f"{len(e)} {name}" for name, e in groups))
+        for name, events in groups:
+            for t, listing_id, _, _ in events:
+                print(f"  {format_time(t)}  {name:<8} {label(index, listing_id)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+issue_forms.py — parse GitHub issue-form bodies into field-id keyed records.
+
+GitHub renders an issue form as "### <label>" headings followed by the
+answer. The labels differ between templates ("Link" vs "Link to Opportunity
+Posting") but the field ids in .github/ISSUE_TEMPLATE/*.yaml are shared
+(url, company_name, title, location, deadline, ...), so both auto_extract.py
+and contribution_approved.py look fields up by id via parse().
+
+The label -> field map is compiled from the templates once and cached in
+issue_forms.json (not tracked by git), keyed by a hash of the template files
+so it is rebuilt whenever a form changes.
+
+Values are typed from the form definition:
+  - multi-select dropdowns   -> list of strings
+  - Yes / No dropdowns       -> bool
+  - everything else          -> stripped string
+Unanswered fields ("_No response_") are omitted. Headings that match no
+template field are kept under a slug of their label.
+
+Usage:
+  python issue_forms.py            # rebuild the cache and print the field map
+"""
+
+import glob
+import hashlib
+import json
+import os
+import re
+
+import util
+
+TEMPLATES_DIR = os.path.join(util.SCRIPT_DIR, "..", "ISSUE_TEMPLATE")
+CACHE_FILE = os.path.join(util.SCRIPT_DIR, "issue_forms.json")
+
+NO_RESPONSE = "_No response_"
+
+SECTION_RE = re.compile(r"^### +(.+?)[ \t]*\n(.*?)(?=^### |\Z)", re.MULTILINE | re.DOTALL)
+ITEM_RE = re.compile(r"^\s*- type:\s*(\w+)", re.MULTILINE)
+ID_RE = re.compile(r"^\s+id:\s*(\S+)", re.MULTILINE)
+LABEL_RE = re.compile(r"^\s+label:\s*(.+?)\s*$", re.MULTILINE)
+MULTIPLE_RE = re.compile(r"^\s+multiple:\s*true\b", re.MULTILINE)
+OPTION_RE = re.compile(r"^\s+- (.+?)\s*$", re.MULTILINE)
+FORM_LABELS_RE = re.compile(r"^labels:\s*\[(.*)\]", re.MULTILINE)
+
+_fields = None
+
+
+def normalize_label(label):
+    return " ".join(label.lower().split())
+
+
+def slug(label):
+    return re.sub(r"[^a-z0-9]+", "_", label.lower()).strip("_")
+
+
+def unquote(value):
+    return value.strip().strip("\"'")
+
+
+def template_paths():
+    return sorted(glob.glob(os.path.join(TEMPLATES_DIR, "*.yaml")))
+
+
+def signature(paths):
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(os.path.basename(path).encode())
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def read_template(text):
+    """Fields of one issue form: [{"id", "label", "type", "multiple", "options"}].
+
+    The templates only use a small, regular subset of YAML, so each body item
+    is read with a few line patterns rather than pulling in a YAML parser.
+    """
+    fields = []
+    starts = [m.start() for m in ITEM_RE.finditer(text)] + [len(text)]
+    for start, end in zip(starts, starts[1:]):
+        item = text[start:end]
+        kind = ITEM_RE.match(item).group(1)
+        id_m, label_m = ID_RE.search(item), LABEL_RE.search(item)
+        if kind == "markdown" or not id_m or not label_m:
+            continue
+        options_at = item.find("options:")
+        options = []
+        if options_at != -1:
+            block = item[options_at:].split("validations:")[0]
+            options = [unquote(o) for o in OPTION_RE.findall(block)]
+        fields.append({
+            "id": id_m.group(1),
+            "label": unquote(label_m.group(1)),
+            "type": kind,
+            "multiple": bool(MULTIPLE_RE.search(item)),
+            "options": options,
+        })
+    return fields
+
+
+def compile_fields():
+    """Build {normalized label: field spec} from every template, using the cache."""
+    paths = template_paths()
+    sig = signature(paths)
+    if os.path.exists(CACHE_FILE):
+        with open(CACHE_FILE, "r") as f:
+            cached = json.load(f)
+        if cached.get("signature") == sig:
+            return cached["fields"]
+
+    fields = {}
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for spec in read_template(f.read()):
+                fields[normalize_label(spec["label"])] = spec
+
+    with open(CACHE_FILE, "w") as f:
+        json.dump({"signature": sig, "fields": fields}, f, indent=2)
+    return fields
+
+
+def get_fields():
+    global _fields
+    if _fields is None:
+        _fields = compile_fields()
+    return _fields
+
+
+def typed_value(spec, value):
+    if spec["type"] != "dropdown":
+        return value
+    if spec["multiple"]:
+        return [v.strip() for v in value.split(",") if v.strip()]
+    if spec["options"] == ["Yes", "No"]:
+        return value == "Yes"
+    return value
+
+
+def parse(body):
+    """Parse an issue-form body into {field id: typed value}."""
+    fields = get_fields()
+    data = {}
+    for label, raw in SECTION_RE.findall((body or "").replace("\r\n", "\n")):
+        value = raw.strip()
+        if not value or value == NO_RESPONSE:
+            continue
+        spec = fields.get(normalize_label(label))
+        if spec is None:
+            data[slug(label)] = value
+        else:
+            data[spec["id"]] = typed_value(spec, value)
+    return data
+
+
+if __name__ == "__main__":
+    if os.path.exists(CACHE_FILE):
+        os.remove(CACHE_FILE)
+    for label, spec in sorted(get_fields().items()):
+        kind = spec["type"] + (" (multiple)" if spec["multiple"] else "")
+        print(f"{label!r:60} -> {spec['id']:<18} {kind}")
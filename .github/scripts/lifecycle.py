@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+lifecycle.py — move listings through OPENS SOON → OPEN → CLOSING SOON → CLOSED.
+
+Deadlines are parsed ONCE, when a listing is added (contribution_approved.py,
+auto_extract.py), into two optional Unix timestamps on the listing:
+
+  - opens_at     midnight PT on the day applications open
+  - deadline_at  midnight PT on the deadline day
+
+(The existing free-text `deadline` field is kept for display.)
+
+Each listing also records its current `status`. The engine keeps a min-heap
+keyed by every listing's NEXT transition time, so a daily run only pops the
+listings that are actually due — O(k log n) — instead of re-scanning text.
+A listing that reaches CLOSED is marked inactive.
+
+Usage:
+  python lifecycle.py             # apply due transitions to listings.json
+  python lifecycle.py --backfill  # parse deadline_at/opens_at from existing `deadline` text
+"""
+
+import argparse
+import heapq
+import re
+from datetime import datetime
+
+import util
+from closing_soon import CLOSING_SOON_DAYS, DATE_RE, MONTHS, parse_date
+
+DAY = 24 * 3600
+
+OPENS_SOON = "OPENS SOON"
+OPEN = "OPEN"
+CLOSING_SOON = "CLOSING SOON"
+CLOSED = "CLOSED"
+
+# Statuses only ever move forward through this order.
+RANK = {OPENS_SOON: 0, OPEN: 1, CLOSING_SOON: 2, CLOSED: 3}
+
+# "Opens September 10, 2026" / "Opens Sep 1, 2026"
+OPENS_RE = re.compile(
+    rf"\b[Oo]pens\s+(?:on\s+)?({MONTHS})\.?\s+(\d{{1,2}}),?\s+(\d{{4}})\b"
+)
+
+
+def parse_deadline_fields(deadline_text, opens_text="", today=None):
+    """Parse free-text deadline/opening dates into listing timestamp fields.
+
+    Returns a dict with any of `deadline_at` / `opens_at` that could be parsed.
+    The deadline is the earliest date that hasn't passed yet; if every date is
+    in the past, the latest one (so the listing lands straight in CLOSED).
+    "Rolling", "Check site" and friends yield no deadline at all.
+    """
+    today = today or datetime.now(tz=util.PST)
+    fields = {}
+    deadline_text = deadline_text or ""
+
+    opens_match = OPENS_RE.search(deadline_text)
+    if opens_match:
+        deadline_text = deadline_text[:opens_match.start()] + deadline_text[opens_match.end():]
+    else:
+        opens_match = DATE_RE.search(opens_text or "")
+    if opens_match:
+        opens = parse_date(*opens_match.groups())
+        if opens:
+            fields["opens_at"] = int(opens.timestamp())
+
+    dates = [parse_date(*m.groups()) for m in DATE_RE.finditer(deadline_text)]
+    dates = [d for d in dates if d]
+    if dates:
+        upcoming = [d for d in dates if d.date() >= today.date()]
+        deadline = min(upcoming) if upcoming else max(dates)
+        fields["deadline_at"] = int(deadline.timestamp())
+
+    return fields
+
+
+def status_at(listing, now):
+    """Status a listing should have at Unix time `now`."""
+    if not listing.get("active", True):
+        return CLOSED
+    opens = listing.get("opens_at")
+    deadline = listing.get("deadline_at")
+    if opens and now < opens:
+        return OPENS_SOON
+    if deadline:
+        if now >= deadline + DAY:
+            return CLOSED
+        if now >= deadline - CLOSING_SOON_DAYS * DAY:
+            return CLOSING_SOON
+    return OPEN
+
+
+def set_status(listing, now):
+    """Record a new listing's status at `now`. A listing that is already past
+    its deadline is added as CLOSED and inactive."""
+    listing["status"] = status_at(listing, now)
+    if listing["status"] == CLOSED:
+        listing["active"] = False
+
+
+def next_transition_time(listing):
+    """When the listing's recorded status next changes, or None if never.
+
+    A listing with no recorded status, an inactive one not yet marked CLOSED,
+    or one marked CLOSED that is still active is due immediately.
+    """
+    status = listing.get("status")
+    if status not in RANK or (status == CLOSED) == listing.get("active", True):
+        return 0
+    boundaries = []
+    if listing.get("opens_at"):
+        boundaries.append((listing["opens_at"], RANK[OPEN]))
+    if listing.get("deadline_at"):
+        boundaries.append((listing["deadline_at"] - CLOSING_SOON_DAYS * DAY, RANK[CLOSING_SOON]))
+        boundaries.append((listing["deadline_at"] + DAY, RANK[CLOSED]))
+    due = [t for t, rank in boundaries if rank > RANK[status]]
+    return min(due) if due else None
+
+
+class LifecycleEngine:
+    """Min-heap of (next transition time, listing id) over a set of listings."""
+
+    def __init__(self, listings):
+        self.by_id = {listing["id"]: listing for listing in listings}
+        # listing id -> its live heap entry's time; older entries are skipped on pop
+        self.due = {}
+        self.heap = []
+        for listing in listings:
+            t = next_transition_time(listing)
+            if t is not None:
+                self.due[listing["id"]] = t
+                self.heap.append((t, listing["id"]))
+        heapq.heapify(self.heap)
+
+    def schedule(self, listing):
+        """(Re)queue a listing, e.g. after it was added or its dates changed."""
+        self.by_id[listing["id"]] = listing
+        t = next_transition_time(listing)
+        if t is None:
+            self.due.pop(listing["id"], None)
+            return
+        self.due[listing["id"]] = t
+        heapq.heappush(self.heap, (t, listing["id"]))
+
+    def advance(self, now):
+        """Apply every transition due at or before `now`.
+
+        Returns a list of (listing, old_status, new_status).
+        """
+        transitions = []
+        while self.heap and self.heap[0][0] <= now:
+            t, listing_id = heapq.heappop(self.heap)
+            listing = self.by_id.get(listing_id)
+            if listing is None or self.due.get(listing_id) != t:
+                continue
+            del self.due[listing_id]
+            old = listing.get("status")
+            new = status_at(listing, now)
+            deactivate = new == CLOSED and listing.get("active", True)
+            if deactivate:
+                listing["active"] = False
+                listing["date_updated"] = now
+            if new != old or deactivate:
+                listing["status"] = new
+                transitions.append((listing, old, new))
+            t = next_transition_time(listing)
+            if t is not None and t > now:
+                self.due[listing_id] = t
+                heapq.heappush(self.heap, (t, listing_id))
+        return transitions
+
+
+def backfill(listings):
+    """Parse deadline_at/opens_at for listings that only have display text."""
+    filled = 0
+    for listing in listings:
+        if "deadline_at" in listing or "opens_at" in listing:
+            continue
+        fields = parse_deadline_fields(listing.get("deadline", ""))
+        if fields:
+            listing.update(fields)
+            filled += 1
+    return filled
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply due listing status transitions.")
+    parser.add_argument("--backfill", action="store_true",
+                        help="parse timestamps from existing `deadline` text first")
+    args = parser.parse_args()
+
+    listings = util.get_listings_from_json()
+
+    filled = backfill(listings) if args.backfill else 0
+    if args.backfill:
+        print(f"Backfilled deadline timestamps on {filled} listing(s).")
+
+    was_active = {listing["id"] for listing in listings if listing.get("active", True)}
+    engine = LifecycleEngine(listings)
+    transitions = engine.advance(util.get_current_timestamp())
+
+    if transitions or filled:
+        util.save_listings_to_json(listings)
+
+    for listing, old, new in transitions:
+        print(f"  {listing['company_name']} — {listing['title']}: {old or 'unset'} → {new}")
+    # Listings that were already inactive only get their status recorded
+    closed = sum(1 for listing, _, new in transitions if new == CLOSED and listing["id"] in was_active)
+    print(f"Applied {len(transitions)} transition(s), {closed} closed.")
+
+    util.set_output("transitions", len(transitions))
+    util.set_output("closed_count", closed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+link_check.py — find dead Apply links in listings.json, README.md and ARCHIVE.md.
+
+Every Apply URL is checked concurrently with asyncio:
+  - HEAD first; servers that reject HEAD (403/405/501, etc.) get a GET
+  - redirects are followed and the final URL is recorded
+  - at most PER_HOST_LIMIT requests in flight per host, spaced by
+    PER_HOST_INTERVAL seconds, so one ATS host isn't hammered
+
+Results are persisted to link_cache.json with a per-URL TTL (healthy links
+are rechecked less often than broken ones), so a nightly run only touches
+stale entries. `--offline` skips the network entirely and reports from cache.
+
+A link counts as dead once it is definitely gone (404/410, unresolvable host)
+on DEAD_CONFIRMATIONS checks in a row; a single failure only marks it
+"suspect" and schedules a recheck, so one DNS hiccup or flaky server doesn't
+report a live posting. link_report.json lists:
+
+  dead_links        every dead URL with its status and the files it appears
+                    in (listings.json, README.md, ARCHIVE.md)
+  close_candidates  listings behind a dead URL, in the same shape as a Close
+                    Opportunity issue (company_name / title / url / reason),
+                    ready to feed into contribution_approved.handle_close_opportunity
+  errors            URLs whose last check failed in some other way
+
+Usage:
+  python link_check.py [--offline] [--force] [--timeout SECS] [--concurrency N]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import socket
+import time
+import urllib.error
+import urllib.request
+from urllib.parse import urlparse
+
+import util
+
+ROOT = os.path.join(util.SCRIPT_DIR, "..", "..")
+ARCHIVE_FILE = os.path.join(ROOT, "ARCHIVE.md")
+CACHE_FILE = os.path.join(util.SCRIPT_DIR, "link_cache.json")
+REPORT_FILE = os.path.join(util.SCRIPT_DIR, "link_report.json")
+
+HREF_RE = re.compile(r'href="(https?://[^"]+)"')
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+
+DEFAULT_CONCURRENCY = 16
+DEFAULT_TIMEOUT = 15
+PER_HOST_LIMIT = 2
+PER_HOST_INTERVAL = 0.5
+
+# Status codes where a HEAD answer isn't trustworthy and a GET is worth a try.
+HEAD_FALLBACK_CODES = {400, 403, 404, 405, 429, 500, 501, 503}
+
+# Status codes that mean the posting is gone, not that the server is grumpy.
+DEAD_CODES = {404, 410}
+
+# Per-URL TTLs (seconds). Healthy links are stable; failures are rechecked
+# sooner so a transient outage doesn't sit in the report for a week.
+TTL_OK = 7 * 24 * 3600
+TTL_DEAD = 24 * 3600
+TTL_ERROR = 6 * 3600
+
+# Consecutive dead results needed before a link is reported dead.
+DEAD_CONFIRMATIONS = 2
+
+CLOSE_REASON = "Posting removed by company"
+
+
+def collect_urls(listings, markdown_files):
+    """Map each Apply URL to the listings that use it and the files it is in.
+
+    Returns ({url: [listing, ...]}, {url: [source, ...]}). URLs that only
+    appear in markdown map to an empty listing list — they're still checked
+    and reported as dead links, but can't become close candidates.
+    """
+    urls, sources = {}, {}
+    for listing in listings:
+        if listing.get("active", True) and listing.get("url"):
+            urls.setdefault(listing["url"], []).append(listing)
+            sources.setdefault(listing["url"], ["listings.json"])
+    for path in markdown_files:
+        if not os.path.exists(path):
+            continue
+        name = os.path.basename(path)
+        with open(path, "r", encoding="utf-8") as f:
+            for url in HREF_RE.findall(f.read()):
+                if "img.shields.io" not in url:
+                    urls.setdefault(url, [])
+                    found_in = sources.setdefault(url, [])
+                    if name not in found_in:
+                        found_in.append(name)
+    return urls, sources
+
+
+def load_cache(path=CACHE_FILE):
+    """Load the persisted result cache, or an empty one."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save_cache(cache, path=CACHE_FILE):
+    """Persist the result cache (sorted, so diffs stay readable)."""
+    with open(path, "w") as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+
+
+def is_stale(entry, now):
+    """True if a cache entry has outlived its TTL."""
+    return entry is None or entry["checked"] + entry["ttl"] <= now
+
+
+def classify(status, error, previous=None):
+    """Return (state, ttl, failures) for a check result.
+
+    state is 'ok', 'suspect' (gone, but not yet confirmed), 'dead' (gone on
+    DEAD_CONFIRMATIONS checks in a row) or 'error'. `previous` is the URL's
+    last cache entry; failures counts its consecutive gone results.
+    """
+    if status is not None and status < 400:
+        return "ok", TTL_OK, 0
+    if status in DEAD_CODES or error == "unresolvable host":
+        failures = (previous or {}).get("failures", 0) + 1
+        if failures >= DEAD_CONFIRMATIONS:
+            return "dead", TTL_DEAD, failures
+        return "suspect", TTL_ERROR, failures
+    return "error", TTL_ERROR, 0
+
+
+def fetch(url, method, timeout):
+    """Blocking single request. Returns (status, final_url, error)."""
+    request = urllib.request.Request(url, method=method, headers={"User-Agent": USER_AGENT})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, response.geturl(), None
+    except urllib.error.HTTPError as e:
+        return e.code, e.geturl() or url, None
+    except urllib.error.URLError as e:
+        if isinstance(e.reason, socket.gaierror):
+            return None, url, "unresolvable host"
+        return None, url, str(e.reason)
+    except (socket.timeout, TimeoutError):
+        return None, url, "timeout"
+    except Exception as e:
+        return None, url, str(e)
+
+
+class HostLimiter:
+    """Per-host concurrency cap plus a minimum gap between request starts."""
+
+    def __init__(self, limit=None, interval=None):
+        self.limit = PER_HOST_LIMIT if limit is None else limit
+        self.interval = PER_HOST_INTERVAL if interval is None else interval
+        self._semaphores = {}
+        self._locks = {}
+        self._last_start = {}
+
+    def _for(self, host):
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self.limit)
+            self._locks[host] = asyncio.Lock()
+            self._last_start[host] = 0.0
+        return self._semaphores[host], self._locks[host]
+
+    async def run(self, host, func, *args):
+        semaphore, lock = self._for(host)
+        async with semaphore:
+            async with lock:
+                wait = self._last_start[host] + self.interval - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                self._last_start[host] = time.monotonic()
+            return await asyncio.to_thread(func, *args)
+
+
+async def check_url(url, limiter, global_semaphore, timeout, previous=None):
+    """HEAD-then-GET check of one URL. Returns a cache entry."""
+    host = urlparse(url).hostname or ""
+    async with global_semaphore:
+        status, final_url, error = await limiter.run(host, fetch, url, "HEAD", timeout)
+        method = "HEAD"
+        if (status is None and error != "unresolvable host") or status in HEAD_FALLBACK_CODES:
+            status, final_url, error = await limiter.run(host, fetch, url, "GET", timeout)
+            method = "GET"
+    state, ttl, failures = classify(status, error, previous)
+    entry = {
+        "state": state,
+        "status": status,
+        "method": method,
+        "checked": int(time.time()),
+        "ttl": ttl,
+    }
+    if failures:
+        entry["failures"] = failures
+    if final_url and final_url != url:
+        entry["final_url"] = final_url
+    if error:
+        entry["error"] = error
+    return entry
+
+
+async def check_urls(urls, cache, concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_TIMEOUT, force=False):
+    """Check every stale URL in `urls`, updating `cache` in place.
+
+    Returns the number of URLs actually requested.
+    """
+    now = time.time()
+    stale = [u for u in urls if force or is_stale(cache.get(u), now)]
+    if not stale:
+        return 0
+    limiter = HostLimiter()
+    global_semaphore = asyncio.Semaphore(concurrency)
+    results = await asyncio.gather(
+        *(check_url(u, limiter, global_semaphore, timeout, cache.get(u)) for u in stale)
+    )
+    for url, entry in zip(stale, results):
+        cache[url] = entry
+    return len(stale)
+
+
+def dead_links(sources, cache):
+    """Every dead URL with its status and the files it appears in."""
+    dead = []
+    for url in sorted(sources):
+        entry = cache.get(url)
+        if entry and entry["state"] == "dead":
+            dead.append({
+                "url": url,
+                "status": entry["status"],
+                "error": entry.get("error", ""),
+                "sources": sources[url],
+            })
+    return dead
+
+
+def close_candidates(urls, cache):
+    """Close-issue-shaped records for listings whose link is dead."""
+    candidates = []
+    for url, listings in urls.items():
+        entry = cache.get(url)
+        if not entry or entry["state"] != "dead":
+            continue
+        for listing in listings:
+            candidates.append({
+                "id": listing["id"],
+                "company_name": listing["company_name"],
+                "title": listing["title"],
+                "url": url,
+                "reason": CLOSE_REASON,
+                "status": entry["status"],
+                "error": entry.get("error", ""),
+            })
+    return sorted(candidates, key=lambda c: (c["company_name"].lower(), c["title"].lower()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--offline", action="store_true", help="report from cache only, no network")
+    parser.add_argument("--force", action="store_true", help="ignore TTLs and recheck every URL")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    args = parser.parse_args()
+
+    listings = util.get_listings_from_json()
+    urls, sources = collect_urls(listings, [util.README_FILE, ARCHIVE_FILE])
+    cache = load_cache()
+
+    checked = 0
+    if not args.offline:
+        started = time.monotonic()
+        checked = asyncio.run(check_urls(urls, cache, args.concurrency, args.timeout, args.force))
+        save_cache(cache)
+        print(f"Checked {checked} of {len(urls)} URL(s) in {time.monotonic() - started:.1f}s "
+              f"({len(urls) - checked} fresh in cache).")
+
+    dead = dead_links(sources, cache)
+    candidates = close_candidates(urls, cache)
+    unchecked = sum(1 for u in urls if u not in cache)
+    suspect = sum(1 for u in urls if cache.get(u, {}).get("state") == "suspect")
+    errors = sorted(u for u in urls if cache.get(u, {}).get("state") == "error")
+
+    with open(REPORT_FILE, "w") as f:
+        json.dump({"dead_links": dead, "close_candidates": candidates, "errors": errors}, f, indent=2)
+
+    print(f"{len(dead)} dead link(s), {len(candidates)} close candidate(s), {suspect} awaiting a recheck, "
+          f"{len(errors)} transient error(s), {unchecked} never checked.")
+    for d in dead:
+        print(f"  DEAD  {d['url']} ({d['status'] or d['error']}) in {', '.join(d['sources'])}")
+
+    util.set_output("checked_count", checked)
+    util.set_output("dead_count", len(dead))
+    util.set_output("dead_links", "\n".join(
+        f"- {d['url']} ({d['status'] or d['error']}) in {', '.join(d['sources'])}" for d in dead
+    ))
+    util.set_output("close_candidate_count", len(candidates))
+    util.set_output("close_candidates", "\n".join(
+        f"- {c['company_name']} — {c['title']}: {c['url']}" for c in candidates
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Time-window queries over listings.json.
+
+ListingIndex keeps one sorted (timestamp, position) array per time field —
+date_posted, date_updated and deadline_at — so range queries are a pair of
+bisects plus the k matches: O(log n + k) instead of a scan.
+
+    index = ListingIndex(util.get_listings_from_json())
+    index.posted_since(week_ago)
+    index.deadline_within(14, now=today_ts)
+    index.updated_between(t1, t2)
+
+Queries return listings in timestamp order. Pass active_only=True to drop
+inactive / hidden listings.
+
+index_for(listings) reuses one index per loaded list, so stages that share
+a load (build.py) sort it once.
+"""
+
+import threading
+from bisect import bisect_left, bisect_right
+
+DAY = 24 * 3600
+
+INDEXED_FIELDS = ("date_posted", "date_updated", "deadline_at")
+
+
+class ListingIndex:
+    """Sorted timestamp indexes over a list of listings."""
+
+    def __init__(self, listings):
+        self.listings = list(listings)
+        self._keys = {}
+        self._positions = {}
+        for field in INDEXED_FIELDS:
+            pairs = sorted(
+                (listing[field], i)
+                for i, listing in enumerate(self.listings)
+                if listing.get(field) is not None
+            )
+            self._keys[field] = [t for t, _ in pairs]
+            self._positions[field] = [i for _, i in pairs]
+
+    def __len__(self):
+        return len(self.listings)
+
+    def between(self, field, start=None, end=None, active_only=False):
+        """Listings with start <= listing[field] < end (either bound optional)."""
+        keys = self._keys[field]
+        lo = 0 if start is None else bisect_left(keys, start)
+        hi = len(keys) if end is None else bisect_left(keys, end)
+        return self._collect(field, lo, hi, active_only)
+
+    def posted_since(self, since, active_only=False):
+        return self.between("date_posted", since, None, active_only)
+
+    def posted_between(self, start, end, active_only=False):
+        return self.between("date_posted", start, end, active_only)
+
+    def updated_between(self, start, end, active_only=False):
+        return self.between("date_updated", start, end, active_only)
+
+    def deadline_within(self, days, now, active_only=True):
+        """Listings whose deadline day is today or within the next `days` days.
+
+        `now` is a Unix timestamp. Matches closing_soon.py's rule
+        (0 <= days until deadline <= days), with deadline_at at midnight PT.
+        """
+        keys = self._keys["deadline_at"]
+        lo = bisect_left(keys, now - DAY + 1)
+        hi = bisect_right(keys, now + days * DAY)
+        return self._collect("deadline_at", lo, hi, active_only)
+
+    def _collect(self, field, lo, hi, active_only):
+        results = []
+        for i in self._positions[field][lo:hi]:
+            listing = self.listings[i]
+            if active_only and not (listing.get("active", True) and listing.get("is_visible", True)):
+                continue
+            results.append(listing)
+        return results
+
+
+_cached = (None, None)
+_lock = threading.Lock()
+
+
+def index_for(listings):
+    """ListingIndex over a loaded list, reused across calls on the same list.
+
+    The list must not change between calls; load it again to pick up edits.
+    """
+    global _cached
+    with _lock:
+        owner, index = _cached
+        if owner is not listings or len(index) != len(listings):
+            index = ListingIndex(listings)
+            _cached = (listings, index)
+        return index
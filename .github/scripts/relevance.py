@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+relevance.py — trim page text to the parts that matter before the model call.
+
+Career pages flatten to a lot of text that says nothing about the opening:
+cookie banners, benefits lists, EEO statements, footers. trim() splits the
+cleaned page text (auto_extract.parse_page output) into blocks, scores each
+block by the density of job-relevant keywords — words from the page title,
+eligibility, class year, location, deadline, sponsorship — minus boilerplate
+keywords, and keeps the best blocks, in page order, within a token budget.
+
+The metadata header parse_page puts before "---" (meta description, JSON-LD)
+is always kept, cut to at most HEADER_SHARE of the budget so a long JSON-LD
+blob can't crowd out the page itself; the best-scoring body block is always
+kept too. Repeated blocks are kept once, and blocks scoring far below the best
+one are dropped even when there's budget left. Text already within budget is
+passed through untouched.
+
+Usage:
+  python relevance.py PAGE.html [...] [--budget TOKENS] [--show]
+  python relevance.py PAGE.html --live    # also time real extractions (needs OPENAI_API_KEY)
+"""
+
+import argparse
+import math
+import re
+import time
+
+TOKEN_BUDGET = 1200
+CHARS_PER_TOKEN = 4            # rough, but consistent before vs after
+LEGACY_CHAR_LIMIT = 12000      # what the prompt used to get: the first 12,000 chars
+MAX_BLOCK_CHARS = 800
+HEADING_MAX_CHARS = 60
+# Blocks scoring under this fraction of the best block are dropped even when
+# there's budget left (company blurbs, "life at" sections).
+RELATIVE_THRESHOLD = 0.2
+# Most of the budget the metadata header may take.
+HEADER_SHARE = 0.5
+
+METADATA_SEPARATOR = "\n\n---\n\n"
+
+MONTH = r"(jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+RELEVANT_RES = [
+    re.compile(r"\b(eligib\w*|requirements?|qualifications?|who (should|can) apply|must be|enrolled|gpa|majors?)\b", re.I),
+    re.compile(r"\b(freshm[ae]n|sophomores?|first[- ]year|second[- ]year|underclass\w*|class of 20\d\d|rising)\b", re.I),
+    re.compile(r"\b(locations?|remote|hybrid|on[- ]site|in[- ]person|relocat\w*)\b|, [A-Z]{2}\b", re.I),
+    re.compile(rf"\b(deadlines?|apply by|applications? (open|close|are due)|due date|rolling)\b|\b{MONTH} \d{{1,2}}\b", re.I),
+    re.compile(r"\b(intern(ship)?s?|fellow(ship)?s?|extern(ship)?s?|program|research|scholarships?|stipend|weeks?|summer|fall|spring|winter)\b", re.I),
+    re.compile(r"\b(citizen(ship)?|sponsor(ship)?|work authori[sz]ation|visas?)\b", re.I),
+]
+BOILERPLATE_RE = re.compile(
+    r"\b(cookies?|privacy|consent|equal (employment )?opportunity|eeo|affirmative action|disabilit(y|ies)|"
+    r"veterans?|accommodations?|401\(?k\)?|dental|vision|benefits|all rights reserved|terms of (use|service)|gdpr)\b",
+    re.I,
+)
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def estimate_tokens(text):
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def is_heading(line):
+    return len(line) <= HEADING_MAX_CHARS and not line.endswith((".", ",", ";", ":"))
+
+
+def segment(text):
+    """Group lines into blocks, starting a new block at headings or at MAX_BLOCK_CHARS."""
+    blocks, current, size = [], [], 0
+    for line in text.split("\n"):
+        if current and (size + len(line) > MAX_BLOCK_CHARS or (is_heading(line) and size > 200)):
+            blocks.append("\n".join(current))
+            current, size = [], 0
+        current.append(line)
+        size += len(line) + 1
+    if current:
+        blocks.append("\n".join(current))
+    return blocks
+
+
+def score(block, title_words):
+    """Keyword density: relevant hits minus boilerplate hits, per sqrt(chars)."""
+    hits = sum(len(pattern.findall(block)) for pattern in RELEVANT_RES)
+    hits += sum(1 for word in set(WORD_RE.findall(block.lower())) if word in title_words)
+    hits -= 2 * len(BOILERPLATE_RE.findall(block))
+    return hits / math.sqrt(len(block) + 1)
+
+
+def trim(text, title="", budget=TOKEN_BUDGET):
+    """Return (trimmed text, stats). stats has before/after token estimates."""
+    before = estimate_tokens(text[:LEGACY_CHAR_LIMIT])
+    if estimate_tokens(text) <= budget:
+        return text, {"before_tokens": before, "after_tokens": estimate_tokens(text), "blocks_kept": None}
+
+    header, body = "", text
+    if METADATA_SEPARATOR in text:
+        header, body = text.split(METADATA_SEPARATOR, 1)
+        header = header[:int(budget * HEADER_SHARE) * CHARS_PER_TOKEN] + METADATA_SEPARATOR
+    blocks = segment(body)
+
+    title_words = {w for w in WORD_RE.findall(title.lower()) if len(w) > 3}
+    scores = [score(block, title_words) for block in blocks]
+    best = max(scores, default=0)
+    # Nothing recognisable on the page: no floor, ties keep page order.
+    floor = best * RELATIVE_THRESHOLD if best > 0 else float("-inf")
+    remaining = budget - estimate_tokens(header)
+    keep, seen = set(), set()
+    for i in sorted(range(len(blocks)), key=lambda i: -scores[i]):
+        cost = estimate_tokens(blocks[i]) + 1
+        # The best block is kept whatever it costs
+        if scores[i] < floor or (keep and cost > remaining) or blocks[i] in seen:
+            continue
+        keep.add(i)
+        seen.add(blocks[i])
+        remaining -= cost
+
+    kept = [blocks[i] for i in sorted(keep)]
+    trimmed = header + "\n".join(kept)
+    return trimmed, {
+        "before_tokens": before,
+        "after_tokens": estimate_tokens(trimmed),
+        "blocks_kept": f"{len(kept)}/{len(blocks)}",
+    }
+
+
+def main():
+    import auto_extract
+
+    parser = argparse.ArgumentParser(description="Report prompt-size reduction on saved HTML pages.")
+    parser.add_argument("pages", nargs="+", help="saved HTML files")
+    parser.add_argument("--budget", type=int, default=TOKEN_BUDGET)
+    parser.add_argument("--show", action="store_true", help="print the trimmed text")
+    parser.add_argument("--live", action="store_true", help="time real extractions with and without trimming")
+    args = parser.parse_args()
+
+    print(f"| {'page':<32} | {'before':>7} | {'after':>7} | {'blocks':>7} | {'trim ms':>7} |")
+    print(f"| {'-' * 32} | {'-' * 7} | {'-' * 7} | {'-' * 7} | {'-' * 7} |")
+    for path in args.pages:
+        with open(path, "r", encoding="utf-8") as f:
+            page = auto_extract.parse_page(f.read(), path)
+        start = time.perf_counter()
+        trimmed, stats = trim(page["text"], page["title"], args.budget)
+        ms = (time.perf_counter() - start) * 1000
+        print(f"| {path[-32:]:<32} | {stats['before_tokens']:>7} | {stats['after_tokens']:>7} | "
+              f"{stats['blocks_kept'] or 'all':>7} | {ms:>7.2f} |")
+        if args.show:
+            print(f"\n{trimmed}\n")
+        if args.live:
+            for label, budget in (("untrimmed", None), ("trimmed", args.budget)):
+                start = time.perf_counter()
+                auto_extract.request_extraction(page, budget=budget)
+                print(f"    {label}: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
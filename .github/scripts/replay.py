@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""
+replay.py — replay recorded issue events through the intake pipelines offline.
+
+Each event runs through the real auto_extract.main / contribution_approved.main
+exactly as the workflows invoke them (event file on argv, GITHUB_OUTPUT file,
+util.fail exits), but with:
+
+  - a temp copy of listings.json (or a temp sharded / sqlite store),
+  - a local HTTP fixture server standing in for the posting pages,
+  - a fake extractor in place of extract_with_openai (the rule-based
+    extractor still runs first, as in production),
+  - a fresh temp GITHUB_OUTPUT per event, parsed back into a dict.
+
+The repo's listings.json is never touched.
+
+Corpus layout (default: replay/ next to this script):
+
+  events/*.json   a GitHub issue event, plus an optional "replay" key:
+                    {"pipeline": "auto_extract" | "contribution_approved",
+                     "extract": {...fake extractor response...},
+                     "expect": {"ok": true, "outputs": {...}, "listing": {...}}}
+                  The pipeline defaults from the issue labels (auto_extract
+                  label -> auto_extract). "{fixtures}" anywhere in the event is
+                  replaced with the fixture server's base URL. expect.listing
+                  is a subset of fields some listing must match afterwards.
+  pages/*         files served by the fixture server at /<name>
+
+Without an "extract" the fake extractor reads "Company | Title" from the page
+<title>. --synthesize N appends N generated events (adds, quick adds,
+duplicates, closes) against generated /synthetic/<n> pages for load testing.
+
+Every stage (form parse, fetch, extract, load, dedupe, save) is timed and
+reported. Exits 1 if any expectation fails or the final listings fail
+util.check_schema.
+
+Usage:
+  python replay.py [--corpus DIR] [--synthesize N] [--backend json|sharded|sqlite] [-v]
+"""
+
+import argparse
+import contextlib
+import glob
+import http.server
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+import extractors
+import issue_forms
+import sharded_store
+import sqlite_store
+import util
+from bench_storage import use_backend
+
+CORPUS_DIR = os.path.join(util.SCRIPT_DIR, "replay")
+
+# Unwrapped loader for assertions, so checks don't count towards the "load" stage.
+load_listings = util.get_listings_from_json
+
+STAGES = {
+    "parse": [(issue_forms, "parse")],
+    "fetch": [("auto_extract", "fetch_page_content")],
+    "extract": [(extractors, "extract")],
+    "load": [(util, "get_listings_from_json")],
+    "dedupe": [(util, "find_listing_by_url"), (util, "find_listings_by_name")],
+    "save": [(util, "save_listings_to_json")],
+}
+
+SYNTHETIC_PAGE = """<html><head><title>{company} | {title}</title>
+<meta name="description" content="{title} at {company} for first- and second-year students."></head>
+<body><h1>{title}</h1><p>{company} is hiring freshmen and sophomores for {title}.
+This synthetic posting exists so the replay harness has enough page text to
+look like a real career site. Applications are reviewed on a rolling basis.</p></body></html>
+"""
+
+
+# ---------------------------------------------------------------------------
+# Fixture server
+# ---------------------------------------------------------------------------
+
+def synthetic_names(n):
+    return f"Synthetic Co {n}", f"Explore Intern {n}"
+
+
+def start_fixture_server(pages_dir):
+    """Serve pages_dir (and generated /synthetic/<n> pages) on a free local port."""
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = self.path.split("?")[0].lstrip("/")
+            if path.startswith("synthetic/") and path.split("/")[1].isdigit():
+                company, title = synthetic_names(int(path.split("/")[1]))
+                body = SYNTHETIC_PAGE.format(company=company, title=title).encode()
+            else:
+                full = os.path.join(pages_dir, path)
+                if not path or not os.path.isfile(full):
+                    self.send_error(404)
+                    return
+                with open(full, "rb") as f:
+                    body = f.read()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+# ---------------------------------------------------------------------------
+# Events
+# ---------------------------------------------------------------------------
+
+def substitute(value, base_url):
+    if isinstance(value, str):
+        return value.replace("{fixtures}", base_url)
+    if isinstance(value, list):
+        return [substitute(v, base_url) for v in value]
+    if isinstance(value, dict):
+        return {k: substitute(v, base_url) for k, v in value.items()}
+    return value
+
+
+def load_corpus(corpus_dir, base_url):
+    events = []
+    for path in sorted(glob.glob(os.path.join(corpus_dir, "events", "*.json"))):
+        with open(path, "r") as f:
+            event = substitute(json.load(f), base_url)
+        events.append((os.path.basename(path), event))
+    return events
+
+
+def issue_event(number, labels, body):
+    return {"issue": {
+        "number": number,
+        "labels": [{"name": label} for label in labels],
+        "user": {"login": "replay"},
+        "body": body,
+    }}
+
+
+def synthesize(count, base_url):
+    """Generated events cycling through link-only add, quick add, duplicate, close."""
+    events = []
+    for n in range(count):
+        company, title = synthetic_names(n)
+        url = f"{base_url}/synthetic/{n}"
+        kind = n % 4
+        if kind == 0:
+            event = issue_event(10_000 + n, ["new_opportunity", "auto_extract", "approved"],
+                                f"### Link to Opportunity\n\n{url}\n\n"
+                                f"### Any additional context? (Optional)\n\n_No response_\n")
+            expect = {"ok": True, "outputs": {"commit_message": f"Add {company} - {title}"},
+                      "listing": {"url": url, "active": True}}
+        elif kind == 1:
+            event = issue_event(10_000 + n, ["new_opportunity", "quick_add", "approved"],
+                                f"### Link\n\n{url}\n\n### Company/Organization\n\n{company}\n\n"
+                                f"### Role/Program Name\n\n{title}\n\n### Category\n\nResearch\n")
+            expect = {"ok": True, "listing": {"url": url, "category": "Research"}}
+        elif kind == 2:
+            # Same URL as the link-only add two events back.
+            event = issue_event(10_000 + n, ["new_opportunity", "auto_extract", "approved"],
+                                f"### Link to Opportunity\n\n{base_url}/synthetic/{n - 2}\n")
+            expect = {"ok": True, "outputs": {"is_duplicate": "true"}}
+        else:
+            prev_company, prev_title = synthetic_names(n - 2)
+            event = issue_event(10_000 + n, ["close_opportunity", "approved"],
+                                f"### Company/Organization Name\n\n{prev_company}\n\n"
+                                f"### Program/Role Title\n\n{prev_title}\n")
+            expect = {"ok": True, "listing": {"url": f"{base_url}/synthetic/{n - 2}", "active": False}}
+        event["replay"] = {"expect": expect}
+        events.append((f"synthetic-{n:05d}", event))
+    return events
+
+
+def pipeline_for(event):
+    replay = event.get("replay", {})
+    if "pipeline" in replay:
+        return replay["pipeline"]
+    labels = [l.get("name", "") for l in event.get("issue", {}).get("labels", [])]
+    return "auto_extract" if "auto_extract" in labels else "contribution_approved"
+
+
+# ---------------------------------------------------------------------------
+# Instrumentation
+# ---------------------------------------------------------------------------
+
+class StageTimer:
+    """Wraps module functions so every call is timed under a stage name."""
+
+    def __init__(self):
+        self.samples = {stage: [] for stage in STAGES}
+        self._patched = []
+
+    def install(self, modules):
+        for stage, targets in STAGES.items():
+            for module, name in targets:
+                module = modules.get(module, module)
+                if isinstance(module, str):
+                    continue
+                original = getattr(module, name)
+                setattr(module, name, self._wrap(stage, original))
+                self._patched.append((module, name, original))
+
+    def _wrap(self, stage, fn):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.samples[stage].append(time.perf_counter() - start)
+        return timed
+
+    def uninstall(self):
+        for module, name, original in reversed(self._patched):
+            setattr(module, name, original)
+        self._patched.clear()
+
+
+def fake_extractor(page_content, additional_notes=""):
+    """Stand-in for extract_with_openai: replay.extract, else "Company | Title"."""
+    if fake_extractor.response is not None:
+        return dict(fake_extractor.response)
+    company, _, title = page_content.get("title", "").partition("|")
+    return {
+        "company_name": company.strip() or "Unknown",
+        "title": title.strip() or "Unknown",
+        "locations": ["Remote"],
+        "category": "Internship",
+        "opportunity_type": "Internship",
+        "season": "Summer",
+        "sponsorship": "Not Specified",
+        "is_underclassmen": True,
+    }
+
+
+fake_extractor.response = None
+
+
+def read_outputs(path):
+    """Parse a GITHUB_OUTPUT file (name=value and name<<DELIM blocks)."""
+    outputs = {}
+    with open(path, "r") as f:
+        lines = f.read().split("\n")
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if "<<" in line and "=" not in line.split("<<")[0]:
+            name, delimiter = line.split("<<", 1)
+            end = lines.index(delimiter, i + 1)
+            outputs[name] = "\n".join(lines[i + 1:end])
+            i = end + 1
+            continue
+        if "=" in line:
+            name, value = line.split("=", 1)
+            outputs[name] = value
+        i += 1
+    return outputs
+
+
+def run_event(module, event, workdir):
+    """Run one pipeline main() on an event. Returns (exit ok, outputs, seconds)."""
+    event_path = os.path.join(workdir, "event.json")
+    output_path = os.path.join(workdir, "github_output")
+    with open(event_path, "w") as f:
+        json.dump(event, f)
+    open(output_path, "w").close()
+
+    argv, env = sys.argv, os.environ.get("GITHUB_OUTPUT")
+    sys.argv = [module.__file__, event_path]
+    os.environ["GITHUB_OUTPUT"] = output_path
+    ok = True
+    start = time.perf_counter()
+    try:
+        module.main()
+    except SystemExit as e:
+        ok = e.code in (0, None)
+    finally:
+        elapsed = time.perf_counter() - start
+        sys.argv = argv
+        if env is None:
+            del os.environ["GITHUB_OUTPUT"]
+        else:
+            os.environ["GITHUB_OUTPUT"] = env
+    return ok, read_outputs(output_path), elapsed
+
+
+def check(expect, ok, outputs):
+    """List of expectation failures for one event."""
+    problems = []
+    if "ok" in expect and expect["ok"] != ok:
+        problems.append(f"expected ok={expect['ok']}, got ok={ok} ({outputs.get('error_message', '')})")
+    for name, value in expect.get("outputs", {}).items():
+        if outputs.get(name) != value:
+            problems.append(f"output {name}: expected {value!r}, got {outputs.get(name)!r}")
+    if "listing" in expect:
+        want = expect["listing"]
+        if not any(all(l.get(k) == v for k, v in want.items()) for l in load_listings()):
+            problems.append(f"no listing matches {want}")
+    return problems
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded issue events through the intake pipelines.")
+    parser.add_argument("--corpus", default=CORPUS_DIR, help="corpus directory (events/, pages/)")
+    parser.add_argument("--synthesize", type=int, default=0, metavar="N", help="append N generated events")
+    parser.add_argument("--backend", choices=("json", "sharded", "sqlite"), default="json")
+    parser.add_argument("-v", "--verbose", action="store_true", help="show pipeline output")
+    args = parser.parse_args()
+
+    server, base_url = start_fixture_server(os.path.join(args.corpus, "pages"))
+    events = load_corpus(args.corpus, base_url) + synthesize(args.synthesize, base_url)
+
+    modules = {}
+    for name in ("auto_extract", "contribution_approved"):
+        try:
+            modules[name] = __import__(name)
+        except ImportError as e:
+            print(f"{name}: unavailable ({e}); its events will fail")
+
+    workdir = tempfile.mkdtemp(prefix="replay-")
+    timer = StageTimer()
+    results = {}
+    failures = []
+    try:
+        listings_file = util.LISTINGS_FILE
+        use_backend(args.backend, workdir)
+        extractors.METRICS_FILE = os.path.join(workdir, "extractor_metrics.json")
+        shutil.copy(listings_file, util.LISTINGS_FILE)
+        if args.backend == "sharded":
+            with open(util.LISTINGS_FILE, "r") as f:
+                sharded_store.save(json.load(f))
+        elif args.backend == "sqlite":
+            sqlite_store.connect()
+
+        if "auto_extract" in modules:
+            modules["auto_extract"].extract_with_openai = fake_extractor
+        timer.install(modules)
+
+        started = time.perf_counter()
+        for name, event in events:
+            pipeline = pipeline_for(event)
+            replay = event.pop("replay", {})
+            fake_extractor.response = replay.get("extract")
+            stats = results.setdefault(pipeline, {"events": 0, "ok": 0, "seconds": []})
+            stats["events"] += 1
+            if pipeline not in modules:
+                failures.append((name, [f"pipeline {pipeline} unavailable"]))
+                continue
+
+            log = io.StringIO()
+            with contextlib.redirect_stdout(sys.stdout if args.verbose else log):
+                ok, outputs, seconds = run_event(modules[pipeline], event, workdir)
+            stats["ok"] += ok
+            stats["seconds"].append(seconds)
+
+            problems = check(replay.get("expect", {}), ok, outputs)
+            if problems:
+                failures.append((name, problems))
+        total = time.perf_counter() - started
+
+        try:
+            util.check_schema(load_listings())
+        except ValueError as e:
+            failures.append(("final listings", [str(e)]))
+    finally:
+        timer.uninstall()
+        server.shutdown()
+        if sqlite_store._connection is not None:
+            sqlite_store._connection.close()
+            sqlite_store._connection = None
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"Replayed {len(events)} event(s) in {total:.2f}s ({len(events) / total:.0f}/s, backend={args.backend})\n")
+    print(f"| {'pipeline':<22} | {'events':>6} | {'ok':>6} | {'mean ms':>8} | {'p95 ms':>8} |")
+    print(f"| {'-' * 22} | {'-' * 6} | {'-' * 6} | {'-' * 8} | {'-' * 8} |")
+    for pipeline, stats in sorted(results.items()):
+        seconds = stats["seconds"] or [0]
+        print(f"| {pipeline:<22} | {stats['events']:>6} | {stats['ok']:>6} | "
+              f"{sum(seconds) / len(seconds) * 1000:>8.2f} | {percentile(seconds, 0.95) * 1000:>8.2f} |")
+    print()
+    print(f"| {'stage':<10} | {'calls':>6} | {'total ms':>9} | {'mean ms':>8} | {'p95 ms':>8} |")
+    print(f"| {'-' * 10} | {'-' * 6} | {'-' * 9} | {'-' * 8} | {'-' * 8} |")
+    for stage, samples in timer.samples.items():
+        if samples:
+            print(f"| {stage:<10} | {len(samples):>6} | {sum(samples) * 1000:>9.1f} | "
+                  f"{sum(samples) / len(samples) * 1000:>8.2f} | {percentile(samples, 0.95) * 1000:>8.2f} |")
+
+    if extractors.METRICS:
+        print()
+        print(extractors.format_metrics(extractors.METRICS))
+
+    if failures:
+        print(f"\n{len(failures)} event(s) failed expectations:")
+        for name, problems in failures:
+            for problem in problems:
+                print(f"  {name}: {problem}")
+        sys.exit(1)
+    print("\nAll expectations met.")
+
+
+if __name__ == "__main__":
+    main()
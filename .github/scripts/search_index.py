@@ -0,0 +1,499 @@
+#!/usr/bin/env python3
+"""
+search_index.py — BM25 full-text search over listings.json and ARCHIVE.md.
+
+Documents are every listing (keyed by listing id) and every ARCHIVE.md table
+row (keyed by "archive:" + a hash of the row, numbered if a row repeats). Indexed text is company_name,
+title, field, opportunity_type, category, season, locations and target_year
+for listings, and the company / role / location columns for archive rows;
+company and title terms count twice.
+
+Text is lowercased, split on non-alphanumerics, stripped of stop words and
+stemmed with a small suffix stemmer (programs -> program, sophomores ->
+sophomor, freshmen -> freshman), so query words match their variants.
+
+The index is stored as gzipped JSON in search_index.json.gz (not tracked by
+git; cached between workflow runs):
+
+  docs      one [key, length, fingerprint, meta] per document number, or null
+            for a document removed since the last full rebuild
+  postings  term -> delta-encoded [doc, tf, doc, tf, ...], sorted by doc
+
+Rebuilds are incremental: each document's fingerprint is a hash of its
+indexed text and metadata, so `build` only re-tokenizes listings whose
+fingerprint changed and drops removed ones. Holes left by removals are
+compacted with a full rebuild once they pass COMPACT_RATIO of the documents.
+Queries decode only the postings of their own terms.
+
+Usage:
+  python search_index.py build [--full]
+  python search_index.py query machine learning research freshman [--category Research] [--active] [--limit N]
+  python search_index.py bench [--synthesize N]
+"""
+
+import argparse
+import gzip
+import hashlib
+import heapq
+import json
+import math
+import os
+import random
+import re
+import time
+from functools import lru_cache
+
+import util
+
+INDEX_FILE = os.path.join(util.SCRIPT_DIR, "search_index.json.gz")
+ARCHIVE_FILE = os.path.join(util.SCRIPT_DIR, "..", "..", "ARCHIVE.md")
+FORMAT_VERSION = 1
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+COMPACT_RATIO = 0.25
+
+# (listing field, weight)
+LISTING_FIELDS = [
+    ("company_name", 2), ("title", 2), ("field", 1), ("opportunity_type", 1),
+    ("category", 1), ("season", 1), ("locations", 1), ("target_year", 1),
+]
+# (archive column names, weight); the first column present is used
+ARCHIVE_COLUMNS = [
+    (("Company", "Organization", "University/Organization", "State"), 2),
+    (("Role", "Program", "Scholarship", "Opportunity"), 2),
+    (("Field", "Type"), 1),
+    (("Location",), 1),
+]
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+TAG_RE = re.compile(r"<[^>]+>")
+HEADING_RE = re.compile(r"^## (.+)$")
+URL_RE = re.compile(r'href="([^"]+)"')
+SEP_RE = re.compile(r"^\|\s*-+")
+
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from in into is it its of on or the to with "
+    "this that these those via all any per our your".split()
+)
+IRREGULAR = {"freshmen": "freshman", "women": "woman", "men": "man", "alumni": "alumnus"}
+# (suffix, replacement), first match wins
+SUFFIXES = [
+    ("sses", "ss"), ("ies", "y"), ("ational", "ate"), ("ization", "ize"), ("ation", "ate"),
+    ("ings", ""), ("ing", ""), ("edly", ""), ("ed", ""), ("es", ""), ("s", ""),
+]
+
+
+# ---------------------------------------------------------------------------
+# Text processing
+# ---------------------------------------------------------------------------
+
+@lru_cache(maxsize=65536)
+def stem(word):
+    if word in IRREGULAR:
+        return IRREGULAR[word]
+    if len(word) <= 3 or word.isdigit():
+        return word
+    for suffix, replacement in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            if suffix == "s" and word.endswith(("ss", "us", "is")):
+                break
+            word = word[:-len(suffix)] + replacement
+            break
+    if word.endswith("e") and len(word) > 4:
+        word = word[:-1]
+    return word
+
+
+def tokenize(text):
+    return [stem(w) for w in WORD_RE.findall(text.lower()) if w not in STOP_WORDS]
+
+
+def as_text(value):
+    return " ".join(value) if isinstance(value, list) else str(value or "")
+
+
+# ---------------------------------------------------------------------------
+# Documents
+# ---------------------------------------------------------------------------
+
+def listing_document(listing):
+    """(key, weighted text parts, meta) for a listing."""
+    parts = [(as_text(listing.get(name)), weight) for name, weight in LISTING_FIELDS]
+    meta = {
+        "source": "listings",
+        "company": listing.get("company_name", ""),
+        "title": listing.get("title", ""),
+        "url": listing.get("url", ""),
+        "category": listing.get("category", ""),
+        "active": bool(listing.get("active", True)),
+    }
+    return listing["id"], parts, meta
+
+
+def archive_documents(path=ARCHIVE_FILE):
+    """(key, weighted text parts, meta) for every ARCHIVE.md table row."""
+    if not os.path.exists(path):
+        return
+    section, headers, seen = "", None, {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            heading = HEADING_RE.match(line)
+            if heading:
+                section, headers = heading.group(1).strip(), None
+                continue
+            if not line.startswith("|") or SEP_RE.match(line):
+                if not line.startswith("|"):
+                    headers = None
+                continue
+            cells = [c.strip() for c in line.split("|")[1:-1]]
+            if headers is None:
+                headers = cells
+                continue
+            if len(cells) != len(headers):
+                continue
+            row = dict(zip(headers, cells))
+            values = []
+            for names, weight in ARCHIVE_COLUMNS:
+                value = next((row[n] for n in names if n in row), "")
+                values.append((TAG_RE.sub(" ", value), weight))
+            url = URL_RE.search(line)
+            key = "archive:" + hashlib.sha1(line.encode("utf-8")).hexdigest()[:12]
+            seen[key] = seen.get(key, 0) + 1
+            if seen[key] > 1:
+                key += f"-{seen[key]}"
+            yield key, values, {
+                "source": "archive",
+                "company": values[0][0].strip(),
+                "title": re.sub(r"\s*(:lock:|—.*)$", "", values[1][0]).strip(),
+                "url": url.group(1) if url else "",
+                "category": section,
+                "active": False,
+            }
+
+
+def fingerprint(parts, meta):
+    payload = json.dumps([parts, meta], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def term_counts(parts):
+    counts = {}
+    for text, weight in parts:
+        for term in tokenize(text):
+            counts[term] = counts.get(term, 0) + weight
+    return counts
+
+
+# ---------------------------------------------------------------------------
+# Index
+# ---------------------------------------------------------------------------
+
+def encode_postings(postings):
+    """{doc: tf} -> [doc delta, tf, ...] sorted by doc."""
+    out, previous = [], 0
+    for doc in sorted(postings):
+        out.extend((doc - previous, postings[doc]))
+        previous = doc
+    return out
+
+
+def decode_postings(encoded):
+    doc, out = 0, {}
+    for i in range(0, len(encoded), 2):
+        doc += encoded[i]
+        out[doc] = encoded[i + 1]
+    return out
+
+
+class SearchIndex:
+    def __init__(self, docs=None, postings=None):
+        self.docs = docs or []            # [key, length, fingerprint, meta] or None
+        self.raw = postings or {}         # term -> encoded postings (lazily decoded)
+        self.decoded = {}                 # term -> {doc: tf}
+        self._stats()
+
+    def _stats(self):
+        self.by_key = {d[0]: i for i, d in enumerate(self.docs) if d}
+        live = [d[1] for d in self.docs if d]
+        self.count = len(live)
+        self.avg_length = (sum(live) / len(live)) if live else 0.0
+        # BM25 length normalisation per document, precomputed for queries
+        average = self.avg_length or 1
+        self.norms = [BM25_K1 * (1 - BM25_B + BM25_B * d[1] / average) if d else 0.0 for d in self.docs]
+
+    def postings(self, term):
+        if term not in self.decoded:
+            self.decoded[term] = decode_postings(self.raw.get(term, []))
+        return self.decoded[term]
+
+    # -- building ------------------------------------------------------------
+
+    def update(self, documents, full=False):
+        """Bring the index in line with documents. Returns (added, changed, removed)."""
+        if full:
+            self.docs, self.raw, self.decoded = [], {}, {}
+            self.by_key = {}
+        seen, pending, added, changed = set(), [], 0, 0
+        for key, parts, meta in documents:
+            seen.add(key)
+            fp = fingerprint(parts, meta)
+            existing = self.by_key.get(key)
+            if existing is not None and self.docs[existing][2] == fp:
+                continue
+            if existing is None:
+                added += 1
+            else:
+                changed += 1
+            pending.append((key, parts, meta, fp))
+
+        stale = {i for key, i in self.by_key.items() if key not in seen}
+        removed = len(stale)
+        stale.update(self.by_key[key] for key, *_ in pending if key in self.by_key)
+        if not stale and not pending:
+            return 0, 0, 0
+
+        # Every term's postings are needed once anything is removed or added.
+        for term in list(self.raw):
+            self.postings(term)
+        if stale:
+            for term, postings in list(self.decoded.items()):
+                for doc in stale & postings.keys():
+                    del postings[doc]
+                if not postings:
+                    del self.decoded[term]
+            for doc in stale:
+                self.docs[doc] = None
+
+        for key, parts, meta, fp in pending:
+            counts = term_counts(parts)
+            doc = len(self.docs)
+            self.docs.append([key, sum(counts.values()), fp, meta])
+            for term, tf in counts.items():
+                self.decoded.setdefault(term, {})[doc] = tf
+
+        holes = sum(1 for d in self.docs if d is None)
+        if holes and holes > COMPACT_RATIO * len(self.docs):
+            self._compact()
+        self.raw = {}
+        self._stats()
+        return added, changed, removed
+
+    def _compact(self):
+        """Renumber documents to remove holes left by deletions."""
+        renumber, docs = {}, []
+        for old, d in enumerate(self.docs):
+            if d:
+                renumber[old] = len(docs)
+                docs.append(d)
+        self.docs = docs
+        self.decoded = {
+            term: {renumber[doc]: tf for doc, tf in postings.items()}
+            for term, postings in self.decoded.items()
+        }
+
+    # -- persistence ---------------------------------------------------------
+
+    @classmethod
+    def load(cls, path=INDEX_FILE):
+        if not os.path.exists(path):
+            return cls()
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != FORMAT_VERSION:
+            return cls()
+        return cls(data["docs"], data["postings"])
+
+    def save(self, path=INDEX_FILE):
+        postings = dict(self.raw)
+        postings.update((term, encode_postings(p)) for term, p in self.decoded.items() if p)
+        data = {"version": FORMAT_VERSION, "docs": self.docs, "postings": dict(sorted(postings.items()))}
+        payload = json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+        with gzip.open(path, "wb", compresslevel=6) as f:
+            f.write(payload.encode("utf-8"))
+
+    # -- querying ------------------------------------------------------------
+
+    def search(self, query, limit=10, predicate=None):
+        """Top (score, meta) pairs for a free-text query, best first.
+
+        BM25 with OR semantics: a document matching any query term is scored
+        by every term it contains. Terms are scored term-at-a-time from the
+        highest upper bound down (MaxScore). A term adds less than its weight
+        to any document (tf / (tf + norm) < 1), so once the top-`limit`
+        threshold reaches the summed weights of the terms left, no document
+        outside the accumulators can make the top `limit`: the remaining
+        terms then only add to existing accumulators (dict lookups rather
+        than walks), dropping those that can no longer reach the threshold.
+        Results are the same as scoring every matching document.
+        """
+        terms = []
+        for term in set(tokenize(query)):
+            postings = self.postings(term)
+            if postings:
+                idf = math.log(1 + (self.count - len(postings) + 0.5) / (len(postings) + 0.5))
+                terms.append((idf * (BM25_K1 + 1), term, postings))
+        terms.sort(key=lambda item: item[0], reverse=True)
+
+        scores, norms, allowed = {}, self.norms, {}
+
+        def passes(doc):
+            if predicate is None:
+                return True
+            if doc not in allowed:
+                allowed[doc] = predicate(self.docs[doc][3])
+            return allowed[doc]
+
+        threshold = 0.0
+        for i, (weight, _, postings) in enumerate(terms):
+            remaining = sum(w for w, _, _ in terms[i + 1:])
+            if threshold and len(scores) < len(postings):
+                for doc in scores:
+                    tf = postings.get(doc)
+                    if tf:
+                        scores[doc] += weight * tf / (tf + norms[doc])
+            elif threshold:
+                for doc, tf in postings.items():
+                    if doc in scores:
+                        scores[doc] += weight * tf / (tf + norms[doc])
+            else:
+                for doc, tf in postings.items():
+                    scores[doc] = scores.get(doc, 0.0) + weight * tf / (tf + norms[doc])
+            top = heapq.nlargest(limit, (score for doc, score in scores.items() if passes(doc)))
+            if len(top) == limit and top[-1] > remaining:
+                threshold = top[-1]
+                scores = {doc: score for doc, score in scores.items()
+                          if score + remaining >= threshold and passes(doc)}
+
+        candidates = ((score, doc) for doc, score in scores.items() if passes(doc))
+        return [(score, self.docs[doc][3]) for score, doc in heapq.nlargest(limit, candidates)]
+
+
+def documents(listings, archive_path=ARCHIVE_FILE):
+    for listing in listings:
+        if listing.get("is_visible", True):
+            yield listing_document(listing)
+    yield from archive_documents(archive_path)
+
+
+def build(full=False):
+    index = SearchIndex() if full else SearchIndex.load()
+    start = time.perf_counter()
+    added, changed, removed = index.update(documents(util.get_listings_from_json()), full=full)
+    if added or changed or removed or not os.path.exists(INDEX_FILE):
+        index.save()
+    print(f"Indexed {index.count} document(s): {added} added, {changed} changed, {removed} removed "
+          f"in {(time.perf_counter() - start) * 1000:.0f} ms ({os.path.getsize(INDEX_FILE) / 1024:.0f} KiB).")
+    util.set_output("indexed_count", index.count)
+    util.set_output("changed_count", added + changed + removed)
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+SYNTHETIC_WORDS = (
+    "software engineering data science machine learning research quantitative trading product design "
+    "hardware security cloud robotics biology chemistry physics finance marketing analytics policy "
+    "health climate energy economics statistics mathematics neuroscience astronomy"
+).split()
+
+
+def synthetic_listing(i, rng):
+    return {
+        "id": f"synthetic-{i}",
+        "company_name": f"Company {i % 5000}",
+        "title": " ".join(rng.sample(SYNTHETIC_WORDS, 3)) + " " + rng.choice(["Intern", "Fellowship", "Program"]),
+        "field": rng.choice(SYNTHETIC_WORDS),
+        "opportunity_type": rng.choice(["Internship", "Fellowship", "Research"]),
+        "category": rng.choice(util.VALID_CATEGORIES),
+        "season": rng.choice(["Summer", "Fall", "Spring"]),
+        "locations": [rng.choice(["New York, NY", "Remote", "Boston, MA", "London, UK"])],
+        "target_year": rng.sample(["Freshman (1st year)", "Sophomore (2nd year)"], rng.randint(1, 2)),
+        "active": rng.random() < 0.5,
+    }
+
+
+def bench(n):
+    import tempfile
+    rng = random.Random(42)
+    listings = [synthetic_listing(i, rng) for i in range(n)]
+    path = os.path.join(tempfile.mkdtemp(), "search_index.json.gz")
+
+    start = time.perf_counter()
+    index = SearchIndex()
+    index.update(documents(listings, archive_path=""))
+    index.save(path)
+    print(f"full build      {n:>7} docs  {(time.perf_counter() - start) * 1000:>8.0f} ms  "
+          f"{os.path.getsize(path) / 1024:.0f} KiB on disk")
+
+    for listing in rng.sample(listings, max(1, n // 100)):
+        listing["title"] += " Extended"
+    start = time.perf_counter()
+    index = SearchIndex.load(path)
+    added, changed, removed = index.update(documents(listings, archive_path=""))
+    index.save(path)
+    print(f"incremental     {changed:>7} docs  {(time.perf_counter() - start) * 1000:>8.0f} ms  (load + update + save)")
+
+    start = time.perf_counter()
+    index = SearchIndex.load(path)
+    print(f"load                          {(time.perf_counter() - start) * 1000:>8.0f} ms")
+    timings = []
+    for query in ("machine learning research freshman", "quantitative trading", "remote data science sophomore"):
+        for _ in range(5):
+            start = time.perf_counter()
+            index.search(query, predicate=lambda meta: meta["active"])
+            timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    print(f"query p50 / max               {timings[len(timings) // 2]:>8.1f} / {timings[-1]:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full-text search over listings and the archive.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_parser = sub.add_parser("build", help="build or incrementally update the index")
+    build_parser.add_argument("--full", action="store_true", help="rebuild from scratch")
+    query_parser = sub.add_parser("query", help="search the index")
+    query_parser.add_argument("terms", nargs="+")
+    query_parser.add_argument("--category", help="only this category (or ARCHIVE.md section)")
+    query_parser.add_argument("--active", action="store_true", help="only active listings")
+    query_parser.add_argument("--source", choices=["listings", "archive"])
+    query_parser.add_argument("--limit", type=int, default=10)
+    query_parser.add_argument("--json", action="store_true", help="print results as JSON")
+    bench_parser = sub.add_parser("bench", help="time build, incremental update and queries")
+    bench_parser.add_argument("--synthesize", type=int, default=100_000, metavar="N")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        build(full=args.full)
+        return
+    if args.command == "bench":
+        bench(args.synthesize)
+        return
+
+    if not os.path.exists(INDEX_FILE):
+        build()
+    start = time.perf_counter()
+    index = SearchIndex.load()
+    loaded = time.perf_counter()
+
+    def predicate(meta):
+        return ((not args.active or meta["active"])
+                and (not args.source or meta["source"] == args.source)
+                and (not args.category or args.category.lower() in meta["category"].lower()))
+
+    results = index.search(" ".join(args.terms), limit=args.limit, predicate=predicate)
+    done = time.perf_counter()
+    if args.json:
+        print(json.dumps([dict(meta, score=round(score, 3)) for score, meta in results], indent=2))
+        return
+    for score, meta in results:
+        flag = "" if meta["active"] else " [closed]"
+        print(f"{score:6.2f}  {meta['company']} — {meta['title']}{flag}  ({meta['category']})\n        {meta['url']}")
+    print(f"{len(results)} result(s) in {(done - loaded) * 1000:.1f} ms "
+          f"(index load {(loaded - start) * 1000:.0f} ms, {index.count} documents)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+sharded_store.py — listings stored as one JSON file per category per season.
+
+Layout (under .github/scripts/listings/):
+
+    manifest.json             {"shards": {"program/summer.json":
+                                 {"category", "season", "count", "sha256"}, ...}}
+    ids.log                   "<listing id> <shard path>" per line, latest wins
+    program/summer.json       [listing, ...]
+    scholarship/multiple.json
+    ...
+
+util.get_listings_from_json / util.save_listings_to_json use this layout when
+LISTINGS_BACKEND=sharded. Loads can be limited to the categories / seasons a
+script needs; saves merge by id and only rewrite shards whose contents
+actually changed, so a close or an add touches a single shard file (plus the
+manifest, whose size grows with the number of shards, not listings). A
+listing whose category or season changed moves: ids.log says which shard held
+it, and it is removed from there. ids.log is only appended to — a line per
+new or moved listing — and is compacted by `split`.
+
+Usage:
+  python sharded_store.py split   # listings.json -> listings/
+  python sharded_store.py join    # listings/ -> listings.json (deterministic export)
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+
+import util
+
+SHARDS_DIR = os.path.join(util.SCRIPT_DIR, "listings")
+MANIFEST_FILE = os.path.join(SHARDS_DIR, "manifest.json")
+
+# Serialized text of every shard read in this process, so saves can skip
+# unchanged shards without re-reading them.
+_loaded = {}
+
+
+def slug(value):
+    """Filesystem-safe lowercase slug: "Summer 2026" -> "summer-2026"."""
+    return re.sub(r"[^a-z0-9]+", "-", str(value).lower()).strip("-") or "unspecified"
+
+
+def shard_path(listing):
+    """Manifest key (relative path) of the shard a listing belongs in."""
+    return f"{slug(listing.get('category', ''))}/{slug(listing.get('season', ''))}.json"
+
+
+def listing_order(listing):
+    """Stable within-shard order: oldest first, like appends to listings.json."""
+    return (listing.get("date_posted", 0), listing["id"])
+
+
+def serialize(listings):
+    return json.dumps(sorted(listings, key=listing_order), indent=2)
+
+
+def ids_file():
+    # Follows SHARDS_DIR so temporary stores (replay, benchmarks) get their own
+    return os.path.join(SHARDS_DIR, "ids.log")
+
+
+def load_manifest():
+    if not os.path.exists(MANIFEST_FILE):
+        return {"shards": {}}
+    with open(MANIFEST_FILE, "r") as f:
+        return json.load(f)
+
+
+def _read(path):
+    """Listings in a shard (by manifest key), remembering its text for saves."""
+    full = os.path.join(SHARDS_DIR, path)
+    if path not in _loaded and os.path.exists(full):
+        with open(full, "r") as f:
+            _loaded[path] = f.read()
+    return json.loads(_loaded.get(path, "[]"))
+
+
+def write_id_index(index):
+    """Rewrite ids.log with one line per listing."""
+    os.makedirs(SHARDS_DIR, exist_ok=True)
+    with open(ids_file(), "w") as f:
+        f.writelines(f"{listing_id} {path}\n" for listing_id, path in sorted(index.items()))
+
+
+def id_index(manifest):
+    """listing id -> shard path, from ids.log.
+
+    A store without one (older manifests kept an "ids" map, or nothing) gets
+    it built from that map or from the shards.
+    """
+    if not os.path.exists(ids_file()):
+        index = manifest.pop("ids", None)
+        if index is None:
+            index = {l["id"]: path for path in manifest["shards"] for l in _read(path)}
+        if index:
+            write_id_index(index)
+        return index
+    index = {}
+    with open(ids_file(), "r") as f:
+        for line in f:
+            listing_id, _, path = line.rstrip("\n").partition(" ")
+            if path:
+                index[listing_id] = path
+    return index
+
+
+def find_by_ids(ids):
+    """Stored versions of the listings with these ids, reading only their shards."""
+    index = id_index(load_manifest())
+    paths = {index[i] for i in ids if i in index}
+    return [l for path in sorted(paths) for l in _read(path) if l["id"] in ids]
+
+
+def load(categories=None, seasons=None):
+    """Read the shards matching the given categories / seasons (None = all)."""
+    manifest = load_manifest()
+    listings = []
+    for path, meta in manifest["shards"].items():
+        if categories is not None and meta["category"] not in categories:
+            continue
+        if seasons is not None and meta["season"] not in seasons:
+            continue
+        with open(os.path.join(SHARDS_DIR, path), "r") as f:
+            text = f.read()
+        _loaded[path] = text
+        listings.extend(json.loads(text))
+    return sorted(listings, key=listing_order)
+
+
+def save(listings):
+    """Merge listings into their shards by id, rewriting only changed shards.
+
+    Shards with no listings in `listings` are left alone, so saving a partial
+    load (or a single new / closed listing) never drops other listings.
+    Returns the list of shard paths written.
+    """
+    manifest = load_manifest()
+    index = id_index(manifest)
+    groups, moved_out, relocated = {}, {}, {}
+    for listing in listings:
+        path = shard_path(listing)
+        groups.setdefault(path, []).append(listing)
+        old = index.get(listing["id"])
+        if old != path:
+            relocated[listing["id"]] = path
+        if old is not None and old != path:
+            moved_out.setdefault(old, set()).add(listing["id"])
+
+    written = []
+    for path in sorted(set(groups) | set(moved_out)):
+        group = groups.get(path, [])
+        full = os.path.join(SHARDS_DIR, path)
+        merged = {l["id"]: l for l in _read(path) if l["id"] not in moved_out.get(path, ())}
+        merged.update((l["id"], l) for l in group)
+        if not merged:
+            # Everything in it moved elsewhere
+            if os.path.exists(full):
+                os.remove(full)
+            _loaded.pop(path, None)
+            manifest["shards"].pop(path, None)
+            written.append(path)
+            continue
+        text = serialize(merged.values())
+        if _loaded.get(path) == text:
+            continue
+        os.makedirs(os.path.dirname(full), exist_ok=True)
+        with open(full, "w") as f:
+            f.write(text)
+        _loaded[path] = text
+        written.append(path)
+        sample = group[0] if group else next(iter(merged.values()))
+        manifest["shards"][path] = {
+            "category": sample.get("category", ""),
+            "season": sample.get("season", ""),
+            "count": len(merged),
+            "sha256": hashlib.sha256(text.encode()).hexdigest(),
+        }
+
+    if written:
+        manifest["shards"] = dict(sorted(manifest["shards"].items()))
+        manifest.pop("ids", None)
+        os.makedirs(SHARDS_DIR, exist_ok=True)
+        with open(MANIFEST_FILE, "w") as f:
+            json.dump(manifest, f, indent=2)
+    if relocated:
+        with open(ids_file(), "a") as f:
+            f.writelines(f"{listing_id} {path}\n" for listing_id, path in sorted(relocated.items()))
+    return written
+
+
+def split():
+    """Shard the monolithic listings.json."""
+    with open(util.LISTINGS_FILE, "r") as f:
+        listings = json.load(f)
+    written = save(listings)
+    write_id_index({l["id"]: shard_path(l) for l in listings})
+    print(f"Wrote {len(written)} shard(s) for {len(listings)} listing(s) to {SHARDS_DIR}")
+
+
+def join():
+    """Export all shards back to listings.json, in a deterministic order."""
+    listings = load()
+    with open(util.LISTINGS_FILE, "w") as f:
+        json.dump(listings, f, indent=2)
+    print(f"Exported {len(listings)} listing(s) to {util.LISTINGS_FILE}")
+
+
+if __name__ == "__main__":
+    commands = {"split": split, "join": join}
+    if len(sys.argv) != 2 or sys.argv[1] not in commands:
+        print(f"Usage: {sys.argv[0]} {{split|join}}")
+        sys.exit(2)
+    commands[sys.argv[1]]()
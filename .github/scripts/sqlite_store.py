@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+sqlite_store.py — SQLite storage backend for listings.
+
+Used by util.get_listings_from_json / util.save_listings_to_json when
+LISTINGS_BACKEND=sqlite. The database (listings.db, not tracked by git) runs
+in WAL mode. Each row keeps the full listing as JSON in `data` for a lossless
+round trip, with the queried fields copied into indexed columns:
+
+    url, title, category, active, date_posted
+
+so duplicate checks, section loads and date windows are index lookups
+instead of scans over the whole list.
+
+listings.json stays the git-tracked source of truth. If the database doesn't
+exist yet it is built from listings.json on first use, and `export` writes it
+back in a deterministic order (original position, then id).
+
+Usage:
+  python sqlite_store.py import   # (re)build listings.db from listings.json
+  python sqlite_store.py export   # listings.db -> listings.json
+"""
+
+import json
+import os
+import sqlite3
+import sys
+
+import util
+
+DB_FILE = os.path.join(util.SCRIPT_DIR, "listings.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS listings (
+    id           TEXT PRIMARY KEY,
+    position     INTEGER NOT NULL,
+    company_name TEXT NOT NULL,
+    title        TEXT NOT NULL,
+    url          TEXT NOT NULL,
+    category     TEXT,
+    season       TEXT,
+    active       INTEGER NOT NULL,
+    is_visible   INTEGER NOT NULL,
+    date_posted  INTEGER,
+    date_updated INTEGER,
+    data         TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_listings_url ON listings (url);
+CREATE INDEX IF NOT EXISTS idx_listings_title ON listings (title COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_listings_category ON listings (category);
+CREATE INDEX IF NOT EXISTS idx_listings_active ON listings (active);
+CREATE INDEX IF NOT EXISTS idx_listings_date_posted ON listings (date_posted);
+"""
+
+_connection = None
+
+
+def connect(path=None):
+    """Open (once per process) the database, creating and seeding it if needed."""
+    global _connection
+    if _connection is not None and path is None:
+        return _connection
+    path = path or DB_FILE
+    is_new = not os.path.exists(path)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    if is_new and os.path.exists(util.LISTINGS_FILE):
+        with open(util.LISTINGS_FILE, "r") as f:
+            _upsert(conn, json.load(f))
+    if path == DB_FILE:
+        _connection = conn
+    return conn
+
+
+def _row(listing, position):
+    return (
+        listing["id"],
+        position,
+        listing.get("company_name", ""),
+        listing.get("title", ""),
+        listing.get("url", ""),
+        listing.get("category"),
+        listing.get("season"),
+        int(bool(listing.get("active", True))),
+        int(bool(listing.get("is_visible", True))),
+        listing.get("date_posted"),
+        listing.get("date_updated"),
+        json.dumps(listing),
+    )
+
+
+def _upsert(conn, listings):
+    next_position = conn.execute("SELECT COALESCE(MAX(position) + 1, 0) FROM listings").fetchone()[0]
+    existing = dict(conn.execute("SELECT id, position FROM listings"))
+    rows = []
+    for listing in listings:
+        position = existing.get(listing["id"])
+        if position is None:
+            position = next_position
+            next_position += 1
+        rows.append(_row(listing, position))
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO listings VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+        )
+
+
+def _select(where="", params=(), conn=None):
+    conn = conn or connect()
+    sql = "SELECT data FROM listings"
+    if where:
+        sql += f" WHERE {where}"
+    sql += " ORDER BY position, id"
+    return [json.loads(data) for (data,) in conn.execute(sql, params)]
+
+
+def load(categories=None, seasons=None):
+    """Listings in the given categories / seasons (None = all)."""
+    clauses, params = [], []
+    if categories is not None:
+        clauses.append(f"category IN ({', '.join('?' * len(categories))})")
+        params.extend(categories)
+    if seasons is not None:
+        clauses.append(f"season IN ({', '.join('?' * len(seasons))})")
+        params.extend(seasons)
+    return _select(" AND ".join(clauses), params)
+
+
+def save(listings):
+    """Insert or update listings by id (one transaction)."""
+    _upsert(connect(), listings)
+
+
+def find_by_url(url):
+    """First listing with this exact URL, or None."""
+    found = _select("url = ?", (url,))
+    return found[0] if found else None
+
+
+def find_by_ids(ids, chunk=500):
+    """Listings with any of these ids (queried in chunks to stay under SQLite's variable limit)."""
+    ids, found = list(ids), []
+    for i in range(0, len(ids), chunk):
+        batch = ids[i:i + chunk]
+        found.extend(_select(f"id IN ({', '.join('?' * len(batch))})", batch))
+    return found
+
+
+def find_by_title(title):
+    """Listings whose title matches case-insensitively (util.find_listings_by_name
+    narrows these to one company)."""
+    return _select("title = ? COLLATE NOCASE", (title,))
+
+
+def posted_between(start, end, active_only=False):
+    """Listings with start <= date_posted < end, oldest first."""
+    where = "date_posted >= ? AND date_posted < ?"
+    if active_only:
+        where += " AND active = 1 AND is_visible = 1"
+    conn = connect()
+    rows = conn.execute(f"SELECT data FROM listings WHERE {where} ORDER BY date_posted, id", (start, end))
+    return [json.loads(data) for (data,) in rows]
+
+
+def rebuild():
+    """Drop the database and re-import listings.json."""
+    global _connection
+    if _connection is not None:
+        _connection.close()
+        _connection = None
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(DB_FILE + suffix):
+            os.remove(DB_FILE + suffix)
+    conn = connect()
+    count = conn.execute("SELECT COUNT(*) FROM listings").fetchone()[0]
+    print(f"Imported {count} listing(s) into {DB_FILE}")
+
+
+def export():
+    """Write every listing back to listings.json in a deterministic order."""
+    listings = _select()
+    with open(util.LISTINGS_FILE, "w") as f:
+        json.dump(listings, f, indent=2)
+    print(f"Exported {len(listings)} listing(s) to {util.LISTINGS_FILE}")
+
+
+if __name__ == "__main__":
+    commands = {"import": rebuild, "export": export}
+    if len(sys.argv) != 2 or sys.argv[1] not in commands:
+        print(f"Usage: {sys.argv[0]} {{import|export}}")
+        sys.exit(2)
+    commands[sys.argv[1]]()
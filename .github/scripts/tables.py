@@ -0,0 +1,219 @@
+"""
+tables.py — README tables rendered from declarative section specs.
+
+Each README section is a Section: the <!-- KEY_TABLE_START --> marker name, a
+label, which listings belong in it, and its columns. A column is a header
+plus a cell formatter — a function of (listing, previous listing) returning
+the cell text, already sanitized. compile_section() turns a spec into one row
+function (a fixed "| {} | {} |" template over the column formatters), built
+once and reused for every row.
+
+Adding a section is data only: add a Section to SECTIONS with its columns
+(mostly the formatters below), tag listings for it with a `sections` list in
+listings.json (e.g. "sections": ["HBCU"]), and list its key in RENDERED.
+Sections not in RENDERED are still maintained by hand in README.md and are
+never rewritten.
+
+    table, ms = render(SECTIONS_BY_KEY["PROGRAMS"], listings)
+"""
+
+import time
+from collections import namedtuple
+
+import companies
+import lifecycle
+import util
+
+Column = namedtuple("Column", "header cell")
+Section = namedtuple("Section", "key label select columns")
+
+STATUS_BADGES = {
+    lifecycle.OPENS_SOON: "⏳ **[OPENS SOON]**",
+    lifecycle.OPEN: "✅ **[OPEN]**",
+    lifecycle.CLOSING_SOON: "🔥 **[CLOSING SOON]**",
+    lifecycle.CLOSED: "🔒 **[CLOSED]**",
+}
+
+
+# ---------------------------------------------------------------------------
+# Cell formatters: (listing, previous listing or None) -> cell text
+# ---------------------------------------------------------------------------
+
+def text(field, default=""):
+    """A listing field as-is (lists joined with commas)."""
+    def cell(listing, previous):
+        value = listing.get(field, default)
+        if isinstance(value, list):
+            value = ", ".join(value)
+        return util.sanitize_table_cell(value)
+    return cell
+
+
+def company(listing, previous):
+    return util.sanitize_table_cell(listing["company_name"])
+
+
+def company_grouped(listing, previous):
+    """↳ for a different role at the same company (companies.py) as the row above."""
+    if (previous and companies.listing_key(listing) == companies.listing_key(previous)
+            and listing["title"] != previous["title"]):
+        return "↳"
+    return util.sanitize_table_cell(listing["company_name"])
+
+
+def title(listing, previous):
+    return (util.sanitize_table_cell(listing["title"])
+            + util.get_sponsorship_badge(listing.get("sponsorship", ""))
+            + util.get_status_badge(listing.get("active", True)))
+
+
+def title_without_sponsorship(listing, previous):
+    return util.sanitize_table_cell(listing["title"]) + util.get_status_badge(listing.get("active", True))
+
+
+def status(listing, previous):
+    if listing.get("status") in STATUS_BADGES:
+        return STATUS_BADGES[listing["status"]]
+    return STATUS_BADGES[lifecycle.OPEN if listing.get("active", True) else lifecycle.CLOSED]
+
+
+def locations(listing, previous):
+    return util.format_locations(listing.get("locations", []))
+
+
+def apply_link(listing, previous):
+    return util.format_link(listing["url"]) if listing.get("active", True) else ":lock:"
+
+
+def date_posted(listing, previous):
+    return util.format_date(listing["date_posted"])
+
+
+# ---------------------------------------------------------------------------
+# Section specs
+# ---------------------------------------------------------------------------
+
+def in_category(category):
+    return lambda listing: listing.get("category") == category
+
+
+def tagged(key):
+    return lambda listing: key in listing.get("sections", [])
+
+
+SECTIONS = [
+    Section("INTERNSHIPS", "Internships", in_category("Internship"), [
+        Column("Company", company_grouped),
+        Column("Role", title),
+        Column("Location", locations),
+        Column("Application", apply_link),
+        Column("Date Posted", date_posted),
+    ]),
+    Section("PROGRAMS", "Programs", in_category("Program"), [
+        Column("Company", company),
+        Column("Program", title),
+        Column("Type", text("opportunity_type")),
+        Column("Location", locations),
+        Column("Application", apply_link),
+        Column("Date Posted", date_posted),
+    ]),
+    Section("RESEARCH", "Research", in_category("Research"), [
+        Column("University/Organization", company),
+        Column("Program", title),
+        Column("Field", text("field")),
+        Column("Location", locations),
+        Column("Application", apply_link),
+        Column("Date Posted", date_posted),
+    ]),
+    Section("SCHOLARSHIPS", "Scholarships", in_category("Scholarship"), [
+        Column("Organization", company),
+        Column("Scholarship", title_without_sponsorship),
+        Column("Amount", text("scholarship_amount", "Varies")),
+        Column("Application", apply_link),
+        Column("Deadline", text("deadline", "Varies")),
+    ]),
+    Section("AMBASSADORS", "Ambassador Programs", tagged("AMBASSADORS"), [
+        Column("Status", status),
+        Column("Company", company),
+        Column("Program", title),
+        Column("Type", text("opportunity_type")),
+        Column("Location", locations),
+        Column("Application", apply_link),
+        Column("Date Posted", date_posted),
+    ]),
+    Section("HBCU", "HBCU", tagged("HBCU"), [
+        Column("Status", status),
+        Column("Organization", company),
+        Column("Opportunity", title),
+        Column("Type", text("opportunity_type")),
+        Column("Location", locations),
+        Column("Application", apply_link),
+        Column("Date Posted", date_posted),
+    ]),
+    Section("WOMEN", "Women in Tech", tagged("WOMEN"), [
+        Column("Status", status),
+        Column("Organization", company),
+        Column("Opportunity", title),
+        Column("Type", text("opportunity_type")),
+        Column("Location", locations),
+        Column("Application", apply_link),
+        Column("Date Posted", date_posted),
+    ]),
+    Section("RISING_FRESHMEN", "Rising Freshmen", tagged("RISING_FRESHMEN"), [
+        Column("Status", status),
+        Column("Organization", company),
+        Column("Opportunity", title),
+        Column("Type", text("opportunity_type")),
+        Column("Location", locations),
+        Column("Application", apply_link),
+        Column("Deadline", text("deadline", "Check site")),
+    ]),
+    Section("STATE", "State Grants", tagged("STATE"), [
+        Column("Status", status),
+        Column("State", company),
+        Column("Program", title_without_sponsorship),
+        Column("Award", text("scholarship_amount", "Varies")),
+        Column("Eligibility", text("eligibility", "See site")),
+        Column("Application", apply_link),
+        Column("Deadline", text("deadline", "Check site")),
+    ]),
+]
+SECTIONS_BY_KEY = {section.key: section for section in SECTIONS}
+
+# Sections update_readmes.py regenerates; the rest are still edited by hand.
+RENDERED = ["INTERNSHIPS", "PROGRAMS", "RESEARCH", "SCHOLARSHIPS"]
+
+
+# ---------------------------------------------------------------------------
+# Rendering
+# ---------------------------------------------------------------------------
+
+_compiled = {}
+
+
+def compile_section(section):
+    """(header lines, row function) for a section, built once per process."""
+    if section.key not in _compiled:
+        headers = [column.header for column in section.columns]
+        header = "| " + " | ".join(headers) + " |"
+        separator = "| " + " | ".join("-" * len(h) for h in headers) + " |"
+        template = "| " + " | ".join("{}" for _ in headers) + " |"
+        cells = tuple(column.cell for column in section.columns)
+
+        def row(listing, previous, _format=template.format, _cells=cells):
+            return _format(*(cell(listing, previous) for cell in _cells))
+
+        _compiled[section.key] = ([header, separator], row)
+    return _compiled[section.key]
+
+
+def render(section, listings):
+    """(markdown table, render ms) for listings already selected and sorted."""
+    start = time.perf_counter()
+    lines, row = compile_section(section)
+    lines = list(lines)
+    previous = None
+    for listing in listings:
+        lines.append(row(listing, previous))
+        previous = listing
+    return "\n".join(lines), (time.perf_counter() - start) * 1000
@@ -0,0 +1,56 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import build  # noqa: E402
+import util  # noqa: E402
+
+
+class FreezeTest(unittest.TestCase):
+    def test_frozen_listings_reject_changes(self):
+        listings = build.freeze([{"id": "1", "locations": ["NYC"]}])
+        with self.assertRaises(TypeError):
+            listings[0]["active"] = False
+        with self.assertRaises(TypeError):
+            listings[0].update(active=False)
+        with self.assertRaises(AttributeError):
+            listings[0]["locations"].append("SF")
+        self.assertEqual(dict(listings[0]), {"id": "1", "locations": ("NYC",)})
+
+
+class ChangedTest(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.workdir)
+        self.target = os.path.join(self.workdir, "out.txt")
+        self.content = "first\n"
+
+        def run(listings):
+            util.write_if_changed(self.target, self.content)
+
+        stage = build.Stage("only", [], [], [self.target], False, run)
+        for target, name, value in [
+            (build, "STAGES_BY_NAME", {"only": stage}),
+            (build, "STAGES", [stage]),
+            (build, "CACHE_FILE", os.path.join(self.workdir, "build_cache.json")),
+            (util, "get_listings_from_json", lambda: []),
+        ]:
+            patcher = mock.patch.object(target, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_changed_only_when_the_stage_writes(self):
+        self.assertEqual(build.build(["only"], force=True), {"only": "changed"})
+        self.assertEqual(build.build(["only"], force=True), {"only": "unchanged"})
+        self.assertEqual(build.build(["only"]), {"only": "skipped"})
+        self.content = "second\n"
+        self.assertEqual(build.build(["only"], force=True), {"only": "changed"})
+
+
+if __name__ == "__main__":
+    unittest.main()
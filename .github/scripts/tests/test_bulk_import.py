@@ -0,0 +1,35 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bulk_import  # noqa: E402
+
+NOW = 1_790_000_000
+
+
+class MalformedRowsTest(unittest.TestCase):
+    def test_malformed_jsonl_lines_are_skipped(self):
+        good = {"company_name": "Acme", "title": "Explore Intern", "url": "https://acme.example/apply"}
+        lines = [json.dumps(good), "[1, 2]", "{not json", "", '"just a string"',
+                 json.dumps({"company_name": "Harbor", "title": "REU", "url": "https://harbor.example/reu",
+                             "locations": {"city": "Boston"}}),
+                 json.dumps(dict(good, url="https://acme.example/other"))]
+        with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False) as f:
+            f.write("\n".join(lines) + "\n")
+        self.addCleanup(os.remove, f.name)
+
+        added, skipped, duplicates = bulk_import.import_rows(bulk_import.read_rows(f.name), [], "test", NOW)
+        self.assertEqual([l["url"] for l in added], ["https://acme.example/apply"])
+        self.assertEqual([where for where, _ in skipped], ["line 2", "line 3", "line 5", "line 6"])
+        self.assertEqual(skipped[0][1], "expected an object, got list")
+        self.assertEqual(skipped[1][1], "invalid JSON")
+        self.assertTrue(skipped[3][1].startswith("malformed row"))
+        self.assertEqual([where for where, _, _ in duplicates], ["line 7"])
+
+
+if __name__ == "__main__":
+    unittest.main()
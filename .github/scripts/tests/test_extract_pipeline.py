@@ -0,0 +1,71 @@
+import asyncio
+import os
+import sys
+import threading
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import auto_extract  # noqa: E402
+import extract_pipeline  # noqa: E402
+from extract_pipeline import CircuitBreaker, ThreadSlots  # noqa: E402
+
+
+class CircuitBreakerTest(unittest.TestCase):
+    def test_half_open_lets_one_probe_through(self):
+        breaker = CircuitBreaker(threshold=2, cooldown=0)
+        breaker.failure("host")
+        breaker.failure("host")
+        self.assertTrue(breaker.allow("host"))
+        self.assertFalse(breaker.allow("host"))
+        breaker.success("host")
+        self.assertTrue(breaker.allow("host"))
+        self.assertTrue(breaker.allow("host"))
+
+    def test_failed_probe_reopens(self):
+        breaker = CircuitBreaker(threshold=2, cooldown=60)
+        breaker.failure("host")
+        breaker.failure("host")
+        breaker.opened_at["host"] -= 60
+        self.assertTrue(breaker.allow("host"))
+        breaker.failure("host")
+        self.assertFalse(breaker.allow("host"))
+        self.assertEqual(breaker.open_hosts(), ["host"])
+
+
+class ThreadSlotsTest(unittest.TestCase):
+    def test_timed_out_calls_keep_their_slot(self):
+        release = threading.Event()
+        running = []
+
+        def slow():
+            running.append(1)
+            release.wait(5)
+
+        async def scenario():
+            slots = ThreadSlots(2)
+            for _ in range(2):
+                with self.assertRaises(asyncio.TimeoutError):
+                    await slots.run(slow, deadline=0.05)
+            # Both slots are held by threads that are still running
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(slots.run(slow, deadline=1), 0.1)
+            self.assertEqual(len(running), 2)
+            release.set()
+            await asyncio.sleep(0.1)
+            self.assertEqual(await slots.run(lambda: "done", deadline=1), "done")
+
+        asyncio.run(scenario())
+
+
+class ResponseValidationTest(unittest.TestCase):
+    def test_non_object_response_is_transient(self):
+        with mock.patch.object(auto_extract, "request_extraction", return_value=["not", "an", "object"]):
+            with self.assertRaises(auto_extract.ExtractionError) as caught:
+                extract_pipeline.request_object({}, "", 1)
+        self.assertTrue(extract_pipeline.is_transient(caught.exception))
+
+
+if __name__ == "__main__":
+    unittest.main()
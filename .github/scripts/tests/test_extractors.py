@@ -0,0 +1,39 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import extractors  # noqa: E402
+
+
+def page(title):
+    return {
+        "url": "https://boards.greenhouse.io/acme/jobs/1",
+        "title": "",
+        "text": "",
+        "json_ld": [{"@type": "JobPosting", "title": title, "hiringOrganization": {"name": "Acme"}}],
+    }
+
+
+class TitleCategoryTest(unittest.TestCase):
+    def test_intern_outranks_generic_words(self):
+        for title in ["Program Manager Intern", "Lab Operations Intern", "Research Internship - Summer 2026"]:
+            self.assertEqual(extractors.title_category(title), "Internship", title)
+
+    def test_intern_next_to_a_specific_word_is_ambiguous(self):
+        for title in ["Externship / Internship", "REU Intern", "Intern Fellowship"]:
+            self.assertIsNone(extractors.title_category(title), title)
+
+    def test_titles_without_intern_keep_keyword_order(self):
+        self.assertEqual(extractors.title_category("Summer Research Fellowship"), "Research")
+        self.assertEqual(extractors.title_category("Early Leaders Program"), "Program")
+        self.assertIsNone(extractors.title_category("Software Engineer"))
+
+    def test_ambiguous_title_falls_back_to_the_model(self):
+        self.assertEqual(extractors.extract_rules(page("Lab Operations Intern"))["category"], "Internship")
+        self.assertIsNone(extractors.extract_rules(page("REU Intern")))
+
+
+if __name__ == "__main__":
+    unittest.main()
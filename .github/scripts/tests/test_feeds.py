@@ -0,0 +1,56 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import feeds  # noqa: E402
+
+
+def listing(listing_id, date_posted, **fields):
+    base = {"id": listing_id, "company_name": "Acme", "title": "Intern", "url": f"https://acme.example/{listing_id}",
+            "category": "Internship", "locations": ["Remote"], "date_posted": date_posted,
+            "date_updated": date_posted, "active": True, "is_visible": True}
+    base.update(fields)
+    return base
+
+
+class FeedsTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        for name, value in {"FEEDS_DIR": tmp.name,
+                            "JSON_FEED": os.path.join(tmp.name, "feed.json"),
+                            "ATOM_FEED": os.path.join(tmp.name, "atom.xml")}.items():
+            patcher = mock.patch.object(feeds, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def ids(self):
+        with open(feeds.JSON_FEED) as f:
+            return [item["id"].rsplit(":", 2)[1:] for item in json.load(f)["items"]]
+
+    def test_back_dated_listing_is_published(self):
+        self.assertEqual(feeds.run([listing("a", 2000)]), (True, 1))
+        self.assertEqual(feeds.run([listing("a", 2000), listing("b", 1000)]), (True, 1))
+        self.assertIn(["b", "new"], self.ids())
+        self.assertEqual(feeds.run([listing("a", 2000), listing("b", 1000)]), (False, 0))
+
+    def test_listing_closed_again_after_reactivation_is_republished(self):
+        feeds.run([listing("a", 1000, active=False, date_updated=1500)])
+        self.assertEqual(feeds.run([listing("a", 1000, active=True, date_updated=1600)])[1], 0)
+        self.assertEqual(feeds.run([listing("a", 1000, active=False, date_updated=1700)])[1], 1)
+
+    def test_watermark_feed_migrates_without_republishing(self):
+        with open(feeds.JSON_FEED, "w") as f:
+            json.dump({"items": [], "_underclassmen": {"watermark": 2000}}, f)
+        _, new = feeds.run([listing("a", 2000), listing("b", 1000), listing("c", 3000)])
+        self.assertEqual(new, 1)
+        self.assertEqual(self.ids(), [["c", "new"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
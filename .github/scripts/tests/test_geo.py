@@ -0,0 +1,36 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import geo  # noqa: E402
+
+
+class CanonicalizeTest(unittest.TestCase):
+    def assertCanonical(self, text, location_keys):
+        self.assertEqual(geo.canonicalize([text]), ([text], location_keys))
+
+    def test_text_is_kept_as_written(self):
+        self.assertCanonical("Online / In-person", ["remote"])
+        self.assertCanonical("Virtual + Multiple Cities", ["remote", "multiple"])
+        self.assertCanonical("Virtual Qualifiers", ["remote"])
+        self.assertCanonical("New York, NY (Hybrid)", ["US", "US/NY", "US/NY/New York"])
+
+    def test_canadian_provinces(self):
+        self.assertCanonical("Toronto, ON", ["CA", "CA/ON", "CA/ON/Toronto"])
+        self.assertCanonical("Montreal, Quebec", ["CA", "CA/QC", "CA/QC/Montreal"])
+        self.assertEqual(geo.key_label("CA/ON"), "Ontario")
+
+    def test_repeats_and_whitespace(self):
+        locations, location_keys = geo.canonicalize(["  NYC ", "NYC", "London, UK"])
+        self.assertEqual(locations, ["NYC", "London, UK"])
+        self.assertEqual(location_keys, ["US", "US/NY", "US/NY/New York", "GB", "GB/London"])
+
+    def test_unrecognised_text_has_no_keys(self):
+        self.assertCanonical("Somewhere Nice", [])
+        self.assertEqual(geo.canonicalize([]), (["Multiple Locations"], []))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import lifecycle  # noqa: E402
+from lifecycle import CLOSED, DAY, LifecycleEngine  # noqa: E402
+
+NOW = 1_790_000_000
+
+
+def listing(listing_id="1", **fields):
+    base = {"id": listing_id, "company_name": "Acme", "title": "Intern", "active": True}
+    base.update(fields)
+    return base
+
+
+class LifecycleTest(unittest.TestCase):
+    def test_listing_added_after_its_deadline_is_inactive(self):
+        new = listing(deadline_at=NOW - 10 * DAY)
+        lifecycle.set_status(new, NOW)
+        self.assertEqual(new["status"], CLOSED)
+        self.assertFalse(new["active"])
+        self.assertIsNone(lifecycle.next_transition_time(new))
+
+    def test_closed_but_active_listing_is_deactivated(self):
+        stuck = listing(deadline_at=NOW - 10 * DAY, status=CLOSED)
+        self.assertEqual(lifecycle.next_transition_time(stuck), 0)
+        transitions = LifecycleEngine([stuck]).advance(NOW)
+        self.assertEqual([(old, new) for _, old, new in transitions], [(CLOSED, CLOSED)])
+        self.assertFalse(stuck["active"])
+        self.assertEqual(stuck["date_updated"], NOW)
+
+    def test_deadline_passing_closes_listing(self):
+        open_listing = listing(deadline_at=NOW + 30 * DAY, status=lifecycle.OPEN)
+        engine = LifecycleEngine([open_listing])
+        self.assertEqual(engine.advance(NOW), [])
+        statuses = [new for _, _, new in engine.advance(NOW + 40 * DAY)]
+        self.assertEqual(statuses, [CLOSED])
+        self.assertFalse(open_listing["active"])
+
+
+if __name__ == "__main__":
+    unittest.main()
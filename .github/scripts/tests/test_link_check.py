@@ -0,0 +1,113 @@
+import asyncio
+import http.server
+import os
+import socket
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import link_check  # noqa: E402
+
+
+class StubHandler(http.server.BaseHTTPRequestHandler):
+    """/ok 200, /gone 404, /moved -> /ok, /no-head 405 on HEAD but 200 on GET."""
+
+    def _respond(self, head):
+        if self.path == "/moved":
+            self.send_response(302)
+            self.send_header("Location", "/ok")
+        elif self.path == "/ok" or (self.path == "/no-head" and not head):
+            self.send_response(200)
+        elif self.path == "/no-head":
+            self.send_response(405)
+        else:
+            self.send_response(404)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_HEAD(self):
+        self._respond(head=True)
+
+    def do_GET(self):
+        self._respond(head=False)
+
+    def log_message(self, *args):
+        pass
+
+
+def closed_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class LinkCheckTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        patcher = mock.patch.object(link_check, "PER_HOST_INTERVAL", 0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def check(self, urls, cache, force=True):
+        return asyncio.run(link_check.check_urls(urls, cache, timeout=5, force=force))
+
+    def test_states_against_stub_server(self):
+        cache = {}
+        urls = {f"{self.base}/{name}": [] for name in ("ok", "gone", "moved", "no-head")}
+        self.assertEqual(self.check(urls, cache), 4)
+        self.assertEqual(cache[f"{self.base}/ok"]["state"], "ok")
+        self.assertEqual(cache[f"{self.base}/moved"]["final_url"], f"{self.base}/ok")
+        self.assertEqual(cache[f"{self.base}/no-head"]["method"], "GET")
+        self.assertEqual(cache[f"{self.base}/no-head"]["state"], "ok")
+        # One 404 is only suspect; the second in a row makes it dead
+        self.assertEqual(cache[f"{self.base}/gone"]["state"], "suspect")
+        self.check({f"{self.base}/gone": []}, cache)
+        self.assertEqual(cache[f"{self.base}/gone"]["state"], "dead")
+
+    def test_recovery_resets_failures(self):
+        cache = {f"{self.base}/ok": {"state": "suspect", "status": 404, "failures": 1, "checked": 0, "ttl": 0}}
+        self.check({f"{self.base}/ok": []}, cache, force=False)
+        self.assertEqual(cache[f"{self.base}/ok"]["state"], "ok")
+        self.assertNotIn("failures", cache[f"{self.base}/ok"])
+
+    def test_connect_error_is_not_dead(self):
+        url = f"http://127.0.0.1:{closed_port()}/posting"
+        cache = {}
+        for _ in range(link_check.DEAD_CONFIRMATIONS + 1):
+            self.check({url: []}, cache)
+        self.assertEqual(cache[url]["state"], "error")
+
+    def test_readme_only_dead_link_is_reported(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        readme = os.path.join(tmp.name, "README.md")
+        with open(readme, "w") as f:
+            f.write(f'<a href="{self.base}/gone">Apply</a> <a href="{self.base}/ok">Apply</a>')
+        listing = {"id": "1", "company_name": "Acme", "title": "Intern", "url": f"{self.base}/ok", "active": True}
+        urls, sources = link_check.collect_urls([listing], [readme])
+        self.assertEqual(sources[f"{self.base}/ok"], ["listings.json", "README.md"])
+        cache = {}
+        for _ in range(link_check.DEAD_CONFIRMATIONS):
+            self.check(urls, cache)
+        dead = link_check.dead_links(sources, cache)
+        self.assertEqual([(d["url"], d["status"], d["sources"]) for d in dead],
+                         [(f"{self.base}/gone", 404, ["README.md"])])
+        self.assertEqual(link_check.close_candidates(urls, cache), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import relevance  # noqa: E402
+
+BODY = "\n".join([
+    "Eligibility",
+    "Open to freshmen and sophomores enrolled in a US college. Remote, with a stipend for the summer.",
+    "Benefits",
+    "We offer dental, vision and 401k benefits to all employees. " * 12,
+])
+
+
+class TrimTest(unittest.TestCase):
+    def test_long_header_is_capped_and_best_block_kept(self):
+        header = '{"@type": "JobPosting", "description": "' + "x" * 4000 + '"}'
+        text = header + relevance.METADATA_SEPARATOR + BODY
+        trimmed, stats = relevance.trim(text, "Summer Intern", budget=300)
+        head, body = trimmed.split(relevance.METADATA_SEPARATOR, 1)
+        self.assertLessEqual(len(head), 300 * relevance.HEADER_SHARE * relevance.CHARS_PER_TOKEN)
+        self.assertIn("freshmen and sophomores", body)
+        self.assertNotIn("dental", body)
+
+    def test_best_block_kept_even_when_over_budget(self):
+        text = "x" * 2000 + relevance.METADATA_SEPARATOR + BODY
+        trimmed, _ = relevance.trim(text, "Summer Intern", budget=40)
+        self.assertIn("freshmen and sophomores", trimmed)
+
+
+if __name__ == "__main__":
+    unittest.main()
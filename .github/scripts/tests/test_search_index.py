@@ -0,0 +1,69 @@
+import heapq
+import math
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import search_index  # noqa: E402
+from search_index import BM25_K1, SearchIndex, tokenize  # noqa: E402
+
+
+def brute_force(index, query, limit, predicate=None):
+    """BM25 by scoring every live document against every query term."""
+    scores = {}
+    for term in set(tokenize(query)):
+        postings = index.postings(term)
+        if not postings:
+            continue
+        idf = math.log(1 + (index.count - len(postings) + 0.5) / (len(postings) + 0.5))
+        for doc, d in enumerate(index.docs):
+            tf = postings.get(doc) if d else None
+            if tf:
+                scores[doc] = scores.get(doc, 0.0) + idf * (BM25_K1 + 1) * tf / (tf + index.norms[doc])
+    candidates = [(score, doc) for doc, score in scores.items()
+                  if predicate is None or predicate(index.docs[doc][3])]
+    return [(score, index.docs[doc][3]) for score, doc in heapq.nlargest(limit, candidates)]
+
+
+def listing(i, title, **fields):
+    base = {"id": str(i), "company_name": f"Company {i}", "title": title, "category": "Research", "active": True}
+    base.update(fields)
+    return base
+
+
+class SearchTest(unittest.TestCase):
+    def test_documents_without_the_rarest_term_still_match(self):
+        listings = [listing(0, "Rare Research Fellowship")]
+        listings += [listing(i, "Summer Research Program") for i in range(1, 4)]
+        listings += [listing(i, "Software Internship", category="Internship") for i in range(4, 10)]
+        index = SearchIndex()
+        index.update(search_index.documents(listings, archive_path=""))
+        results = index.search("rare research")
+        self.assertEqual(len(results), 4)
+        self.assertEqual(results[0][1]["title"], "Rare Research Fellowship")
+
+    def test_matches_brute_force(self):
+        rng = random.Random(7)
+        listings = [search_index.synthetic_listing(i, rng) for i in range(3000)]
+        index = SearchIndex()
+        index.update(search_index.documents(listings, archive_path=""))
+        words = search_index.SYNTHETIC_WORDS + ["freshman", "remote", "intern", "fellowship", "boston"]
+        for _ in range(200):
+            query = " ".join(rng.sample(words, rng.randint(1, 5)))
+            limit = rng.choice([1, 5, 10, 50])
+            predicate = rng.choice([None, lambda meta: meta["active"]])
+            expected = brute_force(index, query, limit, predicate)
+            actual = index.search(query, limit=limit, predicate=predicate)
+            self.assertEqual([round(s, 9) for s, _ in actual], [round(s, 9) for s, _ in expected], query)
+            # Same documents, apart from ties at the cut-off score
+            if expected:
+                cutoff = expected[-1][0]
+                above = lambda results: {m["url"] + m["title"] + m["company"] for s, m in results if s > cutoff + 1e-9}
+                self.assertEqual(above(actual), above(expected), query)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import facets  # noqa: E402
+import sharded_store  # noqa: E402
+import util  # noqa: E402
+from bench_storage import use_backend  # noqa: E402
+
+
+def listing(listing_id, category="Internship", season="Summer", **fields):
+    base = {"id": listing_id, "company_name": "Acme", "title": f"Role {listing_id}", "url": f"https://acme.example/{listing_id}",
+            "category": category, "season": season, "sponsorship": "Other", "active": True, "is_visible": True,
+            "target_year": ["Freshman (1st year)"], "date_posted": 1, "date_updated": 1}
+    base.update(fields)
+    return base
+
+
+class ShardMoveTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        saved = (util.LISTINGS_BACKEND, util.LISTINGS_FILE, sharded_store.SHARDS_DIR, sharded_store.MANIFEST_FILE)
+
+        def restore():
+            (util.LISTINGS_BACKEND, util.LISTINGS_FILE, sharded_store.SHARDS_DIR, sharded_store.MANIFEST_FILE) = saved
+            sharded_store._loaded.clear()
+        self.addCleanup(restore)
+        use_backend("sharded", tmp.name)
+        util.save_listings_to_json([listing("a"), listing("b")])
+        facets.save(facets.compute(util.get_listings_from_json()))
+
+    def test_category_change_moves_the_listing(self):
+        util.save_listings_to_json([listing("a", category="Research")])
+        stored = util.get_listings_from_json()
+        self.assertEqual(sorted((l["id"], l["category"]) for l in stored), [("a", "Research"), ("b", "Internship")])
+        manifest = sharded_store.load_manifest()
+        self.assertNotIn("ids", manifest)
+        self.assertEqual(sharded_store.id_index(manifest), {"a": "research/summer.json", "b": "internship/summer.json"})
+        self.assertEqual(manifest["shards"]["internship/summer.json"]["count"], 1)
+        # facets subtracted the old copy rather than double counting
+        self.assertEqual(facets.load()["marginals"]["category"], {"Internship": 1, "Research": 1})
+
+    def test_emptied_shard_is_removed(self):
+        util.save_listings_to_json([listing("a", season="Fall"), listing("b", season="Fall")])
+        manifest = sharded_store.load_manifest()
+        self.assertEqual(list(manifest["shards"]), ["internship/fall.json"])
+        self.assertFalse(os.path.exists(os.path.join(sharded_store.SHARDS_DIR, "internship", "summer.json")))
+        self.assertEqual(len(util.get_listings_from_json()), 2)
+
+    def test_add_appends_to_the_id_log_only(self):
+        with open(sharded_store.MANIFEST_FILE) as f:
+            before = f.read()
+        util.save_listings_to_json([listing("c", category="Research")])
+        with open(sharded_store.ids_file()) as f:
+            self.assertEqual(f.read().splitlines()[-1], "c research/summer.json")
+        manifest = sharded_store.load_manifest()
+        self.assertEqual(set(manifest["shards"]), {"internship/summer.json", "research/summer.json"})
+        self.assertLess(len(json.dumps(manifest)), len(before) * 2)
+
+    def test_store_without_id_log(self):
+        os.remove(sharded_store.ids_file())
+        with open(sharded_store.MANIFEST_FILE) as f:
+            manifest = json.load(f)
+        manifest["ids"] = {"a": "internship/summer.json", "b": "internship/summer.json"}
+        with open(sharded_store.MANIFEST_FILE, "w") as f:
+            json.dump(manifest, f)
+        sharded_store._loaded.clear()
+        util.save_listings_to_json([listing("b", category="Scholarship")])
+        self.assertEqual(sorted(l["category"] for l in util.get_listings_from_json()), ["Internship", "Scholarship"])
+        self.assertNotIn("ids", sharded_store.load_manifest())
+
+        os.remove(sharded_store.ids_file())
+        util.save_listings_to_json([listing("a", category="Scholarship")])
+        self.assertEqual(sorted(l["category"] for l in util.get_listings_from_json()), ["Scholarship", "Scholarship"])
+
+
+if __name__ == "__main__":
+    unittest.main()
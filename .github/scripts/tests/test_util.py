@@ -0,0 +1,24 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import util  # noqa: E402
+
+
+class SortListingsTest(unittest.TestCase):
+    def test_ties_break_on_company_name_not_company_key(self):
+        # README rows must keep their rendered order when company keys are added.
+        listings = [
+            {"company_name": "beta", "company_key": "a", "active": True, "date_posted": 1},
+            {"company_name": "Alpha", "company_key": "z", "active": True, "date_posted": 1},
+            {"company_name": "Gamma", "company_key": "g", "active": False, "date_posted": 5},
+            {"company_name": "Delta", "company_key": "d", "active": True, "date_posted": 2},
+        ]
+        names = [l["company_name"] for l in util.sort_listings(listings)]
+        self.assertEqual(names, ["Delta", "Alpha", "beta", "Gamma"])
+
+
+if __name__ == "__main__":
+    unittest.main()
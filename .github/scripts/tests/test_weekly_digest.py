@@ -0,0 +1,70 @@
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import artifact_cache  # noqa: E402
+import weekly_digest  # noqa: E402
+
+TODAY = datetime(2026, 8, 15, 9, tzinfo=weekly_digest.PST)
+
+README = """
+<!-- INTERNSHIPS_TABLE_START -->
+| Status | Company | Role | Location | Application | Date Posted |
+|---|---|---|---|---|---|
+| 🟢 | Acme | Explore Intern | Remote | <a href="https://acme.example/apply">Apply</a> | Aug 13, 2026 |
+| 🟢 | Harbor | REU | Boston, MA | <a href="https://harbor.example/reu">Apply</a> | Aug 12, 2026 |
+| 🟢 | Oldco | Intern | Remote | <a href="https://old.example/apply">Apply</a> | Jul 01, 2026 |
+| 🔒 CLOSED | Shutco | Intern | Remote | <a href="https://shut.example/apply">Apply</a> | Aug 14, 2026 |
+<!-- INTERNSHIPS_TABLE_END -->
+"""
+
+
+def listing(**fields):
+    base = {"id": "1", "company_name": "Acme", "title": "Explore Intern", "url": "https://acme.example/apply",
+            "category": "Internship", "date_posted": int(datetime(2026, 8, 13, tzinfo=weekly_digest.PST).timestamp()),
+            "date_updated": 0, "active": True, "is_visible": True, "locations": ["Remote"]}
+    base.update(fields)
+    return base
+
+
+class NewThisWeekTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        readme = os.path.join(tmp.name, "README.md")
+        with open(readme, "w") as f:
+            f.write(README)
+        for target, value in ((weekly_digest, {"README": readme,
+                                               "DIGEST": os.path.join(tmp.name, "digest.md"),
+                                               "DIGEST_DIR": os.path.join(tmp.name, "digest")}),
+                              (artifact_cache, {"CACHE_DIR": os.path.join(tmp.name, "cache"),
+                                                "INDEX_FILE": os.path.join(tmp.name, "cache", "index.json"),
+                                                "_index": None})):
+            for name, v in value.items():
+                patcher = mock.patch.object(target, name, v)
+                patcher.start()
+                self.addCleanup(patcher.stop)
+        weekly_digest._listing_summaries.clear()
+
+    def test_readme_only_row_is_new(self):
+        _, new = weekly_digest.run([], TODAY)
+        self.assertEqual(new, 2)
+
+    def test_listing_and_readme_row_dedupe_by_url(self):
+        _, new = weekly_digest.run([listing()], TODAY)
+        self.assertEqual(new, 2)
+        with open(weekly_digest.DIGEST) as f:
+            digest = f.read()
+        self.assertEqual(digest.count("https://acme.example/apply"), 1)
+        self.assertIn("https://harbor.example/reu", digest)
+        self.assertNotIn("https://old.example/apply", digest)
+        self.assertNotIn("https://shut.example/apply", digest)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,214 +2,170 @@
 """
 Update README.md with the latest listings from listings.json.
 
-This script reads the listings data, generates markdown tables,
-and embeds them in the README file between the marker comments.
+This script reads the listings data, renders a markdown table for each
+section in tables.RENDERED (see tables.py for the column specs), and embeds
+them in the README file between the marker comments.
+
+While rendering it diffs each section against the rows it rendered last time
+(readme_rows.json: section -> {listing id: row hash}), so it knows which
+listings were added, removed or changed per section without diffing the
+README. The diff is exposed as outputs for commit messages and PR comments:
+
+  has_changes           "true" only if README.md (or the row manifest) changed
+  readme_diff           JSON: {section: {"added": [ids], "removed": [...], "changed": [...]}}
+  readme_diff_markdown  the same diff as a markdown list
+  commit_message        one-line summary plus the per-section list
+
+README.md is only rewritten when its contents changed. Rendered tables are
+kept in the artifact cache (artifact_cache.py), keyed by the section's
+listings, so a section whose listings didn't change isn't re-rendered.
 """
 
+import hashlib
+import json
 import os
+import time
 from datetime import datetime
+import artifact_cache
+import facets
+import tables
 import util
 
+README_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "README.md")
+ROWS_FILE = os.path.join(util.SCRIPT_DIR, "readme_rows.json")
 
-def main():
-    try:
-        # Load listings
-        listings = util.get_listings_from_json()
+
+def row_hash(row):
+    return hashlib.sha1(row.encode("utf-8")).hexdigest()[:12]
+
+
+def load_row_manifest():
+    if not os.path.exists(ROWS_FILE):
+        return None
+    with open(ROWS_FILE, "r") as f:
+        return json.load(f)
+
+
+def diff_section(previous, rows, old_table):
+    """Rows added / removed / changed by listing id.
+
+    `previous` is the section's {id: row hash} from the last render. Without
+    one (first run), rows already present verbatim in the old table count as
+    unchanged and everything else as added.
+    """
+    current = {listing_id: row_hash(row) for listing_id, row in rows.items()}
+    if previous is None:
+        old_rows = set(old_table.split("\n"))
+        added = [i for i, row in rows.items() if row not in old_rows]
+        return current, {"added": added, "removed": [], "changed": []}
+    return current, {
+        "added": [i for i in current if i not in previous],
+        "removed": [i for i in previous if i not in current],
+        "changed": [i for i in current if i in previous and previous[i] != current[i]],
+    }
+
+
+def format_diff(diff, by_id):
+    """Markdown list of the diff, one line per section with changes."""
+    lines = []
+    for label, changes in diff.items():
+        parts = []
+        for kind, sign in (("added", "+"), ("changed", "~"), ("removed", "-")):
+            for listing_id in changes[kind]:
+                listing = by_id.get(listing_id)
+                name = f"{listing['company_name']} — {listing['title']}" if listing else listing_id
+                parts.append(f"{sign} {name}")
+        if parts:
+            lines.append(f"- **{label}**: " + "; ".join(parts))
+    return "\n".join(lines)
+
+
+def summarize_diff(diff):
+    totals = {kind: sum(len(c[kind]) for c in diff.values()) for kind in ("added", "changed", "removed")}
+    return ", ".join(f"{n} {kind}" for kind, n in totals.items() if n) or "no row changes"
+
+
+def load_listings():
+    """Every listing, validated, loaded one category at a time (with the
+    sharded backend this reads only that category's shards)."""
+    loaded = []
+    for category in util.VALID_CATEGORIES:
+        section = util.get_listings_from_json(categories=[category])
 
         # Validate schema
-        util.check_schema(listings)
-
-        # Separate listings by category
-        internship_listings = []
-        program_listings = []
-        research_listings = []
-        scholarship_listings = []
-
-        for listing in listings:
-            if not listing.get("is_visible", True):
-                continue
-
-            category = listing.get("category", "Internship")
-            if category == "Internship":
-                internship_listings.append(listing)
-            elif category == "Program":
-                program_listings.append(listing)
-            elif category == "Research":
-                research_listings.append(listing)
-            elif category == "Scholarship":
-                scholarship_listings.append(listing)
-
-        # Sort listings
-        internship_listings = util.sort_listings(internship_listings)
-        program_listings = util.sort_listings(program_listings)
-        research_listings = util.sort_listings(research_listings)
-        scholarship_listings = util.sort_listings(scholarship_listings)
-
-        # Generate tables
-        internships_table = create_internships_table(internship_listings)
-        programs_table = create_programs_table(program_listings)
-        research_table = create_research_table(research_listings)
-        scholarships_table = create_scholarships_table(scholarship_listings)
-
-        # Get README path
-        readme_path = os.path.join(
-            os.path.dirname(os.path.abspath(__file__)),
-            "..", "..",
-            "README.md"
-        )
-
-        # Embed tables in README
-        util.embed_table(
-            readme_path,
-            internships_table,
-            "<!-- INTERNSHIPS_TABLE_START -->",
-            "<!-- INTERNSHIPS_TABLE_END -->"
-        )
-
-        util.embed_table(
-            readme_path,
-            programs_table,
-            "<!-- PROGRAMS_TABLE_START -->",
-            "<!-- PROGRAMS_TABLE_END -->"
-        )
-
-        util.embed_table(
-            readme_path,
-            research_table,
-            "<!-- RESEARCH_TABLE_START -->",
-            "<!-- RESEARCH_TABLE_END -->"
-        )
-
-        util.embed_table(
-            readme_path,
-            scholarships_table,
-            "<!-- SCHOLARSHIPS_TABLE_START -->",
-            "<!-- SCHOLARSHIPS_TABLE_END -->"
-        )
-
-        # Set commit message
-        now = datetime.now(util.PST)
-        timestamp = now.strftime("%Y-%m-%d %H:%M PST")
-        util.set_output("commit_message", f"Update README ({timestamp})")
-
-        print(f"Successfully updated README:")
-        print(f"  - {len(internship_listings)} internships")
-        print(f"  - {len(program_listings)} programs")
-        print(f"  - {len(research_listings)} research opportunities")
-        print(f"  - {len(scholarship_listings)} scholarships")
+        util.check_schema(section)
+        loaded.extend(section)
+    return loaded
+
+
+def render(loaded):
+    """Rewrite the README tables (and facets.json) from an already-loaded
+    set of listings. Returns the outputs main() publishes."""
+    visible = util.sort_listings([l for l in loaded if l.get("is_visible", True)])
+
+    with open(README_PATH, "r") as f:
+        original = f.read()
+    manifest = load_row_manifest()
+    content, new_manifest, diff, timings = original, {}, {}, {}
+
+    for key in tables.RENDERED:
+        section = tables.SECTIONS_BY_KEY[key]
+        listings = [l for l in visible if section.select(l)]
+        # A section's table depends only on its own listings and the renderer
+        began = time.perf_counter()
+        # (util.format_locations summarizes long location lists with geo.py)
+        renderer = artifact_cache.version("tables", "lifecycle", "companies", "geo")
+        cache_key = artifact_cache.key(f"table:{key}", listings, renderer)
+        table = artifact_cache.cached(cache_key, lambda: tables.render(section, listings)[0], f"table:{key}")
+        timings[section.label] = (time.perf_counter() - began) * 1000
+        start, end = f"<!-- {key}_TABLE_START -->", f"<!-- {key}_TABLE_END -->"
+        old_table = content[content.find(start) + len(start):content.find(end)]
+        # One row per listing, in order, after the header and separator
+        rows = dict(zip((l["id"] for l in listings), table.split("\n")[2:]))
+        previous = manifest.get(key, {}) if manifest is not None else None
+        new_manifest[key], diff[section.label] = diff_section(previous, rows, old_table)
+        content = util.replace_between(content, table, start, end)
+
+    readme_changed = content != original
+    if readme_changed:
+        with open(README_PATH, "w") as f:
+            f.write(content)
+    if new_manifest != manifest:
+        with open(ROWS_FILE, "w") as f:
+            json.dump(new_manifest, f, indent=2, sort_keys=True)
+
+    # Full load already in hand: refresh the facet counts from it
+    facet_counts = facets.compute(loaded)
+    facets.save(facet_counts)
+
+    summary = summarize_diff(diff)
+    details = format_diff(diff, {l["id"]: l for l in loaded})
+    timestamp = datetime.now(util.PST).strftime("%Y-%m-%d %H:%M PST")
+
+    if not readme_changed:
+        print("README already up to date.")
+    else:
+        print(f"Successfully updated README: {summary}")
+        if details:
+            print(details)
+    print("Render time: " + ", ".join(f"{label} {ms:.1f} ms" for label, ms in timings.items()))
+    print(facets.format_marginals(facet_counts))
+
+    return {
+        "has_changes": "true" if readme_changed or new_manifest != manifest else "false",
+        "readme_diff": json.dumps({k: v for k, v in diff.items() if any(v.values())}),
+        "readme_diff_markdown": details,
+        "commit_message": f"Update README: {summary} ({timestamp})" + (f"\n\n{details}" if details else ""),
+    }
+
 
+def main():
+    try:
+        for name, value in render(load_listings()).items():
+            util.set_output(name, value)
     except Exception as e:
         util.fail(str(e))
 
 
-def create_internships_table(listings):
-    """Create a table for internships."""
-    rows = []
-    header = "| Company | Role | Location | Application | Date Posted |"
-    separator = "| ------- | ---- | -------- | ----------- | ----------- |"
-    rows.append(header)
-    rows.append(separator)
-
-    prev_company = None
-    prev_title = None
-    for listing in listings:
-        company = listing["company_name"]
-        title = listing["title"]
-
-        # Only use arrow when same company but DIFFERENT role
-        if company == prev_company and title != prev_title:
-            display_company = "↳"
-        else:
-            display_company = company
-        prev_company = company
-        prev_title = title
-
-        display_title = util.sanitize_table_cell(title)
-        display_title += util.get_sponsorship_badge(listing.get("sponsorship", ""))
-        display_title += util.get_status_badge(listing.get("active", True))
-
-        location = util.format_locations(listing.get("locations", []))
-        link = util.format_link(listing["url"]) if listing.get("active", True) else ":lock:"
-        date = util.format_date(listing["date_posted"])
-
-        row = f"| {util.sanitize_table_cell(display_company)} | {display_title} | {location} | {link} | {date} |"
-        rows.append(row)
-
-    return "\n".join(rows)
-
-
-def create_programs_table(listings):
-    """Create a table for programs (fellowships, externships, etc.)."""
-    rows = []
-    header = "| Company | Program | Type | Location | Application | Date Posted |"
-    separator = "| ------- | ------- | ---- | -------- | ----------- | ----------- |"
-    rows.append(header)
-    rows.append(separator)
-
-    for listing in listings:
-        company = util.sanitize_table_cell(listing["company_name"])
-        title = util.sanitize_table_cell(listing["title"])
-        title += util.get_sponsorship_badge(listing.get("sponsorship", ""))
-        title += util.get_status_badge(listing.get("active", True))
-
-        opp_type = util.sanitize_table_cell(listing.get("opportunity_type", ""))
-        location = util.format_locations(listing.get("locations", []))
-        link = util.format_link(listing["url"]) if listing.get("active", True) else ":lock:"
-        date = util.format_date(listing["date_posted"])
-
-        row = f"| {company} | {title} | {opp_type} | {location} | {link} | {date} |"
-        rows.append(row)
-
-    return "\n".join(rows)
-
-
-def create_research_table(listings):
-    """Create a table for research programs."""
-    rows = []
-    header = "| University/Organization | Program | Field | Location | Application | Date Posted |"
-    separator = "| ----------------------- | ------- | ----- | -------- | ----------- | ----------- |"
-    rows.append(header)
-    rows.append(separator)
-
-    for listing in listings:
-        company = util.sanitize_table_cell(listing["company_name"])
-        title = util.sanitize_table_cell(listing["title"])
-        title += util.get_sponsorship_badge(listing.get("sponsorship", ""))
-        title += util.get_status_badge(listing.get("active", True))
-
-        field = util.sanitize_table_cell(listing.get("field", ""))
-        location = util.format_locations(listing.get("locations", []))
-        link = util.format_link(listing["url"]) if listing.get("active", True) else ":lock:"
-        date = util.format_date(listing["date_posted"])
-
-        row = f"| {company} | {title} | {field} | {location} | {link} | {date} |"
-        rows.append(row)
-
-    return "\n".join(rows)
-
-
-def create_scholarships_table(listings):
-    """Create a table for scholarships."""
-    rows = []
-    header = "| Organization | Scholarship | Amount | Application | Deadline |"
-    separator = "| ------------ | ----------- | ------ | ----------- | -------- |"
-    rows.append(header)
-    rows.append(separator)
-
-    for listing in listings:
-        company = util.sanitize_table_cell(listing["company_name"])
-        title = util.sanitize_table_cell(listing["title"])
-        title += util.get_status_badge(listing.get("active", True))
-
-        amount = util.sanitize_table_cell(listing.get("scholarship_amount", "Varies"))
-        link = util.format_link(listing["url"]) if listing.get("active", True) else ":lock:"
-        deadline = util.sanitize_table_cell(listing.get("deadline", "Varies"))
-
-        row = f"| {company} | {title} | {amount} | {link} | {deadline} |"
-        rows.append(row)
-
-    return "\n".join(rows)
-
-
 if __name__ == "__main__":
     main()
@@ -13,6 +13,11 @@ LISTINGS_FILE = os.path.join(SCRIPT_DIR, "listings.json")
 README_FILE = os.path.join(SCRIPT_DIR, "..", "..", "README.md")
 PST = ZoneInfo("America/Los_Angeles")
 
+# Storage backend for listings: "json" (the single listings.json file),
+# "sharded" (one file per category per season, see sharded_store.py) or
+# "sqlite" (indexed listings.db, see sqlite_store.py).
+LISTINGS_BACKEND = os.environ.get("LISTINGS_BACKEND", "json")
+
 # Required fields for each listing
 REQUIRED_FIELDS = [
     "id",
@@ -36,18 +41,80 @@ REQUIRED_FIELDS = [
 VALID_CATEGORIES = ["Internship", "Program", "Research", "Scholarship"]
 
 
-def get_listings_from_json():
-    """Load listings from the JSON file."""
+def get_listings_from_json(categories=None, seasons=None):
+    """Load listings, optionally only those in the given categories / seasons."""
+    if LISTINGS_BACKEND == "sharded":
+        import sharded_store
+        return sharded_store.load(categories, seasons)
+    if LISTINGS_BACKEND == "sqlite":
+        import sqlite_store
+        return sqlite_store.load(categories, seasons)
     if not os.path.exists(LISTINGS_FILE):
         return []
     with open(LISTINGS_FILE, "r") as f:
-        return json.load(f)
+        listings = json.load(f)
+    if categories is not None:
+        listings = [l for l in listings if l.get("category") in categories]
+    if seasons is not None:
+        listings = [l for l in listings if l.get("season") in seasons]
+    return listings
 
 
 def save_listings_to_json(listings):
-    """Save listings to the JSON file."""
-    with open(LISTINGS_FILE, "w") as f:
-        json.dump(listings, f, indent=2)
+    """Save listings to the JSON file (or the shards they belong to).
+
+    Listings are merged into what's stored by id, so saving a filtered load
+    never drops the listings that weren't loaded. facets.json is updated from
+    the stored versions of the saved listings (see facets.py).
+    """
+    import facets
+    ids = {listing["id"] for listing in listings}
+    if LISTINGS_BACKEND == "sharded":
+        import sharded_store
+        previous = sharded_store.find_by_ids(ids)
+        sharded_store.save(listings)
+    elif LISTINGS_BACKEND == "sqlite":
+        import sqlite_store
+        previous = sqlite_store.find_by_ids(ids)
+        sqlite_store.save(listings)
+    else:
+        merged = get_listings_from_json()
+        previous = [l for l in merged if l["id"] in ids]
+        positions = {listing["id"]: i for i, listing in enumerate(merged)}
+        for listing in listings:
+            if listing["id"] in positions:
+                merged[positions[listing["id"]]] = listing
+            else:
+                positions[listing["id"]] = len(merged)
+                merged.append(listing)
+        with open(LISTINGS_FILE, "w") as f:
+            json.dump(merged, f, indent=2)
+    facets.record(previous, listings)
+
+
+def find_listing_by_url(listings, url):
+    """Return the listing with this URL, or None (an index lookup on sqlite)."""
+    if LISTINGS_BACKEND == "sqlite":
+        import sqlite_store
+        return sqlite_store.find_by_url(url)
+    for listing in listings:
+        if listing["url"] == url:
+            return listing
+    return None
+
+
+def find_listings_by_name(listings, company_name, title, url=""):
+    """Return listings at the same company (see companies.py) with the same
+    title, case-insensitively. `url` helps place the company by its domain."""
+    import companies
+    key = companies.canonicalize(company_name, url)[1]
+    if LISTINGS_BACKEND == "sqlite":
+        import sqlite_store
+        return [l for l in sqlite_store.find_by_title(title) if companies.listing_key(l) == key]
+    return [
+        listing for listing in companies.index_for(listings).listings(key)
+        if listing["title"].lower() == title.lower()
+    ]
 
 
 def check_schema(listings):
@@ -80,6 +147,17 @@ def sanitize_table_cell(value):
     return value.strip()
 
 
+def split_locations(locations_str):
+    """Split a free-text location field into a list.
+
+    Supports semicolon, pipe, or newline as separators; defaults to
+    "Multiple Locations" when nothing is given.
+    """
+    import re
+    locations = [loc.strip() for loc in re.split(r'[;|\n]', locations_str or "") if loc.strip()]
+    return locations or ["Multiple Locations"]
+
+
 def format_locations(locations):
     """Format location list for display."""
     if not locations:
@@ -88,9 +166,12 @@ def format_locations(locations):
         return sanitize_table_cell(locations[0])
     if len(locations) <= 3:
         return ", ".join(sanitize_table_cell(loc) for loc in locations)
-    # For many locations, use expandable details
+    # For many locations, use expandable details summarized by region
+    import geo
     joined = ", ".join(sanitize_table_cell(loc) for loc in locations)
-    return f"<details><summary>{len(locations)} locations</summary>{joined}</details>"
+    regions = geo.summarize(locations)
+    summary = f"{len(locations)} locations · {sanitize_table_cell(regions)}" if regions else f"{len(locations)} locations"
+    return f"<details><summary>{summary}</summary>{joined}</details>"
 
 
 def get_sponsorship_badge(sponsorship):
@@ -121,18 +202,15 @@ def format_date(timestamp):
     return dt.strftime("%b %d")
 
 
-def embed_table(filepath, table, start_marker, end_marker):
-    """Embed the generated table between markers in a file."""
-    with open(filepath, "r") as f:
-        content = f.read()
-
+def replace_between(content, table, start_marker, end_marker):
+    """Return content with the text between the markers replaced by table."""
     start_idx = content.find(start_marker)
     end_idx = content.find(end_marker)
 
     if start_idx == -1 or end_idx == -1:
-        raise ValueError(f"Could not find markers in {filepath}")
+        raise ValueError(f"Could not find markers {start_marker} / {end_marker}")
 
-    new_content = (
+    return (
         content[:start_idx + len(start_marker)]
         + "\n"
         + table
@@ -140,10 +218,36 @@ def embed_table(filepath, table, start_marker, end_marker):
         + content[end_idx:]
     )
 
+
+def embed_table(filepath, table, start_marker, end_marker):
+    """Embed the generated table between markers in a file."""
+    with open(filepath, "r") as f:
+        content = f.read()
+
+    try:
+        new_content = replace_between(content, table, start_marker, end_marker)
+    except ValueError:
+        raise ValueError(f"Could not find markers in {filepath}")
+
     with open(filepath, "w") as f:
         f.write(new_content)
 
 
+def write_if_changed(path, content):
+    """Write a text file only if its contents differ. Returns True if written.
+
+    Leaving unchanged files untouched keeps their mtimes, and the ETags of
+    anything served from them, stable between runs.
+    """
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            if f.read() == content:
+                return False
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+    return True
+
+
 def set_output(name, value):
     """Set a GitHub Actions output variable."""
     github_output = os.environ.get("GITHUB_OUTPUT")
@@ -2,24 +2,49 @@
 """
 weekly_digest.py — generate a markdown digest of new and closing-soon entries.
 
-Reads README.md, parses every <!-- *_TABLE_START --> ... <!-- *_TABLE_END -->.
-Outputs a markdown summary to digest.md with two sections:
-  1. New this week (entries with Date Posted in last 7 days)
-  2. Closing soon (entries currently flagged 🔥 [CLOSING SOON])
+Queries listings.json through ListingIndex (sorted timestamp indexes) and
+reads README.md, which is still edited by hand and can have rows that
+listings.json doesn't.
+Every digest has two sections:
+  1. New this week (listings with date_posted in the last 7 days, plus
+     README rows whose Date Posted is in the last 7 days)
+  2. Closing soon (listings whose deadline_at is within CLOSING_SOON_DAYS,
+     plus README rows currently flagged 🔥 [CLOSING SOON])
+README rows are skipped when a listing with the same URL is already in
+that section.
+
+Entries are summarized once (memoized per row / listing) and sorted into
+every audience segment in the same pass — everyone, each section, each
+target year, international students (no citizenship / work-authorization
+requirement), remote, and each country and US state (from the listings'
+canonical location keys, see geo.py). Each segment is written as markdown, HTML, plain text and JSON
+to digest/<audience>.{md,html,txt,json}; digest.md stays the full markdown
+digest that the workflow posts as an issue. Rendered files are cached
+(artifact_cache.py) by the summaries and the day, so a rerun with nothing new
+doesn't render again.
 
 Sets GITHUB_OUTPUT has_content=true if either section is non-empty.
 """
 
+import html
+import json
 import os
 import re
+from functools import lru_cache
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 
+import artifact_cache
+import geo
+import util
 from closing_soon import CLOSING_SOON_DAYS
+from listing_index import index_for
 
 PST = ZoneInfo("America/Los_Angeles")
 README = os.path.join(os.path.dirname(__file__), "..", "..", "README.md")
 DIGEST = os.path.join(os.path.dirname(__file__), "..", "..", "digest.md")
+DIGEST_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "digest")
+REPO_URL = "https://github.com/Jose-Gael-Cruz-Lopez/underclassmen-opportunities"
 
 TABLE_RE = re.compile(r"<!-- (\w+)_TABLE_START -->(.*?)<!-- \1_TABLE_END -->", re.DOTALL)
 DATE_POSTED_RE = re.compile(r"^([A-Z][a-z]{2})\s+(\d{1,2}),?\s+(\d{4})$")
@@ -36,6 +61,67 @@ SECTION_LABELS = {
     "STATE": "State Grants",
 }
 
+AUDIENCE_LABELS = {
+    "all": "Everyone",
+    "freshmen": "Freshmen",
+    "sophomores": "Sophomores",
+    "rising-freshmen": "Rising Freshmen",
+    "international": "International Students",
+    "remote": "Remote",
+}
+AUDIENCE_LABELS.update(
+    {f"section-{key.lower().replace('_', '-')}": label for key, label in SECTION_LABELS.items()}
+)
+
+NO_DEADLINE = ("Rolling", "Check site", "—")
+
+# Listing sponsorship values / README text that shut out international students.
+RESTRICTED_SPONSORSHIP = {
+    "Does Not Offer Sponsorship",
+    "U.S. Citizenship Required",
+    "U.S. Work Authorization Required",
+}
+RESTRICTED_RE = re.compile(
+    r":us:|:no_entry_sign:|U\.S\. Citizen|Citizenship Required|Work Authorization Required",
+    re.IGNORECASE,
+)
+FRESHMAN_RE = re.compile(r"Freshm[ae]n|First[- ]Year|1st year", re.IGNORECASE)
+SOPHOMORE_RE = re.compile(r"Sophomore|Second[- ]Year|2nd year", re.IGNORECASE)
+RISING_RE = re.compile(r"High School Senior|Rising Freshm|Class of 2030", re.IGNORECASE)
+
+CATEGORY_SECTIONS = {
+    "Internship": "INTERNSHIPS",
+    "Program": "PROGRAMS",
+    "Research": "RESEARCH",
+    "Scholarship": "SCHOLARSHIPS",
+}
+
+
+def location_audiences(location_keys):
+    """Audience keys for a summary's locations: remote, each country and US state."""
+    keys = []
+    for key in location_keys:
+        if key == "remote":
+            keys.append("remote")
+        elif key != "multiple" and key.count("/") <= (1 if key.startswith("US/") else 0):
+            keys.append(f"location-{key.lower().replace('/', '-')}")
+    return keys
+
+
+def audience_label(audience):
+    if audience.startswith("location-"):
+        key = audience[len("location-"):].upper().replace("-", "/")
+        return geo.key_label(key)
+    return AUDIENCE_LABELS.get(audience, audience)
+
+
+def row_location_keys(cell):
+    """Location keys for a README Location cell (one location, or remote only)."""
+    text = re.sub(r"<[^>]+>", " ", cell).strip()
+    if "<details>" in cell or text.count(",") > 1:
+        return ["remote"] if geo.REMOTE_RE.search(text) else []
+    return geo.canonicalize([text])[1] if text else []
+
 
 def parse_date_posted(text: str):
     m = DATE_POSTED_RE.match(text.strip())
@@ -67,7 +153,23 @@ def parse_table(section_key: str, body: str):
     return rows
 
 
-def build_row_summary(section_key, row):
+def target_years(section_key, text):
+    """Audience keys for the class years a row or listing is aimed at."""
+    if section_key == "RISING_FRESHMEN" or RISING_RE.search(text):
+        years = ["rising-freshmen"]
+    else:
+        years = []
+    freshmen, sophomores = FRESHMAN_RE.search(text), SOPHOMORE_RE.search(text)
+    if freshmen or not sophomores:
+        years.append("freshmen")
+    if sophomores or not freshmen:
+        years.append("sophomores")
+    return years
+
+
+@lru_cache(maxsize=None)
+def _summarize_row(section_key, items):
+    row = dict(items)
     org = (
         row.get("Company")
         or row.get("Organization")
@@ -94,77 +196,239 @@ def build_row_summary(section_key, row):
         if m:
             deadline_raw = m.group(1).strip()
 
-    section = SECTION_LABELS.get(section_key, section_key.title())
-    line = f"- **[{org} — {title}]({url})** *(_{section}_)*"
-    if deadline_raw and deadline_raw not in ("Rolling", "Check site", "—"):
-        line += f" — deadline: **{deadline_raw}**"
+    text = " ".join(row.values())
+    return {
+        "org": org,
+        "title": title,
+        "url": url,
+        "section_key": section_key,
+        "section": SECTION_LABELS.get(section_key, section_key.title()),
+        "deadline": deadline_raw if deadline_raw not in NO_DEADLINE else "",
+        "target_years": target_years(section_key, text),
+        "international": not RESTRICTED_RE.search(text),
+        "location_keys": row_location_keys(row.get("Location", "")),
+    }
+
+
+def summarize_row(section_key, row):
+    """Structured summary of a README table row (memoized per row)."""
+    return _summarize_row(section_key, tuple(row.items()))
+
+
+_listing_summaries = {}
+
+
+def summarize_listing(listing):
+    """Structured summary of a listings.json entry (memoized per listing id)."""
+    if listing["id"] in _listing_summaries:
+        return _listing_summaries[listing["id"]]
+    section_key = CATEGORY_SECTIONS.get(listing.get("category", ""), "INTERNSHIPS")
+    deadline = ""
+    if listing.get("deadline_at"):
+        d = datetime.fromtimestamp(listing["deadline_at"], tz=PST)
+        deadline = f"{d:%b} {d.day}, {d.year}"
+    elif listing.get("deadline") and listing["deadline"] not in NO_DEADLINE:
+        deadline = listing["deadline"]
+    summary = {
+        "org": listing["company_name"],
+        "title": listing["title"],
+        "url": listing["url"],
+        "section_key": section_key,
+        "section": SECTION_LABELS[section_key],
+        "deadline": deadline,
+        "target_years": target_years(section_key, " ".join(listing.get("target_year", []))),
+        "international": listing.get("sponsorship", "") not in RESTRICTED_SPONSORSHIP,
+        "location_keys": geo.listing_keys(listing),
+    }
+    _listing_summaries[listing["id"]] = summary
+    return summary
+
+
+def format_markdown_line(summary):
+    line = f"- **[{summary['org']} — {summary['title']}]({summary['url']})** *(_{summary['section']}_)*"
+    if summary["deadline"]:
+        line += f" — deadline: **{summary['deadline']}**"
     return line
 
 
-def main():
-    with open(README, "r") as f:
-        content = f.read()
-
-    today = datetime.now(tz=PST)
-    cutoff = today - timedelta(days=7)
+def build_row_summary(section_key, row):
+    return format_markdown_line(summarize_row(section_key, row))
 
-    all_rows = []
-    for m in TABLE_RE.finditer(content):
-        all_rows.extend(parse_table(m.group(1), m.group(2)))
 
-    new_rows = []
-    closing_rows = []
-    for section_key, row in all_rows:
-        status = row.get("Status", "")
-        if "CLOSED" in status:
-            continue
+def build_listing_summary(listing):
+    return format_markdown_line(summarize_listing(listing))
 
-        date_posted_text = row.get("Date Posted") or ""
-        if date_posted_text:
-            d = parse_date_posted(date_posted_text)
-            if d and d >= cutoff:
-                new_rows.append((section_key, row))
 
-        if "CLOSING SOON" in status:
-            closing_rows.append((section_key, row))
+def audiences(summary):
+    """Every audience segment a summary belongs to."""
+    keys = ["all", f"section-{summary['section_key'].lower().replace('_', '-')}"]
+    keys.extend(summary["target_years"])
+    if summary["international"]:
+        keys.append("international")
+    keys.extend(location_audiences(summary["location_keys"]))
+    return keys
 
-    has_content = bool(new_rows or closing_rows)
 
+def render_markdown(audience, today, closing, new):
+    label = "" if audience == "all" else f" ({audience_label(audience)})"
     out = []
-    out.append(f"# 📬 Weekly Digest — {today.strftime('%B %d, %Y')}\n")
-    out.append(
-        f"_Auto-generated. Source: [README.md](https://github.com/Jose-Gael-Cruz-Lopez/underclassmen-opportunities)._\n"
-    )
+    out.append(f"# 📬 Weekly Digest{label} — {today.strftime('%B %d, %Y')}\n")
+    out.append(f"_Auto-generated. Source: [README.md]({REPO_URL})._\n")
 
-    if closing_rows:
-        out.append(f"\n## 🔥 Closing soon ({len(closing_rows)})\n")
+    if closing:
+        out.append(f"\n## 🔥 Closing soon ({len(closing)})\n")
         out.append(f"Apply now — these deadlines are within {CLOSING_SOON_DAYS} days:\n")
-        for s, r in closing_rows:
-            out.append(build_row_summary(s, r))
+        out.extend(format_markdown_line(s) for s in closing)
 
-    if new_rows:
-        out.append(f"\n## 🆕 New this week ({len(new_rows)})\n")
+    if new:
+        out.append(f"\n## 🆕 New this week ({len(new)})\n")
         out.append("Added in the last 7 days:\n")
-        for s, r in new_rows:
-            out.append(build_row_summary(s, r))
+        out.extend(format_markdown_line(s) for s in new)
 
-    if not has_content:
+    if not (closing or new):
         out.append("\nNo new entries or closing-soon flags this week. Stay tuned 🌱\n")
 
-    out.append(
-        f"\n---\n_Want to contribute? [Open an issue](https://github.com/Jose-Gael-Cruz-Lopez/underclassmen-opportunities/issues/new/choose)._"
-    )
+    out.append(f"\n---\n_Want to contribute? [Open an issue]({REPO_URL}/issues/new/choose)._")
+    return "\n".join(out)
+
+
+def render_text(audience, today, closing, new):
+    label = "" if audience == "all" else f" ({audience_label(audience)})"
+    out = [f"Weekly Digest{label} — {today.strftime('%B %d, %Y')}", ""]
+    for heading, summaries in ((f"CLOSING SOON ({len(closing)})", closing), (f"NEW THIS WEEK ({len(new)})", new)):
+        if not summaries:
+            continue
+        out.append(heading)
+        for s in summaries:
+            line = f"- {s['org']} — {s['title']} ({s['section']})"
+            if s["deadline"]:
+                line += f" — deadline: {s['deadline']}"
+            out.append(line)
+            out.append(f"  {s['url']}")
+        out.append("")
+    if not (closing or new):
+        out.append("No new entries or closing-soon flags this week.")
+    return "\n".join(out)
+
+
+def render_html(audience, today, closing, new):
+    label = "" if audience == "all" else f" ({audience_label(audience)})"
+    title = html.escape(f"Weekly Digest{label} — {today.strftime('%B %d, %Y')}")
+    out = [f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>{title}</title></head><body>",
+           f"<h1>📬 {title}</h1>"]
+    for heading, summaries in ((f"🔥 Closing soon ({len(closing)})", closing), (f"🆕 New this week ({len(new)})", new)):
+        if not summaries:
+            continue
+        out.append(f"<h2>{html.escape(heading)}</h2>\n<ul>")
+        for s in summaries:
+            item = (f'<li><a href="{html.escape(s["url"])}"><strong>{html.escape(s["org"])} — '
+                    f'{html.escape(s["title"])}</strong></a> <em>({html.escape(s["section"])})</em>')
+            if s["deadline"]:
+                item += f" — deadline: <strong>{html.escape(s['deadline'])}</strong>"
+            out.append(item + "</li>")
+        out.append("</ul>")
+    if not (closing or new):
+        out.append("<p>No new entries or closing-soon flags this week. Stay tuned 🌱</p>")
+    out.append(f'<hr><p>Want to contribute? <a href="{REPO_URL}/issues/new/choose">Open an issue</a>.</p>')
+    out.append("</body></html>")
+    return "\n".join(out)
+
+
+def render_json(audience, today, closing, new):
+    return json.dumps({
+        "audience": audience,
+        "label": audience_label(audience),
+        "date": today.strftime("%Y-%m-%d"),
+        "closing_soon": closing,
+        "new": new,
+    }, indent=2, ensure_ascii=False)
+
+
+RENDERERS = {
+    "md": render_markdown,
+    "html": render_html,
+    "txt": render_text,
+    "json": render_json,
+}
 
-    with open(DIGEST, "w") as f:
-        f.write("\n".join(out))
+
+def run(listings, today=None):
+    """Write every digest segment. Returns (closing-soon count, new count)."""
+    with open(README, "r") as f:
+        content = f.read()
+
+    today = today or datetime.now(tz=PST)
+    cutoff = today - timedelta(days=7)
+
+    index = index_for(listings)
+    new_listings = list(reversed(index.posted_since(int(cutoff.timestamp()), active_only=True)))
+    new_urls = {l["url"] for l in new_listings}
+    new_rows = [summarize_listing(l) for l in new_listings]
+    closing = index.deadline_within(CLOSING_SOON_DAYS, int(today.timestamp()))
+    closing_urls = {l["url"] for l in closing}
+    closing_rows = [summarize_listing(l) for l in closing]
+
+    # README rows count too (rows added by hand never reach listings.json,
+    # and the 🔥 badges are hand-maintained) unless a listing with the same
+    # URL is already in the section.
+    for m in TABLE_RE.finditer(content):
+        for section_key, row in parse_table(m.group(1), m.group(2)):
+            status = row.get("Status", "")
+            if "CLOSED" in status:
+                continue
+            url_m = URL_RE.search(row.get("Application", ""))
+            url = url_m.group(1) if url_m else None
+
+            posted = parse_date_posted(row.get("Date Posted") or "")
+            if posted and posted >= cutoff and (url is None or url not in new_urls):
+                new_rows.append(summarize_row(section_key, row))
+                if url:
+                    new_urls.add(url)
+
+            if "CLOSING SOON" in status and (url is None or url not in closing_urls):
+                closing_rows.append(summarize_row(section_key, row))
+                if url:
+                    closing_urls.add(url)
+
+    # One pass over the summaries fills every audience segment.
+    segments = {key: ([], []) for key in AUDIENCE_LABELS}
+    for slot, summaries in ((0, closing_rows), (1, new_rows)):
+        for summary in summaries:
+            for key in audiences(summary):
+                segments.setdefault(key, ([], []))[slot].append(summary)
+
+    def render_all():
+        files = {"digest.md": render_markdown("all", today, closing_rows, new_rows)}
+        for audience, (closing_segment, new_segment) in segments.items():
+            for ext, render in RENDERERS.items():
+                files[f"digest/{audience}.{ext}"] = render(audience, today, closing_segment, new_segment)
+        return json.dumps(files, ensure_ascii=False)
+
+    # The summaries already reflect the 7-day window; the day covers the
+    # dates printed in the digest
+    cache_key = artifact_cache.key("digest", [closing_rows, new_rows],
+                                   artifact_cache.version("weekly_digest", "geo"),
+                                   artifact_cache.date_bucket(today))
+    files = json.loads(artifact_cache.cached(cache_key, render_all, "digest"))
+
+    os.makedirs(DIGEST_DIR, exist_ok=True)
+    root = os.path.dirname(DIGEST)
+    for name, text in files.items():
+        util.write_if_changed(os.path.join(root, name), text)
 
     print(f"Digest written: {len(closing_rows)} closing soon, {len(new_rows)} new.")
+    print(f"  {len(segments)} audience segment(s) × {len(RENDERERS)} formats in {DIGEST_DIR}")
+    return len(closing_rows), len(new_rows)
+
+
+def main():
+    closing_count, new_count = run(util.get_listings_from_json())
     gh_out = os.environ.get("GITHUB_OUTPUT")
     if gh_out:
         with open(gh_out, "a") as f:
-            f.write(f"has_content={'true' if has_content else 'false'}\n")
-            f.write(f"closing_count={len(closing_rows)}\n")
-            f.write(f"new_count={len(new_rows)}\n")
+            f.write(f"has_content={'true' if closing_count or new_count else 'false'}\n")
+            f.write(f"closing_count={closing_count}\n")
+            f.write(f"new_count={new_count}\n")
 
 
 if __name__ == "__main__":